@@ -0,0 +1,165 @@
+import os
+import time
+from contextvars import ContextVar, copy_context
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+
+# Maximum number of onboardings running at the same time
+DEFAULT_MAX_CONCURRENCY = int(os.getenv("ONBOARDING_MAX_CONCURRENCY", "4"))
+
+_EXHAUSTED = object()
+
+# Results key (hire ID) of the teacher being onboarded in the current worker
+current_teacher = ContextVar("current_teacher", default=None)
+# Display name of that teacher, for messages people read
+current_teacher_name = ContextVar("current_teacher_name", default=None)
+
+
+class BatchResults(dict):
+    """
+    Per-teacher results, keyed like the dict onboard_teachers returns, with
+    batch-level timing available on the ``stats`` attribute.
+    """
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.stats = {}
+
+
+def _timed(worker, item):
+    start = time.perf_counter()
+    try:
+        result = worker(item)
+    except Exception as e:
+        result = {
+            "status": "failed",
+            "error": str(e)
+        }
+    result["wall_time"] = round(time.perf_counter() - start, 3)
+    return result
+
+
+def iter_batch(items, worker, max_concurrency=DEFAULT_MAX_CONCURRENCY):
+    """
+    Run ``worker`` over ``items`` with at most ``max_concurrency`` in flight.
+
+    Items are pulled lazily from the iterable, so only the in-flight window is
+    ever held in memory.
+
+    Args:
+        items (iterable): Work items, e.g. teacher dictionaries
+        worker (callable): Called with one item, returns that item's result dict
+        max_concurrency (int): Maximum number of workers running at once
+
+    Yields:
+        tuple: (item, result) pairs in completion order. Each result carries a
+        ``wall_time`` entry with the seconds spent on that item.
+    """
+    max_concurrency = max(1, int(max_concurrency))
+    items = iter(items)
+
+    with ThreadPoolExecutor(max_workers=max_concurrency) as executor:
+        in_flight = {}
+
+        def submit_next():
+            item = next(items, _EXHAUSTED)
+            if item is _EXHAUSTED:
+                return False
+            # Each item runs in a copy of the caller's context, so context
+            # variables set by the caller are visible and the worker's own stay isolated
+            in_flight[executor.submit(copy_context().run, _timed, worker, item)] = item
+            return True
+
+        for _ in range(max_concurrency):
+            if not submit_next():
+                break
+
+        while in_flight:
+            done, _ = wait(in_flight, return_when=FIRST_COMPLETED)
+            for future in done:
+                item = in_flight.pop(future)
+                submit_next()
+                yield item, future.result()
+
+
+def run_batch(items, worker, key, max_concurrency=DEFAULT_MAX_CONCURRENCY):
+    """
+    Run a whole batch and collect the results.
+
+    Args:
+        items (iterable): Work items, e.g. teacher dictionaries
+        worker (callable): Called with one item, returns that item's result dict
+        key (callable): Maps an item to its key in the results
+        max_concurrency (int): Maximum number of workers running at once
+
+    Returns:
+        BatchResults: Results in input order, with throughput in ``stats``
+    """
+    items = list(items)
+    results = BatchResults((key(item), None) for item in items)
+
+    start = time.perf_counter()
+    for item, result in iter_batch(items, worker, max_concurrency):
+        results[key(item)] = result
+    elapsed = time.perf_counter() - start
+
+    results.stats = summarize(results.values(), elapsed, max_concurrency)
+    return results
+
+
+class RunningStats:
+    """
+    Batch statistics accumulated one result at a time, in constant memory.
+    """
+
+    def __init__(self):
+        self.total = 0
+        self.succeeded = 0
+        self.rejected = 0
+        self.duplicates = 0
+        self.teacher_time = 0.0
+        self.max_teacher_time = 0.0
+
+    def add(self, result):
+        wall_time = result.get("wall_time", 0.0)
+        self.total += 1
+        self.succeeded += result.get("status") == "success"
+        self.rejected += result.get("status") == "rejected"
+        self.duplicates += result.get("status") == "duplicate"
+        self.teacher_time += wall_time
+        self.max_teacher_time = max(self.max_teacher_time, wall_time)
+
+    def summary(self, elapsed, max_concurrency):
+        """
+        Counts, total wall time, throughput and per-teacher timings.
+        """
+        return {
+            "total": self.total,
+            "succeeded": self.succeeded,
+            "rejected": self.rejected,
+            "duplicates": self.duplicates,
+            "failed": self.total - self.succeeded - self.rejected - self.duplicates,
+            "max_concurrency": max_concurrency,
+            "wall_time": round(elapsed, 3),
+            "throughput_per_minute": round(self.total * 60 / elapsed, 2) if elapsed > 0 else 0.0,
+            "mean_teacher_time": round(self.teacher_time / self.total, 3) if self.total else 0.0,
+            "max_teacher_time": self.max_teacher_time,
+        }
+
+
+def summarize(results, elapsed, max_concurrency):
+    """
+    Build batch statistics from a collection of per-teacher results.
+
+    Args:
+        results (iterable): Per-teacher result dictionaries
+        elapsed (float): Wall time of the whole batch in seconds
+        max_concurrency (int): Concurrency the batch ran with
+
+    Returns:
+        dict: Counts, total wall time, throughput and per-teacher timings
+    """
+    stats = RunningStats()
+    for result in results:
+        if result is not None:
+            stats.add(result)
+    return stats.summary(elapsed, max_concurrency)
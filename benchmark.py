@@ -0,0 +1,1032 @@
+"""
+Offline benchmark for the onboarding pipeline.
+
+Swaps the OpenAI client for a scripted chat model with configurable latency
+and points the email, WhatsApp and Slack senders at in-process stand-ins
+(an SMTP sink and a fake HTTP API), then drives onboard_teachers() with
+synthetic batches and reports latency percentiles, throughput, memory and
+calls per hire.
+
+It also measures the cold import time of main with ``python -X importtime``
+and exits non-zero when it exceeds the budget.
+
+Usage:
+    python benchmark.py --sizes 10 100 1000 --mode fast --concurrency 8 --latency 0.05
+    python benchmark.py --import-only --import-budget 300
+    python benchmark.py --role-lookups 100000
+"""
+import argparse
+import contextlib
+import functools
+import io
+import itertools
+import json
+import os
+import random
+import re
+import resource
+import socketserver
+import subprocess
+import sys
+import threading
+import time
+import tracemalloc
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any
+
+# Budget for `import main` (cumulative microseconds reported by -X importtime)
+IMPORT_TIME_BUDGET_MS = float(os.getenv("IMPORT_TIME_BUDGET_MS", "300"))
+
+_TEACHER_FIELDS = {
+    "name": re.compile(r"(?<!Tool )Name: ([^,\n]+)"),
+    "subject": re.compile(r"Subject: ([^,\n]+)"),
+    "experience": re.compile(r"Experience: ([^,\n]+)"),
+    "email": re.compile(r"Email: ([^\s,]+@[^\s,]+)"),
+    "phone_number": re.compile(r"Phone Number: (\+?[\d ]+)"),
+}
+# Teacher details passed between tasks as JSON, see TeacherRecord.to_context
+_TEACHER_JSON = re.compile(r'\{"name": ?"[^"]*".*?"phone_number": ?"[^"]*"\}')
+_ROLE_JSON = re.compile(r'"role": ?"([^"]+)"')
+_TOOL_BLOCK = re.compile(r"Tool Name: (\S+)\nTool Arguments: (\{.*?\n\})\nTool Description", re.DOTALL)
+
+
+@functools.lru_cache(maxsize=1)
+def _encoding():
+    try:
+        import tiktoken
+        return tiktoken.get_encoding("cl100k_base")
+    except Exception:
+        # tiktoken missing, or its encoding cannot be downloaded offline
+        return None
+
+
+def count_tokens(text):
+    """
+    Tokens in ``text`` with tiktoken's cl100k_base encoding, or roughly four
+    characters per token when the encoding is not available.
+    """
+    encoding = _encoding()
+    if encoding is None:
+        return len(text) // 4
+    return len(encoding.encode(text, disallowed_special=()))
+
+
+def percentile(values, fraction):
+    """
+    Nearest-rank percentile of a list of numbers.
+    """
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    index = max(0, min(len(ordered) - 1, int(round(fraction * len(ordered) + 0.5)) - 1))
+    return ordered[index]
+
+
+def measure_import_time(module="main", runs=3):
+    """
+    Measure how long ``import module`` takes in a fresh interpreter.
+
+    Uses ``python -X importtime`` and keeps the fastest of ``runs`` runs.
+
+    Returns:
+        tuple: (milliseconds, list of (milliseconds, name) for the slowest
+        imports made directly by the module)
+    """
+    best = None
+    for _ in range(runs):
+        completed = subprocess.run(
+            [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+            capture_output=True, text=True, env={**os.environ, "OPENAI_API_KEY": ""},
+            cwd=os.path.dirname(os.path.abspath(__file__))
+        )
+        if completed.returncode != 0:
+            raise RuntimeError(f"import {module} failed:\n{completed.stderr[-2000:]}")
+
+        # Children are listed before their parent, one indent level deeper
+        total, children, pending = 0.0, [], []
+        for line in completed.stderr.splitlines():
+            if not line.startswith("import time:") or "cumulative" in line:
+                continue
+            _, cumulative_us, name = line[len("import time:"):].split("|")
+            depth = (len(name) - len(name.lstrip()) - 1) // 2
+            if depth == 1:
+                pending.append((int(cumulative_us) / 1000, name.strip()))
+            elif depth == 0:
+                if name.strip() == module:
+                    total, children = int(cumulative_us) / 1000, pending
+                pending = []
+        if best is None or total < best[0]:
+            best = (total, sorted(children, reverse=True)[:5])
+    return best
+
+
+# ---------------------------------------------------------------------------
+# Role lookup
+# ---------------------------------------------------------------------------
+
+def synthetic_roles(subjects=100, bands=4):
+    """
+    Role definitions for ``subjects`` departments with ``bands`` seniority levels each.
+
+    Returns:
+        tuple: (roles in the TEACHER_ROLES format, subject aliases)
+    """
+    roles, aliases = {}, {}
+    for s in range(subjects):
+        subject = f"Subject {s:03d}"
+        aliases[f"subj {s:03d}"] = subject
+        for level in range(bands):
+            roles[f"Level {level} {subject} Teacher"] = {
+                "requirements": {"subject": [subject], "min_experience": level * 3, "responsibilities": []}
+            }
+    return roles, aliases
+
+
+def _scan_roles(roles, aliases, subject, experience):
+    # Uncompiled equivalent of RoleIndex.lookup, for comparison
+    key = " ".join(subject.lower().split())
+    subject = next((known for role in roles.values() for known in role["requirements"]["subject"]
+                    if known.lower() == key), aliases.get(key))
+    best = None
+    for title, role in roles.items():
+        requirements = role["requirements"]
+        if subject in requirements["subject"] and experience >= requirements["min_experience"]:
+            if best is None or requirements["min_experience"] > roles[best]["requirements"]["min_experience"]:
+                best = title
+    return best
+
+
+def benchmark_role_lookup(lookups=100_000, subjects=100, bands=4, seed=0):
+    """
+    Time config.RoleIndex against a linear scan of the role definitions.
+
+    Returns:
+        dict: Compile time, and microseconds per lookup for both approaches
+    """
+    from config import RoleIndex
+
+    roles, aliases = synthetic_roles(subjects, bands)
+    rng = random.Random(seed)
+    names = [f"Subject {s:03d}" for s in range(subjects)] + list(aliases) + ["Unknown Subject"]
+    queries = [(rng.choice(names), rng.uniform(0, bands * 3 + 2)) for _ in range(lookups)]
+
+    start = time.perf_counter()
+    index = RoleIndex(roles, aliases)
+    compile_ms = (time.perf_counter() - start) * 1000
+
+    start = time.perf_counter()
+    indexed = [index.lookup(subject, years) for subject, years in queries]
+    index_us = (time.perf_counter() - start) * 1e6 / lookups
+
+    # The scan is slow; time a sample and check it agrees with the index
+    sample = queries[:max(1, lookups // 100)]
+    start = time.perf_counter()
+    scanned = [_scan_roles(roles, aliases, subject, years) for subject, years in sample]
+    scan_us = (time.perf_counter() - start) * 1e6 / len(sample)
+    if scanned != indexed[:len(sample)]:
+        raise AssertionError("RoleIndex and the linear scan disagree")
+
+    return {
+        "lookups": lookups,
+        "roles": len(roles),
+        "compile_ms": round(compile_ms, 3),
+        "index_us_per_lookup": round(index_us, 3),
+        "scan_us_per_lookup": round(scan_us, 3),
+    }
+
+
+# ---------------------------------------------------------------------------
+# Scripted LLM
+# ---------------------------------------------------------------------------
+
+def _make_scripted_chat_model():
+    from langchain_core.language_models.chat_models import BaseChatModel
+    from langchain_core.messages import AIMessage
+    from langchain_core.outputs import ChatGeneration, ChatResult
+    from pydantic import PrivateAttr
+
+    class ScriptedChatModel(BaseChatModel):
+        """
+        Chat model that answers CrewAI prompts from a script instead of an API.
+
+        It calls every tool offered in the system prompt once, in order, with
+        arguments built from the teacher details found in the prompt, then
+        gives a final answer: JSON for the tasks that pass structured output
+        on, bare when the call asks for a response_format, and a short
+        confirmation otherwise. Token usage is counted with
+        count_tokens so instrumentation sees realistic numbers.
+
+        Args:
+            latency (float): Seconds each call sleeps, standing in for the API
+            model_name (str): Model name reported in token usage
+            invalid_rate (float): Share of JSON answers that are wrong, as a
+            weaker model's might be: prose, or an empty object in structured
+            output mode
+        """
+
+        latency: float = 0.0
+        model_name: str = "gpt-4"
+        invalid_rate: float = 0.0
+        _calls: Any = PrivateAttr(default_factory=itertools.count)
+        _count: int = PrivateAttr(default=0)
+        _random: Any = PrivateAttr(default_factory=lambda: random.Random(0))
+
+        @property
+        def _llm_type(self):
+            return "scripted"
+
+        @property
+        def _identifying_params(self):
+            # Read by LLMCallbackHandler to price the call
+            return {"model_name": self.model_name}
+
+        @property
+        def calls(self):
+            return self._count
+
+        def _generate(self, messages, stop=None, run_manager=None, **kwargs):
+            self._count = next(self._calls) + 1
+            if self.latency:
+                time.sleep(self.latency)
+
+            text = self._script(messages, structured="response_format" in kwargs)
+            prompt_tokens = sum(count_tokens(str(m.content)) for m in messages)
+            completion_tokens = count_tokens(text)
+            return ChatResult(
+                generations=[ChatGeneration(message=AIMessage(content=text))],
+                llm_output={
+                    "model_name": self.model_name,
+                    "token_usage": {
+                        "prompt_tokens": prompt_tokens,
+                        "completion_tokens": completion_tokens,
+                        "total_tokens": prompt_tokens + completion_tokens,
+                    },
+                },
+            )
+
+        def _script(self, messages, structured=False):
+            prompt = "\n".join(str(m.content) for m in messages)
+            teacher = {field: m.group(1).strip() for field, m in
+                       ((field, pattern.search(prompt)) for field, pattern in _TEACHER_FIELDS.items()) if m}
+            record = _TEACHER_JSON.search(prompt)
+            if record:
+                teacher.update({k: str(v) for k, v in json.loads(record.group(0)).items()})
+
+            tools = _TOOL_BLOCK.findall(str(messages[0].content))
+            used = sum(1 for m in messages[1:] if isinstance(m, AIMessage) and "Action:" in str(m.content))
+            if used < len(tools):
+                name, schema = tools[used]
+                return (f"Thought: I need to use {name}\nAction: {name}\n"
+                        f"Action Input: {json.dumps(self._tool_arguments(schema, teacher))}")
+
+            if "Collect and verify teacher details" in prompt:
+                return self._json_answer(json.dumps(teacher), structured)
+            # Models tend to pretty-print their JSON; the task guardrails compact it
+            if "Determine the teacher's role" in prompt or "determine their role" in prompt:
+                return self._json_answer(json.dumps(self._assignment(teacher), indent=2), structured)
+            if "List the resources for the assigned role" in prompt or "compile a complete list of resources" in prompt:
+                from config import get_role_resources
+                role = _ROLE_JSON.search(prompt)
+                role = role.group(1) if role else ""
+                return self._json_answer(json.dumps({"role": role, "resources": get_role_resources(role)}, indent=2), structured)
+            return (f"Thought: I now know the final answer\nFinal Answer: Onboarding of "
+                    f"{teacher.get('name', 'the teacher')} is complete.")
+
+        def _json_answer(self, answer, structured):
+            # With a response_format the answer is bare JSON in the requested
+            # schema; a wrong one then misses fields rather than being prose
+            invalid = self.invalid_rate and self._random.random() < self.invalid_rate
+            if structured:
+                return "{}" if invalid else answer
+            if invalid:
+                answer = "All the details are verified and the onboarding can go ahead."
+            return f"Thought: I now know the final answer\nFinal Answer: {answer}"
+
+        @staticmethod
+        def _assignment(teacher):
+            from config import get_suitable_role, get_management_info
+            try:
+                experience = float(teacher.get("experience", "0").split()[0])
+            except ValueError:
+                experience = 0.0
+            role = get_suitable_role(teacher.get("subject", ""), experience) or ""
+            return {
+                "role": role,
+                "justification": f"{experience:g} years of {teacher.get('subject', 'teaching')}",
+                "management": get_management_info(role),
+            }
+
+        @staticmethod
+        def _tool_arguments(schema, teacher):
+            values = {
+                "email": teacher.get("email", "teacher@example.com"),
+                "phone_number": teacher.get("phone_number", "+2348000000000"),
+                "email_body": f"Dear {teacher.get('name', 'Teacher')},\n\nWelcome aboard!",
+                "message_body": f"🎉 Welcome {teacher.get('name', 'Teacher')}!",
+            }
+            try:
+                properties = json.loads(schema).get("properties", {})
+            except ValueError:
+                properties = {}
+            return {name: values.get(name, "") for name in properties}
+
+    return ScriptedChatModel
+
+
+def scripted_tier_models(latency, small_latency, invalid_rate=0.0, callbacks=None):
+    """
+    A scripted chat model for each model tier, keyed by tier.
+
+    Models below the top tier answer in ``small_latency`` seconds and give
+    ``invalid_rate`` of their JSON answers as prose, which the task
+    guardrails send up a tier.
+    """
+    from model_tiers import LLM_TIERS, LLM_TIER_MODELS
+
+    ScriptedChatModel = _make_scripted_chat_model()
+    return {
+        tier: ScriptedChatModel(
+            model_name=LLM_TIER_MODELS[tier],
+            latency=latency if tier == LLM_TIERS[-1] else small_latency,
+            invalid_rate=0.0 if tier == LLM_TIERS[-1] else invalid_rate,
+            callbacks=callbacks,
+        )
+        for tier in LLM_TIERS
+    }
+
+
+# ---------------------------------------------------------------------------
+# Channel stand-ins
+# ---------------------------------------------------------------------------
+
+class _SMTPHandler(socketserver.StreamRequestHandler):
+    def _reply(self, line):
+        self.wfile.write((line + "\r\n").encode())
+
+    def handle(self):
+        server = self.server
+        self._reply("220 localhost ESMTP benchmark")
+        while True:
+            line = self.rfile.readline()
+            if not line:
+                return
+            command = line.decode(errors="replace").strip().upper()
+            if command.startswith(("EHLO", "HELO")):
+                self.wfile.write(b"250-localhost\r\n250-AUTH PLAIN LOGIN\r\n250 8BITMIME\r\n")
+            elif command.startswith("AUTH"):
+                self._reply("235 Authentication successful")
+            elif command.startswith("RCPT"):
+                reply = server.next_reply(command.partition(":")[2].strip(" <>").lower())
+                if reply == "drop":
+                    return
+                self._reply(reply or "250 OK")
+            elif command.startswith(("MAIL", "RSET", "NOOP")):
+                self._reply("250 OK")
+            elif command == "DATA":
+                self._reply("354 End data with <CR><LF>.<CR><LF>")
+                while self.rfile.readline() not in (b".\r\n", b".\n", b""):
+                    pass
+                if server.latency:
+                    time.sleep(server.latency)
+                with server.lock:
+                    server.messages += 1
+                self._reply("250 OK queued")
+            elif command == "QUIT":
+                self._reply("221 Bye")
+                return
+            else:
+                self._reply("502 Command not implemented")
+
+
+class LocalSMTPServer(socketserver.ThreadingTCPServer):
+    """
+    In-process SMTP sink accepting any login and message.
+
+    script() makes it refuse chosen recipients, or drop the connection, to
+    exercise the senders' error handling.
+    """
+    daemon_threads = True
+    allow_reuse_address = True
+
+    def __init__(self, latency=0.0):
+        super().__init__(("127.0.0.1", 0), _SMTPHandler)
+        self.latency = latency
+        self.messages = 0
+        self.connections = 0
+        self.replies = {}  # scripted RCPT replies by recipient address
+        self.lock = threading.Lock()
+
+    def script(self, recipient, *replies):
+        """
+        Answer the next RCPT commands for ``recipient`` with ``replies`` in
+        turn, e.g. "451 Try again later"; "drop" closes the connection instead.
+        """
+        with self.lock:
+            self.replies.setdefault(recipient.lower(), []).extend(replies)
+
+    def next_reply(self, recipient):
+        with self.lock:
+            replies = self.replies.get(recipient)
+            return replies.pop(0) if replies else None
+
+    def process_request(self, request, client_address):
+        with self.lock:
+            self.connections += 1
+        super().process_request(request, client_address)
+
+
+class _HTTPHandler(BaseHTTPRequestHandler):
+    def log_message(self, *args):
+        pass
+
+    def _respond(self, status, payload, headers=()):
+        body = json.dumps(payload).encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        for name, value in headers:
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _chat_completion(self, raw):
+        from langchain_core.messages import AIMessage, HumanMessage, SystemMessage
+
+        server = self.server
+        payload = json.loads(raw)
+        types = {"system": SystemMessage, "assistant": AIMessage}
+        messages = [types.get(m["role"], HumanMessage)(content=m["content"]) for m in payload["messages"]]
+        tokens = sum(count_tokens(str(m.content)) for m in messages)
+
+        with server.lock:
+            # OpenAI-style request and token limits, answered with 429 and retry-after-ms
+            now = time.monotonic()
+            wait = 0.0
+            for bucket, amount in ((server.llm_requests, 1), (server.llm_tokens, tokens)):
+                if bucket is not None:
+                    bucket.refill(now, 1.0)
+                    wait = max(wait, bucket.wait_time(amount, 1.0))
+            if wait > 0:
+                server.llm_rate_limited += 1
+            else:
+                for bucket, amount in ((server.llm_requests, 1), (server.llm_tokens, tokens)):
+                    if bucket is not None:
+                        bucket.level -= amount
+        if wait > 0:
+            self._respond(429, {"error": {"message": "Rate limit reached", "type": "requests",
+                                          "code": "rate_limit_exceeded"}},
+                          [("retry-after-ms", str(int(wait * 1000) + 1))])
+            return
+
+        llm = server.llms[payload.get("model")]
+        options = {"response_format": payload["response_format"]} if "response_format" in payload else {}
+        result = llm._generate(messages, **options)
+        self._respond(200, {
+            "id": f"chatcmpl-{llm.calls}",
+            "object": "chat.completion",
+            "created": int(time.time()),
+            "model": payload.get("model", "gpt-4"),
+            "choices": [{
+                "index": 0,
+                "message": {"role": "assistant", "content": result.generations[0].message.content},
+                "finish_reason": "stop",
+            }],
+            "usage": result.llm_output["token_usage"],
+        })
+
+    def do_POST(self):
+        server = self.server
+        raw = self.rfile.read(int(self.headers.get("Content-Length") or 0))
+        if self.path.endswith("/chat/completions"):
+            self._chat_completion(raw)
+            return
+        if server.latency:
+            time.sleep(server.latency)
+
+        post = None
+        if self.path.endswith("chat.postMessage"):
+            try:
+                post = json.loads(raw or b"{}")
+            except ValueError:
+                post = {}
+            thread_ts = post.get("thread_ts")
+            with server.lock:
+                # Slack's per-channel limit: posts closer than slack_interval are refused
+                wait = server.slack_next - time.monotonic()
+                if wait > 0:
+                    server.rate_limited += 1
+                else:
+                    server.slack_next = time.monotonic() + server.slack_interval
+                    server.slack_replies += thread_ts is not None
+            if wait > 0:
+                self._respond(429, {"ok": False, "error": "ratelimited"}, [("Retry-After", f"{wait:.3f}")])
+                return
+
+        with server.lock:
+            server.requests[self.path] = server.requests.get(self.path, 0) + 1
+            count = server.requests[self.path]
+            ts = f"{int(time.time())}.{count:06d}"
+            if post is not None:
+                server.slack_posts.append({"ts": ts, "thread_ts": post.get("thread_ts"), "text": post.get("text")})
+        self._respond(200, {"ok": True, "ts": ts, "sid": f"SM{count:08d}"})
+
+
+class FakeHTTPServer(ThreadingHTTPServer):
+    """
+    In-process HTTP API answering every POST with a Slack/Twilio-style success.
+
+    Slack posts arriving less than ``slack_interval`` seconds after the last
+    accepted one are refused with HTTP 429 and a Retry-After header, like
+    Slack's per-channel rate limit.
+
+    It also serves an OpenAI-compatible /v1/chat/completions endpoint once
+    ``llm`` is set to a scripted chat model. Requests beyond ``llm_rpm`` or
+    ``llm_tpm`` are refused with 429 and retry-after-ms, like OpenAI. The
+    limits allow one second's worth at once, so bursts are refused early.
+    """
+    daemon_threads = True
+
+    def __init__(self, latency=0.0, slack_interval=0.0, llm_rpm=0.0, llm_tpm=0.0):
+        from llm_scheduler import TokenBucket
+
+        super().__init__(("127.0.0.1", 0), _HTTPHandler)
+        self.llms = {}  # scripted chat models by model name
+        self.llm_requests = self.llm_tokens = None
+        for name, per_minute in (("llm_requests", llm_rpm), ("llm_tokens", llm_tpm)):
+            if per_minute > 0:
+                setattr(self, name, TokenBucket(per_minute, burst=1))
+        self.llm_rate_limited = 0
+        self.latency = latency
+        self.slack_interval = slack_interval
+        self.slack_next = 0.0
+        self.slack_replies = 0
+        self.slack_posts = []  # accepted posts, with their "ts", "thread_ts" and "text"
+        self.rate_limited = 0
+        self.requests = {}
+        self.lock = threading.Lock()
+
+    @property
+    def url(self):
+        return f"http://127.0.0.1:{self.server_address[1]}"
+
+
+class LocalWhatsappSender:
+    """
+    Stand-in for WhatsappMessageSenderTool posting to the fake HTTP API.
+    """
+
+    def __init__(self, url):
+        import requests
+        self.url = f"{url}/whatsapp"
+        self.session = requests.Session()
+
+    def send_message(self, phone_number, message_body):
+        response = self.session.post(self.url, json={"to": phone_number, "body": message_body}, timeout=10)
+        if response.ok:
+            return f"✅ WhatsApp message sent to {phone_number}"
+        return f"❌ Error sending WhatsApp message: HTTP {response.status_code}"
+
+
+@contextlib.contextmanager
+def local_channels(latency=0.0, slack_interval=0.0, llm_rpm=0.0, llm_tpm=0.0):
+    """
+    Run the SMTP sink and fake HTTP API and point the senders at them.
+
+    Yields:
+        tuple: (LocalSMTPServer, FakeHTTPServer)
+    """
+    smtp = LocalSMTPServer(latency)
+    http = FakeHTTPServer(latency, slack_interval, llm_rpm, llm_tpm)
+    for server in (smtp, http):
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+
+    os.environ.update({
+        "EMAIL_USER": "benchmark@example.com",
+        "EMAIL_PASSWORD": "benchmark",
+        "SMTP_HOST": "127.0.0.1",
+        "SMTP_PORT": str(smtp.server_address[1]),
+        "SMTP_TLS": "0",
+        "SLACK_BOT_TOKEN": "xoxb-benchmark",
+        "SLACK_CHANNEL_ID": "CBENCHMARK",
+        "SLACK_API_URL": f"{http.url}/api/",
+    })
+
+    from clients import get_client, close_clients
+    close_clients()
+    get_client("whatsapp_sender", lambda: LocalWhatsappSender(http.url))
+    try:
+        yield smtp, http
+    finally:
+        close_clients()
+        smtp.shutdown()
+        http.shutdown()
+        smtp.server_close()
+        http.server_close()
+
+
+# ---------------------------------------------------------------------------
+# Benchmark driver
+# ---------------------------------------------------------------------------
+
+def synthetic_roster(size, seed=0, reject_ratio=0.0):
+    """
+    Generate a reproducible roster of ``size`` hires.
+
+    Args:
+        size (int): Number of hires
+        seed (int): Random seed
+        reject_ratio (float): Share of hires whose subject matches no role
+
+    Returns:
+        list: Teacher dictionaries in the onboard_teachers() format
+    """
+    rng = random.Random(seed)
+    subjects = ["Software Engineering", "Software Engineer", "Software Developer"]
+    roster = []
+    for i in range(size):
+        roster.append({
+            "name": f"Teacher {i:05d}",
+            "subject": "Art" if rng.random() < reject_ratio else rng.choice(subjects),
+            "experience": f"{rng.randint(0, 15)} years",
+            "email": f"teacher{i:05d}@example.com",
+            "phone_number": f"+23480{rng.randint(10000000, 99999999)}",
+        })
+    return roster
+
+
+def run_through_service(roster, mode, concurrency):
+    """
+    Onboard a roster by submitting it to an OnboardingService over its HTTP
+    API, then polling /stats until every job has finished.
+
+    Returns:
+        BatchResults: The job results keyed by hire ID, with stats shaped like
+        those of onboard_teachers()
+    """
+    import tempfile
+    import requests
+    from batch import BatchResults, summarize
+    from service import OnboardingService, OnboardingHTTPServer, JobQueue
+
+    with tempfile.TemporaryDirectory() as directory:
+        service = OnboardingService(JobQueue(os.path.join(directory, "jobs.sqlite3")), workers=concurrency,
+                                    poll_interval=0.05).start()
+        server = OnboardingHTTPServer(service, "127.0.0.1", 0)
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        try:
+            start = time.perf_counter()
+            response = requests.post(f"{server.url}/jobs", json={"teachers": roster, "mode": mode}, timeout=30)
+            response.raise_for_status()
+            while True:
+                stats = requests.get(f"{server.url}/stats", timeout=10).json()
+                if not stats["queued"] and not stats["running"]:
+                    break
+                time.sleep(0.02)
+            elapsed = time.perf_counter() - start
+            jobs = service.queue.list(limit=len(roster))
+        finally:
+            server.shutdown()
+            server.server_close()
+            service.stop()
+            service.queue.close()
+
+    results = BatchResults((job["hire_id"], job["result"]) for job in reversed(jobs))
+    results.stats = summarize(results.values(), elapsed, concurrency)
+    if service.metrics is not None:
+        results.stats["metrics"] = service.metrics
+    return results
+
+
+def _shard_worker_setup(http_url, latency, small_latency, invalid_rate, llm_rpm, llm_tpm, quiet):
+    """
+    Point a sharded worker process at the scripted LLM and the parent's local channels.
+    """
+    import main
+    from clients import get_client
+    from llm import ChatModelLLM, LLMCallbackHandler
+    from llm_scheduler import LLMScheduler
+    from instrumentation import METRICS_ENABLED
+
+    if quiet:
+        sys.stdout = open(os.devnull, "w")
+    callbacks = [LLMCallbackHandler()] if METRICS_ENABLED else None
+    # Each worker's share of the limits, as get_llm() would give it
+    scheduler = LLMScheduler(rpm=llm_rpm / main.llm_processes, tpm=llm_tpm / main.llm_processes, backoff_base=0.1)
+    main.llms = {
+        tier: ChatModelLLM(model=scripted.model_name, chat_model=scripted, scheduler=scheduler)
+        for tier, scripted in scripted_tier_models(latency, small_latency, invalid_rate, callbacks).items()
+    }
+    get_client("whatsapp_sender", lambda: LocalWhatsappSender(http_url))
+
+
+def run_sharded_benchmark(roster, mode, concurrency, processes, http_url, latency, small_latency, invalid_rate,
+                          llm_rpm, llm_tpm, slack_digest, quiet):
+    """
+    Onboard a roster with sharding.run_sharded() in a temporary work directory.
+    """
+    import tempfile
+    from sharding import run_sharded
+
+    setup = functools.partial(_shard_worker_setup, http_url, latency, small_latency, invalid_rate, llm_rpm, llm_tpm,
+                              quiet)
+    with tempfile.TemporaryDirectory() as workdir:
+        return run_sharded(roster, workdir, processes, concurrency, mode, setup=setup, slack_digest=slack_digest)
+
+
+def run_benchmark(size, mode="fast", concurrency=8, latency=0.05, channel_latency=0.0, reject_ratio=0.0,
+                  trace_memory=False, quiet=True, slack_digest=False, slack_interval=0.0, llm_endpoint="scripted",
+                  mock_rpm=0.0, mock_tpm=0.0, llm_rpm=0.0, llm_tpm=0.0, service=False, processes=1,
+                  small_latency=None, invalid_rate=0.0):
+    """
+    Onboard a synthetic batch against the scripted LLM and local channels.
+
+    With ``llm_endpoint="http"`` the agents use the real OpenAI client
+    against the fake server's chat completions endpoint, which enforces
+    ``mock_rpm``/``mock_tpm`` with 429s. ``llm_rpm``/``llm_tpm`` configure
+    the LLMScheduler the calls go through (0 for no limit). With ``service``
+    the roster is submitted to the HTTP onboarding service instead of
+    onboard_teachers(). With ``processes`` above 1 it is sharded across that
+    many worker processes, each running ``concurrency`` onboardings. The
+    small model tier answers in ``small_latency`` seconds (a third of
+    ``latency`` by default) and gives ``invalid_rate`` of its JSON answers
+    as prose.
+
+    Returns:
+        dict: Latency percentiles, throughput, memory peak and calls per hire
+    """
+    import main
+    from llm import ChatModelLLM, LLMCallbackHandler
+    from llm_scheduler import LLMScheduler
+    from instrumentation import METRICS_ENABLED
+    from model_tiers import LLM_TIERING
+
+    if small_latency is None:
+        small_latency = latency / 3
+    callbacks = [LLMCallbackHandler()] if METRICS_ENABLED else None
+    scripted = scripted_tier_models(latency, small_latency, invalid_rate,
+                                    callbacks=None if llm_endpoint == "http" else callbacks)
+    roster = synthetic_roster(size, reject_ratio=reject_ratio)
+
+    with local_channels(channel_latency, slack_interval, mock_rpm, mock_tpm) as (smtp, http):
+        chat_models = scripted
+        if llm_endpoint == "http":
+            from langchain_openai import ChatOpenAI
+
+            http.llms = {model.model_name: model for model in scripted.values()}
+            chat_models = {
+                tier: ChatOpenAI(model_name=model.model_name, base_url=f"{http.url}/v1", api_key="sk-benchmark",
+                                 max_retries=0, callbacks=callbacks)
+                for tier, model in scripted.items()
+            }
+        # One scheduler for both tiers, so its stats cover every call
+        scheduler = LLMScheduler(rpm=llm_rpm, tpm=llm_tpm, backoff_base=0.1)
+        main.llms = {
+            tier: ChatModelLLM(model=scripted[tier].model_name, chat_model=chat_model, scheduler=scheduler)
+            for tier, chat_model in chat_models.items()
+        }
+
+        if trace_memory:
+            tracemalloc.start()
+        rss_before = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+
+        output = io.StringIO() if quiet else sys.stdout
+        with contextlib.redirect_stdout(output):
+            if processes > 1:
+                results = run_sharded_benchmark(roster, mode, concurrency, processes, http.url, latency,
+                                                small_latency, invalid_rate, llm_rpm, llm_tpm, slack_digest, quiet)
+            elif service:
+                results = run_through_service(roster, mode, concurrency)
+            else:
+                results = main.onboard_teachers(roster, max_concurrency=concurrency, mode=mode,
+                                                slack_digest=slack_digest)
+
+        memory_peak = tracemalloc.get_traced_memory()[1] if trace_memory else None
+        if trace_memory:
+            tracemalloc.stop()
+        rss_after = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+
+        stats = results.stats
+        # Sharded workers count their calls in their own processes
+        if processes > 1 and "metrics" in stats:
+            llm_calls = stats["metrics"]["llm_calls"]
+        else:
+            llm_calls = sum(model.calls for model in scripted.values())
+        wall_times = [r["wall_time"] for r in results.values() if r is not None]
+        report = {
+            "size": size,
+            "mode": mode,
+            "concurrency": concurrency,
+            "service": service,
+            "processes": processes,
+            "llm_latency": latency,
+            "llm_small_latency": small_latency,
+            "llm_tiering": LLM_TIERING,
+            "succeeded": stats["succeeded"],
+            "rejected": stats["rejected"],
+            "failed": stats["failed"],
+            "wall_time": stats["wall_time"],
+            "throughput_per_minute": stats["throughput_per_minute"],
+            "p50": round(percentile(wall_times, 0.50), 4),
+            "p95": round(percentile(wall_times, 0.95), 4),
+            "llm_calls_per_hire": round(llm_calls / size, 2) if size else 0.0,
+            "llm_rate_limited": http.llm_rate_limited,
+            # Sharded workers schedule their calls in their own processes
+            "scheduler": {key: round(value, 3) for key, value in
+                          (stats["llm_scheduler"] if processes > 1 else scheduler.stats).items()},
+            "emails_per_hire": round(smtp.messages / size, 2) if size else 0.0,
+            "smtp_connections": smtp.connections,
+            "http_requests_per_hire": round(sum(http.requests.values()) / size, 2) if size else 0.0,
+            "slack_digest": slack_digest,
+            "slack_posts": http.requests.get("/api/chat.postMessage", 0),
+            "slack_thread_replies": http.slack_replies,
+            "slack_rate_limited": http.rate_limited,
+            "max_rss_kb": rss_after,
+            "rss_growth_kb": rss_after - rss_before,
+        }
+        if memory_peak is not None:
+            report["tracemalloc_peak_kb"] = memory_peak // 1024
+        if "metrics" in stats:
+            report["prompt_tokens_per_hire"] = round(stats["metrics"]["prompt_tokens"] / size, 1) if size else 0.0
+            report["stages"] = {
+                name: round(stage["seconds"] / stage["count"], 4)
+                for name, stage in stats["metrics"]["stages"].items() if stage["count"]
+            }
+            report["stage_prompt_tokens_per_hire"] = {
+                name: round(stage["prompt_tokens"] / size, 1)
+                for name, stage in stats["metrics"]["stages"].items()
+                if stage["prompt_tokens"] and size and not name.startswith("llm")
+            }
+            report["cost_per_hire"] = round(stats["metrics"]["cost"] / size, 6) if size else 0.0
+            report["stage_cost_per_hire"] = {
+                name: round(stage["cost"] / size, 6)
+                for name, stage in stats["metrics"]["stages"].items()
+                if stage["cost"] and size and not name.startswith("llm")
+            }
+            escalations = stats["metrics"]["stages"].get("escalation", {}).get("count", 0)
+            report["escalations_per_hire"] = round(escalations / size, 3) if size else 0.0
+
+        errors = [r["error"] for r in results.values() if r is not None and r["status"] == "failed"]
+        if errors:
+            report["first_error"] = errors[0]
+        return report
+
+
+def _print_report(report):
+    via = " via the service" if report.get("service") else ""
+    if report.get("processes", 1) > 1:
+        via = f" on {report['processes']} processes"
+    tiers = f" (small model {report['llm_small_latency']:g}s)" if report.get("llm_tiering") else ", no tiering"
+    print(f"\n{report['size']} hires{via}, mode={report['mode']}, concurrency={report['concurrency']}, "
+          f"LLM latency={report['llm_latency']}s{tiers}")
+    print("-" * 60)
+    print(f"  ok/rejected/failed : {report['succeeded']}/{report['rejected']}/{report['failed']}")
+    print(f"  wall time          : {report['wall_time']:.2f}s")
+    print(f"  throughput         : {report['throughput_per_minute']} hires/min")
+    print(f"  latency p50 / p95  : {report['p50']:.3f}s / {report['p95']:.3f}s")
+    print(f"  LLM calls per hire : {report['llm_calls_per_hire']}")
+    scheduler = report["scheduler"]
+    print(f"  LLM scheduler      : {scheduler['calls']} admitted, {scheduler['cached']} cached, {scheduler['rate_limited']} refused with 429 "
+          f"({report['llm_rate_limited']} at the endpoint), {scheduler['wait_seconds']:.2f}s queued")
+    print(f"  emails per hire    : {report['emails_per_hire']} ({report['smtp_connections']} SMTP connections)")
+    print(f"  HTTP calls per hire: {report['http_requests_per_hire']}")
+    print(f"  Slack posts        : {report['slack_posts']} ({report['slack_thread_replies']} in a thread, "
+          f"{report['slack_rate_limited']} rate-limited)")
+    print(f"  max RSS            : {report['max_rss_kb'] / 1024:.1f} MB")
+    if "tracemalloc_peak_kb" in report:
+        print(f"  traced peak        : {report['tracemalloc_peak_kb'] / 1024:.1f} MB")
+    if "stages" in report:
+        print("  mean seconds per stage:")
+        for name, seconds in report["stages"].items():
+            print(f"    {name:<28} {seconds:.4f}")
+    if report.get("stage_prompt_tokens_per_hire"):
+        print(f"  prompt tokens per hire: {report['prompt_tokens_per_hire']}")
+        for name, tokens in report["stage_prompt_tokens_per_hire"].items():
+            print(f"    {name:<28} {tokens:.1f}")
+    if report.get("stage_cost_per_hire"):
+        print(f"  cost per hire: ${report['cost_per_hire']:.5f} "
+              f"({report['escalations_per_hire']} escalations to a larger model)")
+        for name, cost in report["stage_cost_per_hire"].items():
+            print(f"    {name:<28} ${cost:.5f}")
+    if "first_error" in report:
+        print(f"  first error        : {report['first_error']}")
+
+
+def _print_comparison(before, after):
+    """
+    Prompt tokens, cost and mean seconds of each stage, before and after a change.
+    """
+    tables = (
+        ("Prompt tokens per hire", "stage_prompt_tokens_per_hire", "prompt_tokens_per_hire", "9.1f"),
+        ("Cost per hire ($)", "stage_cost_per_hire", "cost_per_hire", "9.5f"),
+        ("Mean seconds per stage", "stages", None, "9.4f"),
+    )
+    for title, key, total, fmt in tables:
+        print(f"\n{title}, {after['size']} hires, mode={after['mode']}")
+        print("-" * 60)
+        stages = dict.fromkeys(list(before.get(key, {})) + list(after.get(key, {})))
+        rows = [(name, before.get(key, {}).get(name, 0.0), after.get(key, {}).get(name, 0.0)) for name in stages]
+        if total:
+            rows.append(("total", before.get(total, 0.0), after.get(total, 0.0)))
+        for name, old, new in rows:
+            change = f"{(new - old) / old * 100:+.1f}%" if old else "n/a"
+            print(f"  {name:<28} {old:{fmt}} -> {new:{fmt}}  {change}")
+
+
+def main_cli(argv=None):
+    parser = argparse.ArgumentParser(description="Offline onboarding pipeline benchmark")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10, 100, 1000])
+    parser.add_argument("--mode", default="fast", choices=["full", "fast"])
+    parser.add_argument("--concurrency", type=int, default=8)
+    parser.add_argument("--latency", type=float, default=0.05, help="seconds per scripted LLM call")
+    parser.add_argument("--small-latency", type=float,
+                        help="seconds per call to the small model tier (default: a third of --latency)")
+    parser.add_argument("--small-error-rate", type=float, default=0.0,
+                        help="share of the small model's JSON answers given as prose, to exercise escalation")
+    parser.add_argument("--channel-latency", type=float, default=0.0, help="seconds per SMTP/HTTP request")
+    parser.add_argument("--reject-ratio", type=float, default=0.0)
+    parser.add_argument("--llm-endpoint", choices=["scripted", "http"], default="scripted",
+                        help="call the scripted model directly, or through the OpenAI client and a mock endpoint")
+    parser.add_argument("--mock-rpm", type=float, default=0.0, help="requests per minute the mock endpoint allows")
+    parser.add_argument("--mock-tpm", type=float, default=0.0, help="tokens per minute the mock endpoint allows")
+    parser.add_argument("--llm-rpm", type=float, default=0.0, help="LLMScheduler request limit (0: none)")
+    parser.add_argument("--llm-tpm", type=float, default=0.0, help="LLMScheduler token limit (0: none)")
+    parser.add_argument("--slack-digest", action="store_true",
+                        help="post one Slack digest per batch with threaded introductions")
+    parser.add_argument("--slack-interval", type=float, default=0.0,
+                        help="fake Slack refuses posts closer than this many seconds with HTTP 429")
+    parser.add_argument("--service", action="store_true",
+                        help="submit the roster to the onboarding service's HTTP API instead of onboard_teachers()")
+    parser.add_argument("--processes", type=int, default=1,
+                        help="shard the roster across this many worker processes (scripted LLM only)")
+    parser.add_argument("--tracemalloc", action="store_true", help="also report the Python heap peak (slow)")
+    parser.add_argument("--json", help="write the reports to this file")
+    parser.add_argument("--compare", metavar="BEFORE.json",
+                        help="print per-stage token, cost and latency changes against a report written with --json")
+    parser.add_argument("--verbose", action="store_true", help="show agent output")
+    parser.add_argument("--import-budget", type=float, default=IMPORT_TIME_BUDGET_MS,
+                        help="fail if `import main` takes longer than this many milliseconds")
+    parser.add_argument("--import-only", action="store_true", help="only check the import-time budget")
+    parser.add_argument("--role-lookups", type=int, metavar="N",
+                        help="only time N role lookups (compiled index vs. linear scan)")
+    args = parser.parse_args(argv)
+    if args.slack_digest and args.service:
+        parser.error("--slack-digest is not supported with --service, which delivers each hire on its own")
+
+    if args.role_lookups:
+        for subjects in (1, 100, 500):
+            report = benchmark_role_lookup(args.role_lookups, subjects=subjects)
+            print(f"{report['roles']:>5} roles: compile {report['compile_ms']:.2f}ms, "
+                  f"index {report['index_us_per_lookup']:.2f}µs/lookup, "
+                  f"scan {report['scan_us_per_lookup']:.2f}µs/lookup")
+        return 0
+
+    import_ms, slowest = measure_import_time()
+    within_budget = import_ms <= args.import_budget
+    print(f"import main: {import_ms:.1f}ms (budget {args.import_budget:g}ms) {'✅' if within_budget else '❌'}")
+    for ms, name in slowest:
+        print(f"    {name:<28} {ms:.1f}ms")
+    if args.import_only:
+        return 0 if within_budget else 1
+
+    # Offline settings; must be in place before main is imported
+    os.environ.setdefault("OPENAI_API_KEY", "sk-benchmark")
+    os.environ["LLM_CACHE_ENABLED"] = "0"
+    os.environ["OUTBOX_ENABLED"] = "0"
+    # Every size reuses the same synthetic hires, which the registry would skip as duplicates
+    os.environ["HIRE_REGISTRY"] = "0"
+    os.environ.setdefault("CREWAI_DISABLE_TELEMETRY", "true")
+    os.environ.setdefault("OTEL_SDK_DISABLED", "true")
+    # The fake Slack enforces --slack-interval itself; the client only backs off on 429
+    os.environ.setdefault("SLACK_RATE", "0")
+
+    if args.verbose:
+        from logs import setup_logging
+        setup_logging()
+
+    reports = []
+    for size in args.sizes:
+        report = run_benchmark(size, args.mode, args.concurrency, args.latency, args.channel_latency,
+                               args.reject_ratio, args.tracemalloc, quiet=not args.verbose,
+                               slack_digest=args.slack_digest, slack_interval=args.slack_interval,
+                               llm_endpoint=args.llm_endpoint, mock_rpm=args.mock_rpm, mock_tpm=args.mock_tpm,
+                               llm_rpm=args.llm_rpm, llm_tpm=args.llm_tpm, service=args.service,
+                               processes=args.processes, small_latency=args.small_latency,
+                               invalid_rate=args.small_error_rate)
+        _print_report(report)
+        reports.append(report)
+
+    if args.compare:
+        with open(args.compare, encoding="utf-8") as f:
+            baseline = {(run["size"], run["mode"]): run for run in json.load(f)["runs"]}
+        for report in reports:
+            if (report["size"], report["mode"]) in baseline:
+                _print_comparison(baseline[(report["size"], report["mode"])], report)
+
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump({"import_ms": import_ms, "runs": reports}, f, indent=2)
+    return 0 if within_budget else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main_cli())
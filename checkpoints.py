@@ -0,0 +1,84 @@
+import os
+import sqlite3
+import threading
+import time
+
+# Checkpoint settings
+CHECKPOINTS_ENABLED = os.getenv("ONBOARDING_CHECKPOINTS", "1") == "1"
+CHECKPOINT_PATH = os.getenv("CHECKPOINT_PATH", os.path.join(".cache", "checkpoints.sqlite3"))
+CHECKPOINT_TTL = int(os.getenv("CHECKPOINT_TTL", str(30 * 24 * 3600)))
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS checkpoints (
+    teacher TEXT NOT NULL,
+    version TEXT NOT NULL,
+    task TEXT NOT NULL,
+    output TEXT NOT NULL,
+    created_at REAL NOT NULL,
+    PRIMARY KEY (teacher, version, task)
+);
+"""
+
+
+class CheckpointStore:
+    """
+    SQLite record of the crew tasks each teacher has already completed.
+
+    Outputs are keyed by teacher, pipeline version and task name, so a rerun
+    can resume after the last completed task, and outputs produced by another
+    version of the pipeline are never reused.
+
+    Args:
+        path (str): SQLite database file
+        ttl (int): Seconds a checkpoint is kept; 0 keeps them forever
+    """
+
+    def __init__(self, path=CHECKPOINT_PATH, ttl=CHECKPOINT_TTL):
+        self.path = path
+        self.ttl = ttl
+
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.executescript(_SCHEMA)
+        if ttl:
+            self._conn.execute("DELETE FROM checkpoints WHERE created_at < ?", (time.time() - ttl,))
+            self._conn.commit()
+
+    def load(self, teacher, version):
+        """
+        Outputs of the tasks a teacher completed under ``version``.
+
+        Returns:
+            dict: Task name to its raw output
+        """
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT task, output FROM checkpoints WHERE teacher = ? AND version = ?", (teacher, version)
+            ).fetchall()
+        return dict(rows)
+
+    def save(self, teacher, version, task, output):
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO checkpoints (teacher, version, task, output, created_at) "
+                "VALUES (?, ?, ?, ?, ?)",
+                (teacher, version, task, output, time.time())
+            )
+            self._conn.commit()
+
+    def clear(self, teacher):
+        """
+        Forget every checkpoint of a teacher, e.g. once the onboarding succeeded.
+        """
+        with self._lock:
+            self._conn.execute("DELETE FROM checkpoints WHERE teacher = ?", (teacher,))
+            self._conn.commit()
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
@@ -0,0 +1,80 @@
+import threading
+
+_clients = {}
+# Re-entrant so a factory can fetch the clients it depends on
+_lock = threading.RLock()
+
+
+def get_client(name, factory):
+    """
+    Get the process-wide client registered under ``name``.
+
+    The client is created with ``factory()`` on first use and shared by every
+    thread afterwards. If the factory raises, nothing is registered and the
+    next call tries again.
+
+    Args:
+        name (str): Registry key, e.g. "smtp" or "twilio"
+        factory (callable): Builds the client
+
+    Returns:
+        object: The shared client
+    """
+    client = _clients.get(name)
+    if client is None:
+        with _lock:
+            client = _clients.get(name)
+            if client is None:
+                client = _clients[name] = factory()
+    return client
+
+
+def close_clients():
+    """
+    Close and forget every registered client, newest first so clients are
+    closed before the ones they depend on.
+    """
+    with _lock:
+        clients = list(reversed(_clients.values()))
+        _clients.clear()
+
+    for client in clients:
+        close = getattr(client, "close", None)
+        if callable(close):
+            try:
+                close()
+            except Exception:
+                pass
+
+
+class SharedSMTPConnection:
+    """
+    A persistent, authenticated SMTP connection shared between threads.
+
+    STARTTLS and AUTH happen once on first use. The underlying backend
+    reconnects when the server drops an idle connection, and any other failed
+    send discards the connection so the next message starts a fresh session.
+    """
+
+    def __init__(self, **smtp_settings):
+        from emails.backend.smtp import SMTPBackend
+
+        self._backend = SMTPBackend(fail_silently=True, **smtp_settings)
+        self._lock = threading.Lock()
+
+    def send(self, message, to):
+        """
+        Send an ``emails.Message`` over the shared connection.
+
+        Returns:
+            SMTPResponse: The server's response
+        """
+        with self._lock:
+            response = message.send(to=to, smtp=self._backend)
+            if response is None or response.status_code != 250:
+                self._backend.close()
+            return response
+
+    def close(self):
+        with self._lock:
+            self._backend.close()
@@ -1,3 +1,7 @@
+import os
+
+from org_config import OrgConfig, RoleIndex, load_org_config, current_org, set_org_config
+
 # Predefined teacher roles and their requirements
 TEACHER_ROLES = {
     "Principal Software Engineer": {
@@ -35,6 +39,14 @@ TEACHER_ROLES = {
     }
 }
 
+# Alternative spellings of the subjects used in TEACHER_ROLES
+SUBJECT_ALIASES = {
+    "software engineer": "Software Engineering",
+    "software engineer developer": "Software Engineering",
+    "software developer": "Software Engineering",
+    "software development": "Software Engineering",
+}
+
 # Predefined resources for each role
 ROLE_RESOURCES = {
     "Principal Software Engineer": [
@@ -188,28 +200,36 @@ MANAGEMENT_STRUCTURE = {
     }
 }
 
+# Org configuration file replacing the literals above, see org_config.py
+ORG_CONFIG_PATH = os.getenv("ORG_CONFIG_PATH")
+
+set_org_config(
+    load_org_config(ORG_CONFIG_PATH) if ORG_CONFIG_PATH else
+    OrgConfig(TEACHER_ROLES, ROLE_RESOURCES, MANAGEMENT_STRUCTURE, SCHOOL_INFO, SUBJECT_ALIASES)
+)
+
+def normalize_subject(subject):
+    """
+    Map a subject to the name used in TEACHER_ROLES.
+
+    Returns None when the subject does not match any role.
+    """
+    return current_org().role_index.normalize_subject(subject)
+
 def get_suitable_role(subject, experience):
     """
     Determine the most suitable role based on subject and experience.
     """
-    if subject.lower() != "software engineering":
-        return None
-    
-    if experience >= 8:
-        return "Principal Software Engineer"
-    elif experience >= 5:
-        return "Senior Software Engineer"
-    else:
-        return "Software Engineer"
+    return current_org().role_index.lookup(subject, experience)
 
 def get_role_resources(role):
     """
     Get the resources associated with a specific role.
     """
-    return ROLE_RESOURCES.get(role, [])
+    return current_org().role_resources.get(role, [])
 
 def get_management_info(role):
     """
     Get the management information for a specific role.
     """
-    return MANAGEMENT_STRUCTURE.get(role, {})
+    return current_org().management_structure.get(role, {})
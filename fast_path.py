@@ -0,0 +1,45 @@
+import json
+
+
+class NoSuitableRoleError(ValueError):
+    """Raised when a teacher's subject and experience match no predefined role."""
+
+
+def build_role_context(record, org):
+    """
+    Compute role assignment, resources and management structure in Python.
+
+    This replaces the role assignment and resources agents: the same lookups
+    they were asked to perform, without an LLM round-trip.
+
+    Args:
+        record (TeacherRecord): The parsed teacher record
+        org (OrgConfig): Configuration snapshot from current_org(), fetched
+        once per teacher and also passed to render_role_context()
+
+    Returns:
+        dict: Role title, responsibilities, resources and management structure
+    """
+    subject, years = record.subject, record.experience
+    role = org.role_index.lookup(subject, years)
+    if role is None:
+        raise NoSuitableRoleError(f"No suitable role for subject '{subject}' with {years:g} years of experience")
+
+    min_experience = org.teacher_roles[role]["requirements"]["min_experience"]
+    return org.role_context(
+        role,
+        f"{years:g} years of {subject} experience meets the {min_experience}+ year requirement for {role}"
+    )
+
+
+def render_role_context(role_context, org):
+    """
+    Serialize a role context for injection into the finalization prompt.
+
+    Uses the block pre-rendered for the role when ``org``, the snapshot the
+    context was built from, was loaded; only the justification is serialized
+    per teacher.
+    """
+    if role_context["role"] in org.teacher_roles:
+        return org.render_role_context(role_context["role"], role_context["justification"])
+    return json.dumps(role_context, indent=2, ensure_ascii=False)
@@ -0,0 +1,157 @@
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+import uuid
+
+from task_output import normalize_email, normalize_phone_number
+
+# Hire registry settings
+HIRE_REGISTRY_ENABLED = os.getenv("HIRE_REGISTRY", "1") == "1"
+HIRE_REGISTRY_PATH = os.getenv("HIRE_REGISTRY_PATH", os.path.join(".cache", "hires.sqlite3"))
+HIRE_CLAIM_TTL = int(os.getenv("HIRE_CLAIM_TTL", "900"))  # seconds before another run's unfinished claim lapses
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS hires (
+    hire_id TEXT PRIMARY KEY,
+    name TEXT NOT NULL,
+    email TEXT NOT NULL,
+    phone_number TEXT NOT NULL,
+    status TEXT NOT NULL,
+    owner TEXT NOT NULL,
+    updated_at REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS hires_email ON hires (email);
+CREATE INDEX IF NOT EXISTS hires_phone_number ON hires (phone_number);
+"""
+
+class DuplicateHireError(ValueError):
+    """Raised when a teacher was already onboarded, or is being onboarded, under another roster entry or run."""
+
+    def __init__(self, existing):
+        self.existing = existing
+        state = "already onboarded" if existing["status"] == "onboarded" else "already being onboarded"
+        super().__init__(f"{existing['name']} is {state} as {existing['hire_id']}")
+
+
+_COLUMNS = ("hire_id", "name", "email", "phone_number", "status", "updated_at")
+
+
+def hire_id(teacher):
+    """
+    Stable ID of a roster entry, used to key results, checkpoints and notifications.
+
+    Derived from the normalized email address, or the phone number when the
+    email is missing or invalid, so the same person gets the same ID in every
+    run and roster however their details are formatted. Entries with neither
+    are identified by their content.
+    """
+    identity = None
+    if isinstance(teacher, dict):
+        for field, normalize in (("email", normalize_email), ("phone_number", normalize_phone_number)):
+            if teacher.get(field):
+                try:
+                    identity = f"{field}:{normalize(teacher[field])}"
+                    break
+                except ValueError:
+                    continue
+        if identity is None:
+            identity = "entry:" + json.dumps(teacher, sort_keys=True, default=str)
+    else:
+        identity = "text:" + " ".join(str(teacher).lower().split())
+    return "hire-" + hashlib.sha256(identity.encode("utf-8")).hexdigest()[:16]
+
+
+class HireRegistry:
+    """
+    SQLite record of every hire onboarded, or being onboarded, indexed by
+    normalized email address and phone number.
+
+    A hire is claimed before any LLM or notification work starts. A claim
+    that matches an onboarded hire, or one still in progress, on its ID,
+    email or phone number is refused, so repeats across runs and rosters are
+    skipped with a single indexed lookup. Claims left unfinished by another
+    run, e.g. one that crashed, lapse after ``claim_ttl`` seconds.
+
+    Args:
+        path (str): SQLite database file
+        claim_ttl (int): Seconds another run's unfinished claim is honoured
+        owner (str): Identifies this run's claims; a fresh ID by default. A
+        long-running service passes a stable one so that after a restart it
+        can release the claims of the jobs it was running.
+    """
+
+    def __init__(self, path=HIRE_REGISTRY_PATH, claim_ttl=HIRE_CLAIM_TTL, owner=None):
+        self.path = path
+        self.claim_ttl = claim_ttl
+        self.owner = owner or uuid.uuid4().hex
+
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.executescript(_SCHEMA)
+
+    def _match(self, hire, email, phone_number):
+        row = self._conn.execute(
+            f"SELECT {', '.join(_COLUMNS)} FROM hires "
+            "WHERE (hire_id = ? OR email = ? OR phone_number = ?) "
+            "AND (status = 'onboarded' OR owner = ? OR updated_at >= ?) "
+            "ORDER BY status = 'onboarded' DESC LIMIT 1",
+            (hire, email, phone_number, self.owner, time.time() - self.claim_ttl)
+        ).fetchone()
+        return dict(zip(_COLUMNS, row)) if row else None
+
+    def claim(self, hire, record):
+        """
+        Register a hire as in progress, unless it is a duplicate.
+
+        Args:
+            hire (str): The entry's hire_id()
+            record (TeacherRecord): The parsed teacher record
+
+        Returns:
+            dict: The matching hire ("hire_id", "name", "email", "phone_number",
+            "status" and "updated_at") when this one is a duplicate, else None
+        """
+        with self._lock, self._conn:
+            existing = self._match(hire, record.email, record.phone_number)
+            if existing is not None:
+                return existing
+            self._conn.execute(
+                "INSERT OR REPLACE INTO hires (hire_id, name, email, phone_number, status, owner, updated_at) "
+                "VALUES (?, ?, ?, ?, 'in_progress', ?, ?)",
+                (hire, record.name, record.email, record.phone_number, self.owner, time.time())
+            )
+        return None
+
+    def find(self, record):
+        """
+        The onboarded or in-progress hire matching a record, without claiming it.
+        """
+        with self._lock:
+            return self._match(None, record.email, record.phone_number)
+
+    def complete(self, hire):
+        with self._lock, self._conn:
+            self._conn.execute(
+                "UPDATE hires SET status = 'onboarded', updated_at = ? WHERE hire_id = ?", (time.time(), hire)
+            )
+
+    def release(self, hire):
+        """
+        Drop this run's claim on a hire that was rejected or failed, so it can be retried.
+        """
+        with self._lock, self._conn:
+            self._conn.execute(
+                "DELETE FROM hires WHERE hire_id = ? AND status = 'in_progress' AND owner = ?", (hire, self.owner)
+            )
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
@@ -0,0 +1,346 @@
+import json
+import os
+import secrets
+import threading
+import time
+from contextlib import contextmanager, nullcontext
+from contextvars import ContextVar
+
+# Instrumentation settings
+METRICS_ENABLED = os.getenv("ONBOARDING_METRICS", "1") == "1"
+METRICS_JSONL_PATH = os.getenv("ONBOARDING_METRICS_JSONL")
+METRICS_PROMETHEUS_PATH = os.getenv("ONBOARDING_METRICS_PROMETHEUS")
+OTEL_EXPORT = os.getenv("ONBOARDING_OTEL_EXPORT", "0") == "1"
+
+# USD per 1,000 tokens: (prompt, completion)
+MODEL_PRICES = {
+    "gpt-4": (0.03, 0.06),
+    "gpt-4o": (0.0025, 0.01),
+    "gpt-4o-mini": (0.00015, 0.0006),
+    "gpt-3.5-turbo": (0.0005, 0.0015),
+}
+
+# Recorder of the teacher being onboarded in the current worker
+current_recorder = ContextVar("current_recorder", default=None)
+
+_jsonl_lock = threading.Lock()
+
+
+def token_cost(model, prompt_tokens, completion_tokens):
+    """
+    Estimated cost in USD of a call, or 0.0 for models without a known price.
+    """
+    prompt_price, completion_price = MODEL_PRICES.get(model, (0.0, 0.0))
+    return (prompt_tokens * prompt_price + completion_tokens * completion_price) / 1000
+
+
+def _otel_value(value):
+    if isinstance(value, bool):
+        return {"boolValue": value}
+    if isinstance(value, int):
+        return {"intValue": value}
+    if isinstance(value, float):
+        return {"doubleValue": value}
+    return {"stringValue": str(value)}
+
+
+class Span:
+    """
+    A timed operation in a teacher's onboarding, shaped after OpenTelemetry spans.
+    """
+
+    __slots__ = ("name", "trace_id", "span_id", "parent_id", "start_ns", "end_ns", "attributes", "error")
+
+    def __init__(self, name, trace_id, parent_id=None, attributes=None):
+        self.name = name
+        self.trace_id = trace_id
+        self.span_id = secrets.token_hex(8)
+        self.parent_id = parent_id
+        self.start_ns = time.time_ns()
+        self.end_ns = None
+        self.attributes = attributes or {}
+        self.error = None
+
+    @property
+    def seconds(self):
+        end_ns = self.end_ns if self.end_ns is not None else time.time_ns()
+        return (end_ns - self.start_ns) / 1e9
+
+    def end(self, error=None):
+        self.end_ns = time.time_ns()
+        if error is not None:
+            self.error = str(error)
+
+    def to_otel(self):
+        """
+        Serialize in the shape of an OTLP/JSON span.
+        """
+        return {
+            "traceId": self.trace_id,
+            "spanId": self.span_id,
+            "parentSpanId": self.parent_id or "",
+            "name": self.name,
+            "startTimeUnixNano": self.start_ns,
+            "endTimeUnixNano": self.end_ns,
+            "attributes": [
+                {"key": key, "value": _otel_value(value)} for key, value in self.attributes.items()
+            ],
+            "status": {"code": 2, "message": self.error} if self.error else {"code": 1},
+        }
+
+
+class Recorder:
+    """
+    Collects the spans of one teacher's onboarding.
+
+    Stages are the crew's tasks, plus the Python-side steps such as intake and
+    role lookup. LLM and tool spans are nested under the stage that was open
+    when they started.
+
+    Args:
+        teacher (str): Results key of the teacher
+    """
+
+    def __init__(self, teacher):
+        self.teacher = teacher
+        self.trace_id = secrets.token_hex(16)
+        self.root = Span("onboarding", self.trace_id, attributes={"teacher": teacher})
+        self.spans = [self.root]
+        self._stack = [self.root]
+
+    def start(self, name, detached=False, **attributes):
+        """
+        Open a span under the innermost open span.
+
+        A detached span is not pushed on the stack of open spans, so spans
+        running side by side in other threads do not nest into each other.
+        """
+        span = Span(name, self.trace_id, self._stack[-1].span_id, attributes)
+        self.spans.append(span)
+        if not detached:
+            self._stack.append(span)
+        return span
+
+    def end(self, span, error=None):
+        span.end(error)
+        if span in self._stack:
+            # Close anything left open inside this span as well
+            while self._stack[-1] is not span:
+                self._stack.pop().end()
+            self._stack.pop()
+
+    def start_stages(self, names):
+        """
+        Time a sequence of crew tasks that report completion through callbacks.
+
+        Args:
+            names (list): Stage names in execution order
+
+        Returns:
+            list: One callback per stage, to be set as the task's ``callback``
+        """
+        names = list(names)
+        state = {"span": self.start(f"task.{names[0]}") if names else None}
+
+        def finished(index):
+            def callback(output):
+                self.end(state["span"])
+                if index + 1 < len(names):
+                    state["span"] = self.start(f"task.{names[index + 1]}")
+            return callback
+
+        return [finished(index) for index in range(len(names))]
+
+    def finish(self, error=None):
+        self.end(self.root, error)
+
+    def summary(self):
+        """
+        Per-stage timings, token counts and cost for this teacher.
+
+        Returns:
+            dict: "stages" keyed by span name with count, seconds, tokens and
+            cost, plus the totals for the whole onboarding
+        """
+        stages = {}
+        by_id = {span.span_id: span for span in self.spans}
+        for span in self.spans[1:]:
+            stage = stages.setdefault(span.name, {
+                "count": 0, "seconds": 0.0, "prompt_tokens": 0, "completion_tokens": 0, "cost": 0.0, "errors": 0,
+            })
+            stage["count"] += 1
+            stage["seconds"] += span.seconds
+            stage["errors"] += 1 if span.error else 0
+
+        # Token usage is recorded on LLM spans and also counts towards every
+        # enclosing stage, so each task reports the tokens it consumed
+        for span in self.spans[1:]:
+            if "prompt_tokens" not in span.attributes:
+                continue
+            current = span
+            while current is not None and current is not self.root:
+                stage = stages[current.name]
+                stage["prompt_tokens"] += span.attributes["prompt_tokens"]
+                stage["completion_tokens"] += span.attributes["completion_tokens"]
+                stage["cost"] += span.attributes["cost"]
+                current = by_id.get(current.parent_id)
+
+        for stage in stages.values():
+            stage["seconds"] = round(stage["seconds"], 4)
+            stage["cost"] = round(stage["cost"], 6)
+
+        llm = [s for name, s in stages.items() if name.startswith("llm")]
+        return {
+            "stages": stages,
+            "seconds": round(self.root.seconds, 4),
+            "llm_calls": sum(s["count"] for s in llm),
+            "prompt_tokens": sum(s["prompt_tokens"] for s in llm),
+            "completion_tokens": sum(s["completion_tokens"] for s in llm),
+            "cost": round(sum(s["cost"] for s in llm), 6),
+        }
+
+    def to_otel(self):
+        return [span.to_otel() for span in self.spans]
+
+
+@contextmanager
+def _recording_span(recorder, name, detached, attributes):
+    span = recorder.start(name, detached, **attributes)
+    try:
+        yield span
+    except BaseException as e:
+        recorder.end(span, error=e)
+        raise
+    recorder.end(span)
+
+
+def span(name, detached=False, **attributes):
+    """
+    Time a block as a span of the current teacher's onboarding.
+
+    Pass ``detached=True`` for blocks running concurrently with other spans
+    of the same teacher, see Recorder.start.
+
+    Costs a single context variable lookup when instrumentation is disabled
+    or no teacher is being recorded.
+    """
+    recorder = current_recorder.get()
+    if recorder is None:
+        return nullcontext()
+    return _recording_span(recorder, name, detached, attributes)
+
+
+def aggregate(summaries):
+    """
+    Combine per-teacher summaries into batch totals.
+
+    Args:
+        summaries (iterable): Recorder.summary() dictionaries
+
+    Returns:
+        dict: Same shape as a teacher summary, summed over the batch
+    """
+    batch = {"stages": {}, "seconds": 0.0, "llm_calls": 0, "prompt_tokens": 0, "completion_tokens": 0, "cost": 0.0}
+    for summary in summaries:
+        for key in ("seconds", "llm_calls", "prompt_tokens", "completion_tokens", "cost"):
+            batch[key] += summary[key]
+        for name, stage in summary["stages"].items():
+            total = batch["stages"].setdefault(name, dict.fromkeys(stage, 0))
+            for key, value in stage.items():
+                total[key] += value
+
+    batch["seconds"] = round(batch["seconds"], 4)
+    batch["cost"] = round(batch["cost"], 6)
+    for stage in batch["stages"].values():
+        stage["seconds"] = round(stage["seconds"], 4)
+        stage["cost"] = round(stage["cost"], 6)
+    return batch
+
+
+def export_jsonl(recorder, path=METRICS_JSONL_PATH):
+    """
+    Append a teacher's spans to a JSON lines file, one OTLP-shaped span per line.
+    """
+    if not path:
+        return
+    lines = [json.dumps(dict(span, teacher=recorder.teacher)) for span in recorder.to_otel()]
+    with _jsonl_lock, open(path, "a", encoding="utf-8") as f:
+        f.write("\n".join(lines) + "\n")
+
+
+def export_otel(recorder):
+    """
+    Replay a teacher's spans into the OpenTelemetry SDK, when it is installed
+    and ONBOARDING_OTEL_EXPORT is set.
+    """
+    if not OTEL_EXPORT:
+        return
+    try:
+        from opentelemetry import trace
+    except ImportError:
+        return
+
+    tracer = trace.get_tracer("onboarding")
+    started = {}
+    for span in recorder.spans:
+        parent = started.get(span.parent_id)
+        context = trace.set_span_in_context(parent) if parent is not None else None
+        otel_span = tracer.start_span(span.name, context=context, start_time=span.start_ns,
+                                      attributes=span.attributes)
+        if span.error:
+            otel_span.set_status(trace.Status(trace.StatusCode.ERROR, span.error))
+        started[span.span_id] = otel_span
+    for span in reversed(recorder.spans):
+        started[span.span_id].end(end_time=span.end_ns)
+
+
+def _labels(**labels):
+    return ",".join(f'{key}="{str(value).replace(chr(34), chr(39))}"' for key, value in labels.items())
+
+
+def render_prometheus(batch_metrics, stats=None):
+    """
+    Render batch metrics in the Prometheus text exposition format.
+
+    Args:
+        batch_metrics (dict): Output of aggregate()
+        stats (dict): Batch statistics from BatchResults.stats, if available
+
+    Returns:
+        str: Metrics text
+    """
+    lines = [
+        "# HELP onboarding_stage_seconds_total Time spent per onboarding stage.",
+        "# TYPE onboarding_stage_seconds_total counter",
+    ]
+    for name, stage in batch_metrics["stages"].items():
+        lines.append(f"onboarding_stage_seconds_total{{{_labels(stage=name)}}} {stage['seconds']}")
+
+    lines += ["# HELP onboarding_stage_calls_total Calls per onboarding stage.",
+              "# TYPE onboarding_stage_calls_total counter"]
+    for name, stage in batch_metrics["stages"].items():
+        lines.append(f"onboarding_stage_calls_total{{{_labels(stage=name)}}} {stage['count']}")
+
+    lines += ["# HELP onboarding_stage_errors_total Failed calls per onboarding stage.",
+              "# TYPE onboarding_stage_errors_total counter"]
+    for name, stage in batch_metrics["stages"].items():
+        lines.append(f"onboarding_stage_errors_total{{{_labels(stage=name)}}} {stage['errors']}")
+
+    lines += ["# HELP onboarding_llm_tokens_total LLM tokens used.",
+              "# TYPE onboarding_llm_tokens_total counter",
+              f"onboarding_llm_tokens_total{{{_labels(kind='prompt')}}} {batch_metrics['prompt_tokens']}",
+              f"onboarding_llm_tokens_total{{{_labels(kind='completion')}}} {batch_metrics['completion_tokens']}",
+              "# HELP onboarding_llm_cost_usd_total Estimated LLM cost in USD.",
+              "# TYPE onboarding_llm_cost_usd_total counter",
+              f"onboarding_llm_cost_usd_total {batch_metrics['cost']}"]
+
+    if stats:
+        lines += ["# HELP onboarding_teachers_total Teachers processed by outcome.",
+                  "# TYPE onboarding_teachers_total counter"]
+        for status in ("succeeded", "rejected", "duplicates", "failed"):
+            lines.append(f"onboarding_teachers_total{{{_labels(status=status)}}} {stats.get(status, 0)}")
+        lines += ["# HELP onboarding_batch_seconds Wall time of the last batch.",
+                  "# TYPE onboarding_batch_seconds gauge",
+                  f"onboarding_batch_seconds {stats.get('wall_time', 0.0)}"]
+
+    return "\n".join(lines) + "\n"
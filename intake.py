@@ -0,0 +1,95 @@
+from pydantic import ValidationError
+
+from config import normalize_subject
+from task_output import TeacherRecord
+
+REQUIRED_FIELDS = ("name", "subject", "experience", "email", "phone_number")
+
+
+class IntakeError(ValueError):
+    """Raised when a teacher record cannot be onboarded as given."""
+
+
+class MalformedRecordError(IntakeError):
+    """The record is free text or has missing/unreadable fields; the LLM may still extract it."""
+
+
+class RejectedRecordError(IntakeError):
+    """The record is well formed but can never be onboarded, e.g. its subject matches no role."""
+
+
+def _describe(error):
+    return "; ".join(
+        f"{'.'.join(str(part) for part in e['loc']) or 'record'}: {e['msg']}"
+        for e in error.errors()
+    )
+
+
+def validate_record(record):
+    """
+    Reject records that no role in TEACHER_ROLES can ever match.
+
+    Args:
+        record (TeacherRecord): A parsed teacher record
+
+    Returns:
+        TeacherRecord: The same record
+    """
+    if normalize_subject(record.subject) is None:
+        raise RejectedRecordError(f"Subject '{record.subject}' does not match any teacher role")
+    return record
+
+
+def parse_teacher(teacher):
+    """
+    Parse and validate a roster entry without calling an LLM.
+
+    Args:
+        teacher (dict | str): A roster dictionary (see onboard_teachers) or a
+        free-text description of the teacher
+
+    Returns:
+        TeacherRecord: The validated record
+
+    Raises:
+        MalformedRecordError: For free text or records with missing or unreadable
+            fields, which should go through LLM extraction instead
+        RejectedRecordError: For well-formed records that can never be onboarded
+    """
+    if not isinstance(teacher, dict):
+        raise MalformedRecordError("Free-text teacher record")
+
+    missing = [field for field in REQUIRED_FIELDS if not teacher.get(field)]
+    if missing:
+        raise MalformedRecordError(f"Missing fields: {', '.join(missing)}")
+
+    try:
+        record = TeacherRecord(**{field: teacher[field] for field in REQUIRED_FIELDS})
+    except ValidationError as e:
+        raise MalformedRecordError(_describe(e)) from e
+
+    return validate_record(record)
+
+
+def parse_extracted(data):
+    """
+    Validate a record extracted by the recruitment agent.
+
+    Args:
+        data (TeacherRecord | dict | str): The agent's structured output or its
+        raw JSON text
+
+    Returns:
+        TeacherRecord: The validated record
+    """
+    try:
+        if isinstance(data, TeacherRecord):
+            record = data
+        elif isinstance(data, dict):
+            record = TeacherRecord(**data)
+        else:
+            record = TeacherRecord.model_validate_json(data)
+    except ValidationError as e:
+        raise RejectedRecordError(f"Could not extract teacher details: {_describe(e)}") from e
+
+    return validate_record(record)
@@ -0,0 +1,157 @@
+import os
+import re
+from typing import Any
+
+from crewai.llms.base_llm import BaseLLM
+from langchain_core.callbacks import BaseCallbackHandler
+from langchain_core.load import dumps
+from langchain_core.messages import AIMessage, HumanMessage, SystemMessage
+from pydantic import Field, ValidationError
+
+from instrumentation import current_recorder, token_cost
+from llm_scheduler import LLM_COMPLETION_ESTIMATE
+
+# Ask models that support it for JSON matching the task's schema (OpenAI structured outputs)
+LLM_STRUCTURED_OUTPUT = os.getenv("LLM_STRUCTURED_OUTPUT", "1") == "1"
+# Models accepting a JSON schema as response_format; gpt-4 and gpt-3.5-turbo do not
+_STRUCTURED_OUTPUT_MODELS = re.compile(r"^(gpt-4o|gpt-4\.1|gpt-5|o[134])")
+
+_MESSAGE_TYPES = {
+    "system": SystemMessage,
+    "user": HumanMessage,
+    "assistant": AIMessage,
+}
+
+
+class ChatModelLLM(BaseLLM):
+    """
+    CrewAI LLM that delegates every call to a LangChain chat model.
+
+    CrewAI turns any LLM object it does not know into its own LiteLLM client,
+    which bypasses everything configured on the LangChain model: the response
+    cache, the instrumentation callbacks and any test double. Wrapping the
+    model keeps it in the call path.
+
+    Args:
+        model (str): Model name reported to CrewAI, e.g. "gpt-4"
+        chat_model (BaseChatModel): The LangChain chat model to call
+        scheduler (LLMScheduler): Rate-limit scheduler every call goes through, if
+        any. Calls the chat model's cache can answer skip it.
+
+    When CrewAI passes a task's ``response_model`` and the model supports
+    structured outputs, the model is asked for JSON matching its schema
+    instead of text in CrewAI's "Final Answer:" format.
+    """
+
+    chat_model: Any = Field(default=None, exclude=True)
+    scheduler: Any = Field(default=None, exclude=True)
+
+    def call(self, messages, tools=None, callbacks=None, available_functions=None, **kwargs):
+        if isinstance(messages, str):
+            messages = [{"role": "user", "content": messages}]
+
+        chat_messages = [
+            _MESSAGE_TYPES.get(message["role"], HumanMessage)(content=message["content"])
+            for message in messages
+        ]
+        options = {"stop": self.stop or None}
+        response_model = kwargs.get("response_model")
+        if response_model is not None and self.supports_response_schema():
+            options["response_format"] = response_format(response_model)
+
+        if self.scheduler is None:
+            response = self.chat_model.invoke(chat_messages, **options)
+        elif self._cached(chat_messages, options):
+            # Answered from the cache without a request, so no budget is reserved
+            self.scheduler.record_cached()
+            response = self.chat_model.invoke(chat_messages, **options)
+        else:
+            # Four characters per token is close enough to reserve rate-limit budget
+            estimated = sum(len(str(message.content)) for message in chat_messages) // 4 + LLM_COMPLETION_ESTIMATE
+            response = self.scheduler.call(lambda: self.chat_model.invoke(chat_messages, **options), estimated)
+            usage = getattr(response, "usage_metadata", None)
+            self.scheduler.settle(estimated, usage["total_tokens"] if usage else None)
+
+        content = response.content
+        if "response_format" in options:
+            # CrewAI finishes on JSON that validates and sends anything else
+            # through its text parser, which asks again for its format. Hand
+            # invalid JSON on as the final answer instead, for the task
+            # guardrail to reject with the reason
+            try:
+                response_model.model_validate_json(content)
+            except ValidationError:
+                content = f"Final Answer: {content}"
+        return content
+
+    def _cached(self, chat_messages, options):
+        # Same prompt and model string as the chat model's own cache lookup
+        cache = getattr(self.chat_model, "cache", None)
+        if not hasattr(cache, "contains"):
+            return False
+        options = dict(options)
+        llm_string = self.chat_model._get_llm_string(stop=options.pop("stop"), **options)
+        return cache.contains(dumps(chat_messages), llm_string)
+
+    def supports_function_calling(self):
+        return False
+
+    def supports_response_schema(self):
+        return LLM_STRUCTURED_OUTPUT and bool(_STRUCTURED_OUTPUT_MODELS.match(self.model))
+
+
+def response_format(model):
+    """
+    OpenAI ``response_format`` asking for JSON matching a pydantic model.
+
+    The schema is not strict: strict mode rejects free-form objects such as
+    RoleAssignment.management, and answers are validated by the task
+    guardrails anyway.
+    """
+    return {
+        "type": "json_schema",
+        "json_schema": {"name": model.__name__, "schema": model.model_json_schema()},
+    }
+
+
+class LLMCallbackHandler(BaseCallbackHandler):
+    """
+    LangChain callback recording every LLM call, with its token usage, as a
+    span of the current teacher's onboarding.
+    """
+
+    def __init__(self):
+        self._spans = {}
+
+    def on_chat_model_start(self, serialized, messages, *, run_id, **kwargs):
+        self._start(serialized, run_id, kwargs)
+
+    def on_llm_start(self, serialized, prompts, *, run_id, **kwargs):
+        self._start(serialized, run_id, kwargs)
+
+    def _start(self, serialized, run_id, kwargs):
+        recorder = current_recorder.get()
+        if recorder is None:
+            return
+        params = kwargs.get("invocation_params") or {}
+        model = params.get("model_name") or params.get("model") or (serialized or {}).get("name", "")
+        self._spans[run_id] = (recorder, recorder.start("llm", model=model))
+
+    def on_llm_end(self, response, *, run_id, **kwargs):
+        recorder, span = self._spans.pop(run_id, (None, None))
+        if span is None:
+            return
+        usage = (response.llm_output or {}).get("token_usage") or {}
+        prompt_tokens = usage.get("prompt_tokens", 0)
+        completion_tokens = usage.get("completion_tokens", 0)
+        span.attributes.update(
+            prompt_tokens=prompt_tokens,
+            completion_tokens=completion_tokens,
+            cost=token_cost(span.attributes.get("model", ""), prompt_tokens, completion_tokens),
+        )
+        recorder.end(span)
+
+    def on_llm_error(self, error, *, run_id, **kwargs):
+        recorder, span = self._spans.pop(run_id, (None, None))
+        if span is not None:
+            recorder.end(span, error=error)
@@ -0,0 +1,195 @@
+import hashlib
+import os
+import sqlite3
+import threading
+import time
+
+from langchain_core.caches import BaseCache
+from langchain_core.load import dumps, loads
+
+# Cache settings
+# Off by default unless LLM_DETERMINISTIC=1: at a non-zero temperature a cached
+# answer would replay one sample for every later call
+LLM_CACHE_ENABLED = os.getenv("LLM_CACHE_ENABLED", os.getenv("LLM_DETERMINISTIC", "0")) == "1"
+LLM_CACHE_BYPASS = os.getenv("LLM_CACHE_BYPASS", "0") == "1"
+LLM_CACHE_PATH = os.getenv("LLM_CACHE_PATH", os.path.join(".cache", "llm_cache.sqlite3"))
+LLM_CACHE_TTL = int(os.getenv("LLM_CACHE_TTL", str(7 * 24 * 3600)))
+LLM_CACHE_MAX_ENTRIES = int(os.getenv("LLM_CACHE_MAX_ENTRIES", "10000"))
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS llm_cache (
+    key TEXT PRIMARY KEY,
+    value TEXT NOT NULL,
+    created_at REAL NOT NULL,
+    last_used_at REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS llm_cache_last_used ON llm_cache (last_used_at);
+"""
+
+
+def cache_key(prompt, llm_string, version=""):
+    """
+    Content-addressed key for an LLM call.
+
+    ``llm_string`` is LangChain's serialization of the model configuration
+    (model name, temperature, seed, ...) and ``prompt`` the fully rendered
+    agent/task prompt, so two calls share a key only if they are identical.
+    ``version`` covers what the prompt does not show, such as the pipeline
+    and org configuration versions.
+    """
+    digest = hashlib.sha256()
+    digest.update(version.encode("utf-8"))
+    digest.update(b"\0")
+    digest.update(llm_string.encode("utf-8"))
+    digest.update(b"\0")
+    digest.update(prompt.encode("utf-8"))
+    return digest.hexdigest()
+
+
+class SQLiteLLMCache(BaseCache):
+    """
+    On-disk LangChain cache with TTL expiry and size-bounded LRU eviction.
+
+    Args:
+        path (str): SQLite database file
+        ttl (int): Seconds an entry stays valid; 0 disables expiry
+        max_entries (int): Entries kept before the least recently used are evicted
+        bypass (bool): Neither read nor write the cache, while still counting calls
+        version (callable): Returns the version entries are read and written
+        under, so a new version never gets the answers of an old one
+    """
+
+    def __init__(self, path=LLM_CACHE_PATH, ttl=LLM_CACHE_TTL, max_entries=LLM_CACHE_MAX_ENTRIES,
+                 bypass=LLM_CACHE_BYPASS, version=None):
+        self.path = path
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.bypass = bypass
+        self.version = version
+        self.hits = 0
+        self.misses = 0
+        self.bypassed = 0
+        self.evictions = 0
+
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.executescript(_SCHEMA)
+
+    def _key(self, prompt, llm_string):
+        return cache_key(prompt, llm_string, self.version() if self.version else "")
+
+    def lookup(self, prompt, llm_string):
+        if self.bypass:
+            with self._lock:
+                self.bypassed += 1
+            return None
+
+        key = self._key(prompt, llm_string)
+        now = time.time()
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT value, created_at FROM llm_cache WHERE key = ?", (key,)
+            ).fetchone()
+
+            if row is not None and self.ttl and now - row[1] > self.ttl:
+                self._conn.execute("DELETE FROM llm_cache WHERE key = ?", (key,))
+                self._conn.commit()
+                row = None
+
+            if row is None:
+                self.misses += 1
+                return None
+
+            self._conn.execute("UPDATE llm_cache SET last_used_at = ? WHERE key = ?", (now, key))
+            self._conn.commit()
+            self.hits += 1
+
+        return loads(row[0])
+
+    def contains(self, prompt, llm_string):
+        """
+        Whether a live entry is cached for the call, without counting a
+        lookup or refreshing the entry.
+        """
+        if self.bypass:
+            return False
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT created_at FROM llm_cache WHERE key = ?", (self._key(prompt, llm_string),)
+            ).fetchone()
+        return row is not None and not (self.ttl and time.time() - row[0] > self.ttl)
+
+    def update(self, prompt, llm_string, return_val):
+        if self.bypass:
+            return
+
+        key = self._key(prompt, llm_string)
+        now = time.time()
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO llm_cache (key, value, created_at, last_used_at) VALUES (?, ?, ?, ?)",
+                (key, dumps(list(return_val)), now, now)
+            )
+            self._evict()
+            self._conn.commit()
+
+    def _evict(self):
+        (count,) = self._conn.execute("SELECT COUNT(*) FROM llm_cache").fetchone()
+        excess = count - self.max_entries
+        if excess > 0:
+            self._conn.execute(
+                "DELETE FROM llm_cache WHERE key IN "
+                "(SELECT key FROM llm_cache ORDER BY last_used_at ASC LIMIT ?)",
+                (excess,)
+            )
+            self.evictions += excess
+
+    def clear(self, **kwargs):
+        with self._lock:
+            self._conn.execute("DELETE FROM llm_cache")
+            self._conn.commit()
+
+    def stats(self):
+        """
+        Hit/miss counters and current size of the cache.
+
+        Returns:
+            dict: hits, misses, bypassed, evictions, entries and hit_rate
+        """
+        with self._lock:
+            (entries,) = self._conn.execute("SELECT COUNT(*) FROM llm_cache").fetchone()
+            lookups = self.hits + self.misses
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "bypassed": self.bypassed,
+                "evictions": self.evictions,
+                "entries": entries,
+                "hit_rate": round(self.hits / lookups, 3) if lookups else 0.0,
+            }
+
+
+_cache = None
+_cache_lock = threading.Lock()
+
+
+def get_llm_cache(version=None):
+    """
+    Process-wide LLM cache, or None when LLM_CACHE_ENABLED is off.
+
+    Args:
+        version (callable): Version of the entries, see SQLiteLLMCache; only
+        used by the call that creates the cache
+    """
+    global _cache
+    if not LLM_CACHE_ENABLED:
+        return None
+    with _cache_lock:
+        if _cache is None:
+            _cache = SQLiteLLMCache(version=version)
+        return _cache
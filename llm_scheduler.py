@@ -0,0 +1,248 @@
+import heapq
+import itertools
+import logging
+import os
+import random
+import threading
+import time
+from contextvars import ContextVar
+
+# OpenAI limits of the account (GPT-4, usage tier 1 by default); 0 disables a limit
+LLM_RPM = float(os.getenv("LLM_RPM", "500"))
+LLM_TPM = float(os.getenv("LLM_TPM", "10000"))
+LLM_MAX_RETRIES = int(os.getenv("LLM_MAX_RETRIES", "6"))
+LLM_BACKOFF_BASE = float(os.getenv("LLM_BACKOFF_BASE", "1"))  # seconds before the first retry
+LLM_BACKOFF_MAX = float(os.getenv("LLM_BACKOFF_MAX", "60"))
+# Seconds of allowance that may be used at once; APIs enforce per-minute limits over shorter windows too
+LLM_BURST_SECONDS = float(os.getenv("LLM_BURST_SECONDS", "5"))
+# Completion tokens reserved per call until its real usage is known
+LLM_COMPLETION_ESTIMATE = int(os.getenv("LLM_COMPLETION_ESTIMATE", "500"))
+
+logger = logging.getLogger(__name__)
+
+# Lowest share of the configured rates the scheduler throttles down to after 429s
+_MIN_SCALE = 0.1
+
+# Scheduling priority of the current onboarding's LLM calls; lower goes first
+llm_priority = ContextVar("llm_priority", default=None)
+_tickets = itertools.count()
+
+
+def next_priority():
+    """
+    Priority for a new onboarding, below every onboarding started before it.
+
+    Onboardings already in progress therefore get the LLM first, so teachers
+    finish instead of every teacher in the batch being half done.
+    """
+    return next(_tickets)
+
+
+def _status_code(error):
+    status = getattr(error, "status_code", None)
+    if status is None:
+        status = getattr(getattr(error, "response", None), "status_code", None)
+    return status
+
+
+def retry_after(error):
+    """
+    Seconds the API asked to wait, from the Retry-After headers of an error.
+
+    Returns:
+        float: The delay, or None when the error carries none
+    """
+    headers = getattr(getattr(error, "response", None), "headers", None) or {}
+    headers = {name.lower(): value for name, value in headers.items()}
+    try:
+        if "retry-after-ms" in headers:
+            return float(headers["retry-after-ms"]) / 1000
+        if "retry-after" in headers:
+            return float(headers["retry-after"])
+    except ValueError:
+        pass
+    return None
+
+
+class TokenBucket:
+    """
+    Budget of a per-minute limit, refilled continuously.
+
+    The bucket holds ``burst`` seconds' worth of the limit and refills at
+    ``per_minute / 60`` per second times the scheduler's current scale.
+    """
+
+    def __init__(self, per_minute, burst=LLM_BURST_SECONDS):
+        self.rate = per_minute / 60
+        self.capacity = self.rate * burst
+        self.level = self.capacity
+        self.updated = time.monotonic()
+
+    def refill(self, now, scale):
+        self.level = min(self.capacity, self.level + (now - self.updated) * self.rate * scale)
+        self.updated = now
+
+    def wait_time(self, amount, scale):
+        """
+        Seconds until ``amount`` is available. Requests larger than the whole
+        bucket only wait for a full bucket.
+        """
+        missing = min(amount, self.capacity) - self.level
+        return missing / (self.rate * scale) if missing > 0 else 0.0
+
+
+class LLMScheduler:
+    """
+    Admission control shared by every LLM call in the process.
+
+    Each call reserves one request and its estimated tokens from per-minute
+    token buckets before it is sent, and settles the estimate against the
+    real usage afterwards. Calls wait in priority order, see next_priority().
+
+    A call refused with HTTP 429 pauses every call for the Retry-After the
+    API sent, or an exponential backoff, and halves the rate the buckets
+    refill at. Each successful call wins back part of it, so throughput
+    settles just below the limit the API actually enforces.
+
+    Args:
+        rpm (float): Requests per minute; 0 for no limit
+        tpm (float): Tokens per minute; 0 for no limit
+        max_retries (int): Retries of a call refused with 429 or a server error
+        backoff_base (float): Seconds before the first retry without Retry-After
+        backoff_max (float): Longest backoff
+    """
+
+    def __init__(self, rpm=LLM_RPM, tpm=LLM_TPM, max_retries=LLM_MAX_RETRIES, backoff_base=LLM_BACKOFF_BASE,
+                 backoff_max=LLM_BACKOFF_MAX):
+        self.requests = TokenBucket(rpm) if rpm > 0 else None
+        self.tokens = TokenBucket(tpm) if tpm > 0 else None
+        self.max_retries = max_retries
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self.scale = 1.0
+        self.stats = {"calls": 0, "cached": 0, "rate_limited": 0, "retries": 0, "wait_seconds": 0.0}
+        self._paused_until = 0.0
+        self._waiting = []
+        self._order = itertools.count()
+        self._cond = threading.Condition()
+
+    def _wait_time(self, tokens, now):
+        wait = self._paused_until - now
+        for bucket, amount in ((self.requests, 1), (self.tokens, tokens)):
+            if bucket is not None:
+                bucket.refill(now, self.scale)
+                wait = max(wait, bucket.wait_time(amount, self.scale))
+        return wait
+
+    def acquire(self, tokens, priority=None):
+        """
+        Block until the call may be sent, then reserve its request and tokens.
+
+        Args:
+            tokens (int): Estimated prompt plus completion tokens
+            priority (int): Lower goes first; defaults to llm_priority
+        """
+        if priority is None:
+            priority = llm_priority.get()
+        if priority is None:
+            priority = next_priority()
+        entry = (priority, next(self._order))
+        started = time.monotonic()
+
+        with self._cond:
+            heapq.heappush(self._waiting, entry)
+            try:
+                while True:
+                    timeout = None
+                    if self._waiting[0] == entry:
+                        timeout = self._wait_time(tokens, time.monotonic())
+                        if timeout <= 0:
+                            break
+                    self._cond.wait(timeout)
+
+                if self.requests is not None:
+                    self.requests.level -= 1
+                if self.tokens is not None:
+                    self.tokens.level -= tokens
+                self.stats["calls"] += 1
+                self.stats["wait_seconds"] += time.monotonic() - started
+            finally:
+                self._waiting.remove(entry)
+                heapq.heapify(self._waiting)
+                self._cond.notify_all()
+
+    def record_cached(self):
+        """
+        Count a call answered from the response cache, which takes no budget.
+        """
+        with self._cond:
+            self.stats["cached"] += 1
+
+    def settle(self, estimated, actual):
+        """
+        Correct a reservation once the call's real token usage is known.
+        """
+        if self.tokens is None or actual is None:
+            return
+        with self._cond:
+            self.tokens.level = min(self.tokens.capacity, self.tokens.level + estimated - actual)
+            self._cond.notify_all()
+
+    def backoff(self, delay, rate_limited=True):
+        """
+        Hold every call for ``delay`` seconds; after a 429, also halve the rate.
+
+        Calls refused together, while the scheduler is already backing off,
+        halve the rate only once.
+        """
+        with self._cond:
+            now = time.monotonic()
+            self.stats["retries"] += 1
+            if rate_limited:
+                self.stats["rate_limited"] += 1
+                if now >= self._paused_until:
+                    self.scale = max(_MIN_SCALE, self.scale / 2)
+                # The API says the budget is spent, whatever the buckets think
+                for bucket in (self.requests, self.tokens):
+                    if bucket is not None:
+                        bucket.refill(now, self.scale)
+                        bucket.level = min(bucket.level, 0.0)
+            self._paused_until = max(self._paused_until, now + delay)
+            self._cond.notify_all()
+
+    def _succeeded(self):
+        with self._cond:
+            self.scale = min(1.0, self.scale + 0.05)
+
+    def call(self, send, tokens):
+        """
+        Send an LLM call through the scheduler, retrying 429s and server errors.
+
+        Args:
+            send (callable): Makes the call and returns the response
+            tokens (int): Estimated prompt plus completion tokens
+
+        Returns:
+            object: The response of ``send``
+
+        Raises:
+            Exception: The last error, once the retries are used up
+        """
+        for attempt in range(self.max_retries + 1):
+            self.acquire(tokens)
+            try:
+                response = send()
+            except Exception as e:
+                status = _status_code(e)
+                retryable = status == 429 or (status or 0) >= 500 or type(e).__name__ in (
+                    "APIConnectionError", "APITimeoutError")
+                if not retryable or attempt == self.max_retries:
+                    raise
+                delay = retry_after(e)
+                if delay is None:
+                    delay = min(self.backoff_max, self.backoff_base * 2 ** attempt) * random.uniform(0.5, 1.0)
+                logger.warning("LLM call refused (%s), retrying in %.1fs", status or type(e).__name__, delay)
+                self.backoff(delay, rate_limited=status == 429)
+                continue
+            self._succeeded()
+            return response
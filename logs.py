@@ -0,0 +1,145 @@
+import atexit
+import json
+import logging
+import logging.handlers
+import os
+import queue
+import re
+import sys
+import threading
+from contextvars import ContextVar
+
+from batch import current_teacher
+
+# Logging settings. Production mode logs JSON and turns the agents' transcripts off
+PRODUCTION = os.getenv("ONBOARDING_PRODUCTION", "0") == "1"
+LOG_LEVEL = os.getenv("ONBOARDING_LOG_LEVEL", "INFO").upper()
+LOG_FORMAT = os.getenv("ONBOARDING_LOG_FORMAT", "json" if PRODUCTION else "text")  # "text" or "json"
+LOG_FILE = os.getenv("ONBOARDING_LOG_FILE")  # log to this file instead of stderr
+LOG_REDACT = os.getenv("ONBOARDING_LOG_REDACT", "1") == "1"  # mask email addresses and phone numbers
+# Stream each agent's reasoning and answers to stdout, as CrewAI's verbose mode does
+AGENT_VERBOSE = os.getenv("ONBOARDING_AGENT_VERBOSE", "0" if PRODUCTION else "1") == "1"
+
+# Identifies one onboarding attempt in the logs; the trace ID of its metrics when they are recorded
+correlation_id = ContextVar("correlation_id", default=None)
+
+_EMAIL = re.compile(r"([A-Za-z0-9._%+-])[A-Za-z0-9._%+-]*(@[A-Za-z0-9.-]+\.[A-Za-z]{2,})")
+# International numbers, or ten or more digits; shorter runs are more likely dates or counts
+_PHONE = re.compile(r"\+\d(?:[\s().-]?\d){6,}|\b\d(?:[().-]?\d){9,}\b")
+
+# Attributes every LogRecord has; anything else was passed in ``extra`` and goes into the JSON
+_RECORD_ATTRIBUTES = set(vars(logging.LogRecord("", 0, "", 0, "", (), None))) | {"message", "asctime"}
+
+# Libraries logging every HTTP request at INFO, Twilio with the recipient's number
+_NOISY_LOGGERS = ("httpx", "httpcore", "openai", "urllib3", "twilio")
+
+_listener = None
+_lock = threading.Lock()
+
+
+def redact(text):
+    """
+    Mask the email addresses and phone numbers in a text.
+
+    Enough is kept to tell records apart: the first letter and domain of an
+    email address and the last two digits of a phone number.
+    """
+    text = _EMAIL.sub(r"\1***\2", text)
+    return _PHONE.sub(lambda match: "***" + match.group()[-2:], text)
+
+
+class ContextFilter(logging.Filter):
+    """
+    Adds the hire ID and correlation ID of the onboarding being run to every
+    record, and masks personal data in the message when ``redact_pii`` is set.
+    """
+
+    def __init__(self, redact_pii=LOG_REDACT):
+        super().__init__()
+        self.redact_pii = redact_pii
+
+    def filter(self, record):
+        record.hire_id = current_teacher.get() or "-"
+        record.correlation_id = correlation_id.get() or "-"
+        if self.redact_pii:
+            record.msg = redact(record.getMessage())
+            record.args = None
+        return True
+
+
+class JsonFormatter(logging.Formatter):
+    """
+    One JSON object per line, with the fields passed in ``extra`` alongside
+    the message.
+    """
+
+    def format(self, record):
+        entry = {
+            "ts": round(record.created, 6),
+            "level": record.levelname,
+            "logger": record.name,
+            "hire_id": getattr(record, "hire_id", "-"),
+            "correlation_id": getattr(record, "correlation_id", "-"),
+            "message": record.getMessage(),
+        }
+        entry.update((key, value) for key, value in vars(record).items()
+                     if key not in _RECORD_ATTRIBUTES and key not in entry)
+        if record.exc_info:
+            entry["exception"] = self.formatException(record.exc_info)
+        return json.dumps(entry, ensure_ascii=False, default=str)
+
+
+def setup_logging(level=LOG_LEVEL, fmt=LOG_FORMAT, path=LOG_FILE, redact_pii=LOG_REDACT):
+    """
+    Send the project's logs through a background thread to stderr or a file.
+
+    Callers only put records on an in-memory queue; a QueueListener formats
+    and writes them, so onboarding threads never wait on the terminal or the
+    disk. Safe to call more than once; later calls do nothing. Libraries
+    importing main are left to configure logging themselves.
+
+    Args:
+        level (str): Lowest level logged, e.g. "INFO"
+        fmt (str): "text" or "json"
+        path (str): Log file, or None for stderr
+        redact_pii (bool): Mask email addresses and phone numbers in messages
+    """
+    global _listener
+    with _lock:
+        if _listener is not None:
+            return
+
+        if path:
+            directory = os.path.dirname(path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            handler = logging.FileHandler(path, encoding="utf-8")
+        else:
+            handler = logging.StreamHandler(sys.stderr)
+        if fmt == "json":
+            handler.setFormatter(JsonFormatter())
+        else:
+            handler.setFormatter(logging.Formatter("%(asctime)s %(levelname)-7s [%(hire_id)s] %(message)s", "%H:%M:%S"))
+
+        records = queue.SimpleQueue()
+        queue_handler = logging.handlers.QueueHandler(records)
+        # Filtered on the calling thread, where the onboarding's context variables are set
+        queue_handler.addFilter(ContextFilter(redact_pii))
+
+        root = logging.getLogger()
+        root.setLevel(level)
+        root.addHandler(queue_handler)
+        for name in _NOISY_LOGGERS:
+            logging.getLogger(name).setLevel(max(logging.WARNING, root.level))
+        _listener = logging.handlers.QueueListener(records, handler, respect_handler_level=True)
+        _listener.start()
+        atexit.register(_stop_listener)
+
+
+def _stop_listener():
+    global _listener
+    with _lock:
+        if _listener is not None:
+            # Writes out every record still queued
+            _listener.stop()
+            _listener = None
@@ -0,0 +1,219 @@
+import os
+import smtplib
+import threading
+import time
+from contextvars import ContextVar
+from queue import Queue, Empty
+
+# Bulk delivery settings
+BULK_EMAIL = os.getenv("BULK_EMAIL", "0") == "1"
+BULK_MAIL_CONNECTIONS = int(os.getenv("BULK_MAIL_CONNECTIONS", "2"))
+BULK_MAIL_RATE = float(os.getenv("BULK_MAIL_RATE", "2"))  # messages per second, all connections
+# Messages one run may send, below Gmail's 500 per day. Not tracked across runs, so
+# several runs on the same day must stay under the daily limit together
+BULK_MAIL_RUN_CAP = int(os.getenv("BULK_MAIL_RUN_CAP", "500"))
+BULK_MAIL_MAX_RETRIES = int(os.getenv("BULK_MAIL_MAX_RETRIES", "3"))
+BULK_MAIL_RETRY_DELAY = float(os.getenv("BULK_MAIL_RETRY_DELAY", "5"))
+
+# The BulkMailer collecting emails for the current onboard_teachers() run, if any
+active_mailer = ContextVar("active_mailer", default=None)
+
+
+class RateLimiter:
+    """
+    Spaces calls at least ``1 / rate`` seconds apart across all threads.
+    """
+
+    def __init__(self, rate):
+        self.interval = 1.0 / rate if rate > 0 else 0.0
+        self._next = 0.0
+        self._lock = threading.Lock()
+
+    def wait(self):
+        with self._lock:
+            now = time.monotonic()
+            start = max(now, self._next)
+            self._next = start + self.interval
+        if start > now:
+            time.sleep(start - now)
+
+    def hold(self, seconds):
+        """
+        Let no call through for ``seconds``, e.g. after the server asked to back off.
+        """
+        with self._lock:
+            self._next = max(self._next, time.monotonic() + seconds)
+
+
+class BulkMailer:
+    """
+    Queue emails during a batch and deliver them over a small pool of
+    authenticated SMTP sessions.
+
+    Each connection does STARTTLS and AUTH once and then sends messages
+    back-to-back. Transient 4xx replies are retried after ``retry_delay``
+    seconds; messages beyond ``run_cap`` are left "deferred".
+
+    Args:
+        smtp_settings (dict): host, port, tls, user and password, as used by MailSenderTool
+        mail_from (tuple): Display name and address of the sender
+        connections (int): Number of SMTP sessions delivering in parallel
+        rate (float): Maximum messages per second across all sessions
+        run_cap (int): Maximum messages this mailer will send
+        max_retries (int): Retries for messages rejected with a 4xx code
+        retry_delay (float): Seconds to wait before retrying deferred messages
+    """
+
+    def __init__(self, smtp_settings, mail_from, connections=BULK_MAIL_CONNECTIONS, rate=BULK_MAIL_RATE,
+                 run_cap=BULK_MAIL_RUN_CAP, max_retries=BULK_MAIL_MAX_RETRIES,
+                 retry_delay=BULK_MAIL_RETRY_DELAY):
+        self.smtp_settings = smtp_settings
+        self.mail_from = mail_from
+        self.connections = max(1, connections)
+        self.limiter = RateLimiter(rate)
+        self.run_cap = run_cap
+        self.max_retries = max_retries
+        self.retry_delay = retry_delay
+        self.sent = 0
+        self._pending = []
+        self._lock = threading.Lock()
+
+    def enqueue(self, key, recipient, subject, body):
+        """
+        Queue an email for the next flush().
+
+        Args:
+            key (str): Identifies the message in the flush() report, e.g. the teacher
+            recipient (str): Recipient address
+            subject (str): Subject line
+            body (str): Plain-text body
+
+        Returns:
+            str: Status message for the calling agent
+        """
+        with self._lock:
+            self._pending.append({
+                "key": key,
+                "recipient": recipient,
+                "subject": subject,
+                "body": body,
+                "attempts": 0,
+            })
+        return f"📬 Email to {recipient} queued for delivery"
+
+    def _connect(self):
+        settings = self.smtp_settings
+        client = smtplib.SMTP(settings["host"], settings["port"], timeout=30)
+        if settings.get("tls"):
+            client.starttls()
+        if settings.get("user"):
+            client.login(settings["user"], settings["password"])
+        return client
+
+    def _render(self, job):
+        import emails
+
+        message = emails.Message(subject=job["subject"], text=job["body"], mail_from=self.mail_from)
+        message.mail_to = job["recipient"]
+        return message.as_string()
+
+    def _deliver(self, client, job):
+        """
+        Send one message, returning (client, status). The client is replaced
+        when the session dropped and cleared when it could not be restored.
+        """
+        job["attempts"] += 1
+        try:
+            if client is None:
+                client = self._connect()
+            self.limiter.wait()
+            client.sendmail(self.smtp_settings.get("user") or self.mail_from[1], [job["recipient"]],
+                            self._render(job).encode("utf-8"))
+            return client, {"status": "sent", "code": 250}
+        except smtplib.SMTPRecipientsRefused as e:
+            code, reply = next(iter(e.recipients.values()))
+            return client, {"status": "retry" if 400 <= code < 500 else "failed", "code": code,
+                            "error": reply.decode("utf-8", "replace")}
+        except smtplib.SMTPResponseException as e:
+            error = e.smtp_error.decode("utf-8", "replace") if isinstance(e.smtp_error, bytes) else str(e.smtp_error)
+            return client, {"status": "retry" if 400 <= e.smtp_code < 500 else "failed", "code": e.smtp_code,
+                            "error": error}
+        except smtplib.SMTPServerDisconnected as e:
+            return None, {"status": "retry", "code": None, "error": str(e)}
+        except smtplib.SMTPException as e:
+            # e.g. SMTPNotSupportedError when the server offers no STARTTLS or
+            # AUTH; retrying will not help. Caught before OSError, its base class
+            return client, {"status": "failed", "code": None, "error": str(e)}
+        except OSError as e:
+            return None, {"status": "retry", "code": None, "error": str(e)}
+
+    def _worker(self, jobs, report, retries):
+        client = None
+        try:
+            while True:
+                try:
+                    job = jobs.get_nowait()
+                except Empty:
+                    break
+
+                with self._lock:
+                    over_cap = self.sent >= self.run_cap
+                    if not over_cap:
+                        self.sent += 1
+                if over_cap:
+                    report[job["key"]] = {"status": "deferred", "recipient": job["recipient"],
+                                          "attempts": job["attempts"], "error": "Sending cap of the run reached"}
+                    continue
+
+                client, status = self._deliver(client, job)
+                if status["status"] != "sent":
+                    with self._lock:
+                        self.sent -= 1
+                if status["status"] == "retry" and job["attempts"] <= self.max_retries:
+                    retries.append(job)
+                    continue
+                if status["status"] == "retry":
+                    status["status"] = "failed"
+
+                status.update(recipient=job["recipient"], attempts=job["attempts"])
+                report[job["key"]] = status
+        finally:
+            if client is not None:
+                try:
+                    client.quit()
+                except (smtplib.SMTPException, OSError):
+                    pass
+
+    def flush(self):
+        """
+        Deliver every queued email.
+
+        Returns:
+            dict: Per-message status keyed by the ``key`` given to enqueue(),
+            with "status" ("sent", "failed" or "deferred"), SMTP "code",
+            "attempts" and any "error"
+        """
+        with self._lock:
+            pending, self._pending = self._pending, []
+
+        report = {}
+        while pending:
+            jobs = Queue()
+            for job in pending:
+                jobs.put(job)
+            retries = []
+
+            workers = [
+                threading.Thread(target=self._worker, args=(jobs, report, retries), daemon=True)
+                for _ in range(min(self.connections, len(pending)))
+            ]
+            for worker in workers:
+                worker.start()
+            for worker in workers:
+                worker.join()
+
+            pending = retries
+            if pending:
+                time.sleep(self.retry_delay)
+
+        return report
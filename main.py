@@ -2,455 +2,697 @@ import sys
 import warnings
 warnings.filterwarnings('ignore')
 
-from crewai import Agent, Task, Crew
-from langchain_openai import ChatOpenAI
-from task_output import TaskOutput
-from config import get_suitable_role, get_role_resources, get_management_info, TEACHER_ROLES
-
-import os
-import emails
-from utils import get_openai_ap_key
 from dotenv import load_dotenv
-from twilio.rest import Client
-from slack_sdk import WebClient
 
+# Load .env before the project modules read their settings from the environment
 load_dotenv()
 
-# Access the API key
-api_key = os.getenv("OPENAI_API_KEY")
+from task_output import TeacherRecord, RoleAssignment, RoleResources, check_output, check_email_body, load_output
+from notifications import (
+    SENDERS, NotificationError, build_payloads, deferred_channels, failed_channels, get_dispatcher
+)
+from prompts import (
+    ROLE_ASSIGNMENT_BACKSTORY, FINALIZATION_BACKSTORY, FAST_FINALIZATION_BACKSTORY,
+    GATHER_INFO_DESCRIPTION, GATHER_INFO_EXPECTED_OUTPUT, ASSIGN_ROLE_DESCRIPTION, ASSIGN_ROLE_EXPECTED_OUTPUT,
+    PROVIDE_RESOURCES_DESCRIPTION, PROVIDE_RESOURCES_EXPECTED_OUTPUT, FINALIZE_ONBOARDING_DESCRIPTION,
+    FINALIZE_ONBOARDING_EXPECTED_OUTPUT, FAST_FINALIZE_ONBOARDING_DESCRIPTION
+)
+from config import ORG_CONFIG_PATH
+from org_config import OrgConfigWatcher, current_org, ORG_CONFIG_RELOAD_INTERVAL
+from batch import run_batch, iter_batch, RunningStats, current_teacher, current_teacher_name, DEFAULT_MAX_CONCURRENCY
+from fast_path import build_role_context, render_role_context, NoSuitableRoleError
+from intake import parse_teacher, parse_extracted, MalformedRecordError, RejectedRecordError
 
-if api_key is None:
-    raise ValueError("OPENAI_API_KEY not found in .env file")
+import os
+import json
+import time
+import hashlib
+import logging
+import secrets
+from functools import partial
+from senders import get_mail_sender, get_slack_sender, get_outbox_worker
+from slack_digest import active_digest, SLACK_DIGEST
+from llm_scheduler import llm_priority, next_priority
+from model_tiers import LLM_TIERS, LLM_TIER_MODELS, LLM_TIER_LIMITS, AGENT_TIERS, agent_tier, escalating, retry_budget
+from hire_registry import HireRegistry, DuplicateHireError, hire_id, HIRE_REGISTRY_ENABLED
+from clients import get_client, close_clients
+from logs import setup_logging, correlation_id, AGENT_VERBOSE
+from checkpoints import CheckpointStore, CHECKPOINTS_ENABLED
+from streaming import read_roster, completed_keys, JsonlSink
+from mailer import active_mailer, BULK_EMAIL
+from outbox import OUTBOX_ENABLED
+from instrumentation import (
+    Recorder, current_recorder, span, aggregate, export_jsonl, export_otel,
+    render_prometheus, METRICS_ENABLED, METRICS_PROMETHEUS_PATH
+)
 
-# Set OpenAI configuration
-os.environ["OPENAI_API_KEY"] = api_key
+# crewai, langchain and the channel SDKs take seconds to import, so they are
+# imported by the functions that need them. A dry run never loads them.
 
-# Configure CrewAI to use OpenAI
-llm = ChatOpenAI(model_name="gpt-4", temperature=0.7)
+# Deterministic mode pins temperature and seed, so cached responses are exactly
+# what a fresh call would return and are safe to reuse across runs
+LLM_DETERMINISTIC = os.getenv("LLM_DETERMINISTIC", "0") == "1"
+LLM_SEED = int(os.getenv("LLM_SEED", "42"))
 
+logger = logging.getLogger(__name__)
 
-from crewai.tools import tool
+# Crew LLMs by model tier, built on first use by get_llm()
+llms = {}
+# Processes splitting the account's LLM rate limits, each scheduling an equal
+# share; sharding.run_worker() raises it to the processes of the run
+llm_processes = max(1, int(os.getenv("LLM_PROCESSES", "1")))
 
-class MailSenderTool:
-    def __init__(self):
-        # Get email credentials from environment variables
-        email_user = os.getenv("EMAIL_USER")
-        email_password = os.getenv("EMAIL_PASSWORD")
-        
-        if not email_user or not email_password:
-            raise ValueError("Email credentials not found in environment variables")
-            
-        self.smtp_settings = {
-            "host": "smtp.gmail.com",
-            "port": 587,
-            "tls": True,
-            "user": email_user,
-            "password": email_password,
-        }
+# Seconds the CLI waits for the outbox to finish delivering before exiting
+OUTBOX_DRAIN_TIMEOUT = float(os.getenv("OUTBOX_DRAIN_TIMEOUT", "120"))
+
+def get_llm(tier=LLM_TIERS[-1]):
+    """
+    The LLM of a model tier, shared by every agent on that tier and created
+    on first use.
+
+    Args:
+        tier (str): One of model_tiers.LLM_TIERS
 
-    def send_email(self, recipient, subject, body):
-        message = emails.Message(
-            subject=subject,
-            text=body,
-            mail_from=("Boluwatife Lambe", self.smtp_settings["user"]),
+    Raises:
+        ValueError: If OPENAI_API_KEY is not set
+    """
+    if tier not in llms:
+        if os.getenv("OPENAI_API_KEY") is None:
+            raise ValueError("OPENAI_API_KEY not found in .env file")
+
+        from langchain_openai import ChatOpenAI
+        from llm import ChatModelLLM, LLMCallbackHandler
+        from llm_cache import get_llm_cache
+        from llm_scheduler import LLMScheduler
+
+        # Configure CrewAI to use OpenAI. The LangChain client is wrapped so its
+        # cache and callbacks stay in the call path (see llm.ChatModelLLM).
+        # Rate limits and retries are handled by the tier's shared scheduler,
+        # not the client; each model has its own limits
+        model = LLM_TIER_MODELS[tier]
+        rpm, tpm = (limit / llm_processes for limit in LLM_TIER_LIMITS[tier])
+        llms[tier] = ChatModelLLM(
+            model=model,
+            chat_model=ChatOpenAI(
+                model_name=model,
+                temperature=0 if LLM_DETERMINISTIC else 0.7,
+                seed=LLM_SEED if LLM_DETERMINISTIC else None,
+                max_retries=0,
+                cache=get_llm_cache(version=cache_version),
+                callbacks=[LLMCallbackHandler()] if METRICS_ENABLED else None
+            ),
+            scheduler=get_client(f"llm_scheduler.{tier}", lambda: LLMScheduler(rpm=rpm, tpm=tpm))
         )
-        
-        response = message.send(to=recipient, smtp=self.smtp_settings)
-        
-        if response.status_code == 250:
-            return f"✅ Email sent to {recipient}"
-        else:
-            return f"❌ Failed to send email. Status: {response.status_code}"
-
-class WhatsappMessageSenderTool:
-    def __init__(self):
-        # Get whatsapp credentials from environment variables
-        self.account_sid = os.getenv("TWILIO_ACCOUNT_SID")
-        self.auth_token = os.getenv("TWILIO_AUTH_TOKEN")
-        self.whatsapp_from = os.getenv("WHATSAPP_FROM_NUMBER")
-
-        print(f"WhatsApp Configuration:")
-        print(f"Account SID: {self.account_sid[:10]}...")  # Only show first 10 chars for security
-        print(f"From Number: {self.whatsapp_from}")
-        print(f"NOTE: For trial accounts, recipients must first join your sandbox by sending")
-        print(f"'join <your-sandbox-keyword>' to {self.whatsapp_from}")
-
-        if not all([self.account_sid, self.auth_token, self.whatsapp_from]):
-            missing = []
-            if not self.account_sid: missing.append("TWILIO_ACCOUNT_SID")
-            if not self.auth_token: missing.append("TWILIO_AUTH_TOKEN")
-            if not self.whatsapp_from: missing.append("WHATSAPP_FROM_NUMBER")
-            raise ValueError(f"Missing required WhatsApp configuration in environment variables: {', '.join(missing)}")
+    return llms[tier]
+
+# "full" runs all four agents; "fast" resolves role, resources and management
+# in Python and only uses the recruitment and finalization agents
+PIPELINE_MODES = ("full", "fast")
+PIPELINE_MODE = os.getenv("ONBOARDING_PIPELINE_MODE", "full")
+
+# Task names of each pipeline mode, in execution order
+PIPELINE_TASKS = {
+    "full": ("gather_info", "assign_role", "provide_resources", "finalize_onboarding"),
+    "fast": ("gather_info", "finalize_onboarding"),
+}
+
+# Bump when the pipeline changes in a way the prompt fingerprint does not
+# catch, e.g. another model, so checkpoints of the old pipeline are not resumed
+PIPELINE_VERSION = "1"
+
+def create_agents(mode="full"):
+    """
+    Build a fresh set of onboarding agents.
+
+    Agents keep per-run state (memory, tool usage, delegation history), so every
+    crew gets its own instances instead of sharing module-level ones.
 
-        try:
-            self.client = Client(self.account_sid, self.auth_token)
-            print("✅ Successfully initialized Twilio client")
-        except Exception as e:
-            print(f"❌ Failed to initialize Twilio client: {str(e)}")
-            raise
-
-    def send_message(self, phone_number: str, message_body: str) -> str:
-        """Send a WhatsApp message to the specified phone number.
-        
-        Args:
-            phone_number (str): The recipient's phone number in international format (e.g., +2348012345678)
-            message_body (str): The message to send
-        
-        Returns:
-            str: Status message indicating whether the message was sent successfully
-        """
-        try:
-            from_whatsapp = f"whatsapp:{self.whatsapp_from}"
-            to_whatsapp = f"whatsapp:{phone_number}"
-            
-            print(f"\nSending WhatsApp message:")
-            print(f"From: {from_whatsapp}")
-            print(f"To: {to_whatsapp}")
-            print(f"Message: {message_body}")
-            
-            message = self.client.messages.create(
-                from_=from_whatsapp,
-                body=message_body,
-                to=to_whatsapp
-            )
-            print(f"✅ Message sent successfully. SID: {message.sid}")
-            return f"✅ WhatsApp message sent to {phone_number}"
-        except Exception as e:
-            error_msg = f"❌ Error sending WhatsApp message: {str(e)}"
-            print(error_msg)
-            return error_msg
-
-class SlackMessageSenderTool:
-    def __init__(self):
-        # Get Slack credentials from environment variables
-        self.slack_token = os.getenv("SLACK_BOT_TOKEN")
-        self.channel_id = os.getenv("SLACK_CHANNEL_ID")
-        
-        if not self.slack_token or not self.channel_id:
-            missing = []
-            if not self.slack_token: missing.append("SLACK_BOT_TOKEN")
-            if not self.channel_id: missing.append("SLACK_CHANNEL_ID")
-            raise ValueError(f"Missing required Slack configuration in environment variables: {', '.join(missing)}")
-        
-        try:
-            self.client = WebClient(token=self.slack_token)
-            print("✅ Successfully initialized Slack client")
-        except Exception as e:
-            print(f"❌ Failed to initialize Slack client: {str(e)}")
-            raise
-
-    def send_message(self, message: str) -> str:
-        """
-        Send a message to the school's Slack channel.
-        
-        Args:
-            message (str): The formatted message to send
-        
-        Returns:
-            str: Status message indicating whether the message was sent successfully
-        """
-        try:
-            # Send the message to the specified channel
-            response = self.client.chat_postMessage(
-                channel=self.channel_id,
-                text=message,
-                unfurl_links=False
-            )
-            
-            if response["ok"]:
-                return "✅ Successfully sent Slack welcome message"
-            else:
-                return f"❌ Failed to send Slack message: {response['error']}"
-                
-        except Exception as e:
-            return f"❌ Error sending Slack message: {str(e)}"
-
-@tool("Email Sender")
-def send_emails(onboarding_data: str) -> str:
-    """Send onboarding email to the newly appointed teacher.
-    
     Args:
-        onboarding_data (str): JSON string containing teacher's email and the email body
-    
+        mode (str): Pipeline mode, one of PIPELINE_MODES. The "fast" mode has no
+        role assignment or resources agents.
+
     Returns:
-        str: Status message indicating whether the email was sent successfully
+        dict: Agents keyed by pipeline stage
     """
-    try:
-        # Parse the onboarding data
-        import json
-        data = json.loads(onboarding_data)
-        
-        # Send the email using the exact body from the finalization agent
-        mail_sender = MailSenderTool()
-        result = mail_sender.send_email(
-            recipient=data['email'],
-            subject=f"Welcome to Glorylink Schools - Your Onboarding Information",
-            body=data['email_body']
-        )
-        
-        return result
-    except Exception as e:
-        return f"❌ Error sending email: {str(e)}"
+    from crewai import Agent
+
+    recruitment_agent = Agent(
+        name="Recruitment Agent",
+        role="Recruitment Agent",
+        goal="Handles teacher onboarding by collecting and verifying necessary details.",
+        backstory="You are a recruitment agent that collects and verifies information of newly appointed teachers. You ensure all required details are accurate and complete.",
+        llm=get_llm(agent_tier("recruitment")),
+        allow_delegation=False,
+        verbose=AGENT_VERBOSE
+    )
+
+    finalization_agent = Agent(
+        name="Finalization Agent",
+        role="Finalization Agent",
+        goal="Ensures all onboarding steps are completed and documented with detailed information",
+        backstory=FAST_FINALIZATION_BACKSTORY if mode == "fast" else FINALIZATION_BACKSTORY,
+        llm=get_llm(agent_tier("finalization")),
+        allow_delegation=False,
+        verbose=AGENT_VERBOSE
+    )
+
+    if mode == "fast":
+        return {
+            "recruitment": recruitment_agent,
+            "finalization": finalization_agent,
+        }
+
+    role_assignment_agent = Agent(
+        name="Role Assignment Agent",
+        role="Role Assignment Agent",
+        goal="Determines the best role for a teacher based on predefined role requirements and provides complete role details.",
+        backstory=ROLE_ASSIGNMENT_BACKSTORY,
+        llm=get_llm(agent_tier("role_assignment")),
+        allow_delegation=False,
+        verbose=AGENT_VERBOSE
+    )
+
+    resources_agent = Agent(
+        name="Resources Agent",
+        role="Resources Agent",
+        goal="Provides the teacher with role-specific resources and materials.",
+        backstory="You are a resources agent that ensures teachers receive all necessary resources based on their assigned role. You maintain an organized system for resource distribution.",
+        llm=get_llm(agent_tier("resources")),
+        allow_delegation=False,
+        verbose=AGENT_VERBOSE
+    )
+
+    return {
+        "recruitment": recruitment_agent,
+        "role_assignment": role_assignment_agent,
+        "resources": resources_agent,
+        "finalization": finalization_agent,
+    }
+
+def output_contract(agents, key, model=None):
+    """
+    Task fields making an agent's answer follow a contract.
+
+    Structured answers must be JSON matching ``model``, which is also passed
+    to the LLM as the task's response_model so models supporting structured
+    outputs answer in that schema. Without a model the answer is the email
+    body. An answer breaking the contract is retried on a stronger model or
+    repaired, a bounded number of times (see model_tiers.escalating).
 
-@tool("Whatsapp Message")
-def send_whatsapp_message(onboarding_data: str) -> str:
-    """Send onboarding whatsapp message to the newly appointed teacher.
-    
     Args:
-        onboarding_data (str): JSON string containing teacher's phone number and message body
-    
+        agents (dict): Agents as returned by create_agents()
+        key (str): Key of the agent answering the task
+        model (type): Pydantic model of a structured answer
+
     Returns:
-        str: Status message indicating whether the message was sent successfully
+        dict: Keyword arguments for crewai.Task
     """
-    try:
-        # Parse the onboarding data
-        import json
-        data = json.loads(onboarding_data)
-        
-        # Send the WhatsApp message
-        whatsapp_sender = WhatsappMessageSenderTool()
-        result = whatsapp_sender.send_message(
-            phone_number=data['phone_number'],
-            message_body=data['message_body']
-        )
-        
-        return result
-    except Exception as e:
-        return f"❌ Error in WhatsApp message sending process: {str(e)}"
+    tier = agent_tier(key)
+    return {
+        "response_model": model,
+        "guardrail": escalating(check_output(model) if model else check_email_body, agents[key], tier, get_llm),
+        "guardrail_max_retries": retry_budget(tier),
+    }
+
+def create_tasks(agents, mode="full"):
+    """
+    Build the onboarding task chain for a set of agents.
 
-@tool("Slack Message")
-def send_slack_message(onboarding_data: str) -> str:
-    """Send welcome message to school's Slack channel about the newly appointed teacher.
-    
     Args:
-        onboarding_data (str): JSON string containing teacher's information and message_body
-    
+        agents (dict): Agents as returned by create_agents()
+        mode (str): Pipeline mode, one of PIPELINE_MODES
+
     Returns:
-        str: Status message indicating whether the message was sent successfully
+        list: Tasks in execution order
     """
-    try:
-        # Parse the onboarding data
-        import json
-        data = json.loads(onboarding_data)
-        
-        if 'message_body' not in data:
-            return "❌ Error: message_body not found in onboarding data"
-        
-        # Send the Slack message
-        slack_sender = SlackMessageSenderTool()
-        result = slack_sender.send_message(data['message_body'])
-        
-        return result
-    except json.JSONDecodeError as e:
-        return f"❌ Error parsing onboarding data: {str(e)}"
-    except Exception as e:
-        return f"❌ Error in send_slack_message: {str(e)}"
-
-# Define Agents
-recruitment_agent = Agent(
-    name="Recruitment Agent",
-    role="Recruitment Agent",
-    goal="Handles teacher onboarding by collecting and verifying necessary details.",
-    backstory="You are a recruitment agent that collects and verifies information of newly appointed teachers. You ensure all required details are accurate and complete.",
-    llm=llm,
-    allow_delegation=False,
-    verbose=True
-)
+    from crewai import Task
+
+    gather_info_task = Task(
+        name="gather_info",
+        description=GATHER_INFO_DESCRIPTION,
+        agent=agents["recruitment"],
+        expected_output=GATHER_INFO_EXPECTED_OUTPUT,
+        **output_contract(agents, "recruitment", TeacherRecord)
+    )
 
-role_assignment_agent = Agent(
-    name="Role Assignment Agent",
-    role="Role Assignment Agent",
-    goal="Determines the best role for a teacher based on predefined role requirements and provides complete role details.",
-    backstory="""You are a role assignment agent responsible for:
-    1. Analyzing teacher qualifications against predefined role requirements
-    2. Using the get_suitable_role() function to determine the appropriate role
-    3. Using get_management_info() to get management details
-    4. Providing a detailed response that includes:
-       - Assigned Role Title
-       - Justification for the role assignment
-       - Management Structure Details:
-      * Direct Supervisor's full name, role, email, office location, and office hours
-      * Department Admin's name, email, office location, and phone number
-      * Team meeting schedule
-      * Any role-specific information (such as mentoring program details)
-
-    You ensure all information is accurate and complete before passing it to the next stage.""",
-    llm=llm,
-    allow_delegation=False,
-    verbose=True
-)
+    if mode == "fast":
+        finalize_onboarding_task = Task(
+            name="finalize_onboarding",
+            description=FAST_FINALIZE_ONBOARDING_DESCRIPTION,
+            context=[gather_info_task],
+            agent=agents["finalization"],
+            expected_output=FINALIZE_ONBOARDING_EXPECTED_OUTPUT,
+            **output_contract(agents, "finalization")
+        )
+        return [gather_info_task, finalize_onboarding_task]
+
+    assign_role_task = Task(
+        name="assign_role",
+        description=ASSIGN_ROLE_DESCRIPTION,
+        context=[gather_info_task],
+        agent=agents["role_assignment"],
+        expected_output=ASSIGN_ROLE_EXPECTED_OUTPUT,
+        **output_contract(agents, "role_assignment", RoleAssignment)
+    )
 
-resources_agent = Agent(
-    name="Resources Agent",
-    role="Resources Agent",
-    goal="Provides the teacher with role-specific resources and materials.",
-    backstory="You are a resources agent that ensures teachers receive all necessary resources based on their assigned role. You maintain an organized system for resource distribution.",
-    llm=llm,
-    allow_delegation=False,
-    verbose=True
-)
+    provide_resources_task = Task(
+        name="provide_resources",
+        description=PROVIDE_RESOURCES_DESCRIPTION,
+        context=[assign_role_task],
+        agent=agents["resources"],
+        expected_output=PROVIDE_RESOURCES_EXPECTED_OUTPUT,
+        **output_contract(agents, "resources", RoleResources)
+    )
 
-finalization_agent = Agent(
-    name="Finalization Agent",
-    role="Finalization Agent",
-    goal="Ensures all onboarding steps are completed and documented with detailed information",
-    backstory="""You are a finalization agent that confirms all onboarding steps are properly completed and documented. 
-    You ensure a smooth transition for new teachers by sending a comprehensive welcome email that includes:
-    1. Their assigned role (either senior, junior, or others) and responsibilities
-    2. Available resources and how to access them
-    3. Management structure details (generate appropriate details for):
-       - Direct supervisor's information (Mrs. Jane Smith, Head of Mathematics Department, jane.smith@glorylinkschools.com)
-       - Department admin's information (Mr. Mark Johnson, mark.johnson@glorylinkschools.com)
-       - Team meetings: every Monday at 3:00 PM)
-       - Mentoring program details (if applicable)
-    4. Next steps and important dates:
-       - First day orientation: Monday, February 24, 2025, 9:00 AM
-       - Department meeting: Tuesday, February 25, 2025, 2:00 PM
-       - IT system training: Wednesday, February 26, 2025, 10:00 AM
-       - First team meeting: According to role's schedule in first week
-       - Required documentation submission deadline: Friday, February 28, 2025
-    
-    The email should be professional, welcoming, and include all necessary details for the teacher to start successfully.
-    
-    The email must be signed with the following format:
+    finalize_onboarding_task = Task(
+        name="finalize_onboarding",
+        description=FINALIZE_ONBOARDING_DESCRIPTION,
+        context=[gather_info_task, assign_role_task, provide_resources_task],
+        agent=agents["finalization"],
+        expected_output=FINALIZE_ONBOARDING_EXPECTED_OUTPUT,
+        **output_contract(agents, "finalization")
+    )
 
-    Best regards,
-    
-    Boluwatife Lambe
-    Principal
-    Glorylink Schools
-    Email: boluwatifelambe@gmail.com
-    Tel: +2348083647531
-    """,
-    llm=llm,
-    tools=[send_emails, send_whatsapp_message, send_slack_message],
-    allow_delegation=False,
-    verbose=True
-)
+    return [gather_info_task, assign_role_task, provide_resources_task, finalize_onboarding_task]
 
-# Define Tasks
-gather_info_task = Task(
-    description="""Collect and verify teacher details: {teacher_info}. 
-    Extract and structure the following information:
-    - Full Name
-    - Subject
-    - Years of Experience
-    - Email
-    - Phone Number
-    Return this information in a clear, structured format.""",
-    agent=recruitment_agent,
-    expected_output="Structured teacher details including name, subject expertise, email, phone number and experience"
-)
+def create_onboarding_crew(mode="full", record=None, completed=None):
+    """
+    Build an isolated crew for a single onboarding run.
 
-assign_role_task = Task(
-    description="""Based on the verified teacher details, determine their role and provide complete role information.
-
-    Process:
-    1. Extract teacher's subject and experience from the input
-    2. Use get_suitable_role(subject, experience) to determine the appropriate role
-    3. Use get_management_info(role) to get management details
-    4. Compile a complete response that includes role assignment and management details
-
-    Your response must include:
-    - Assigned Role Title
-    - Justification for the role assignment
-    - Management Structure Details:
-      * Direct Supervisor's full name, role, email, office location, and office hours
-      * Department Admin's name, email, office location, and phone number
-      * Team meeting schedule
-      * Any role-specific information (such as mentoring program details)
-
-    Ensure you provide actual data from the management structure for all fields.
-    Return a structured response and format your response as a clear, structured output that can be easily used by the next task.""",
-    context=[gather_info_task],
-    agent=role_assignment_agent,
-    expected_output="Complete role assignment details including role, justification, and full management structure",
-)
+    Args:
+        mode (str): Pipeline mode, one of PIPELINE_MODES
+        record (TeacherRecord): The teacher's parsed intake record, if any. When
+        given, gather_info_task is answered from the record instead of the LLM.
+        completed (dict): Raw outputs of tasks an earlier run completed, keyed
+        by task name. The crew starts at the first task not found here, and
+        later tasks see the earlier outputs as their context.
+    """
+    if mode not in PIPELINE_MODES:
+        raise ValueError(f"Unknown pipeline mode '{mode}', expected one of {PIPELINE_MODES}")
 
-provide_resources_task = Task(
-    description="""Using the assigned role, compile a complete list of resources to be provided.
-    Use get_role_resources() to get the role-specific resources.
-    
-    Include specific details about:
-    - Software tools and access credentials
-    - Teaching materials and textbooks
-    - Administrative supplies
-    - Professional development resources
-    
-    Return a structured list of all resources with access/usage instructions.""",
-    context=[assign_role_task],
-    agent=resources_agent,
-    expected_output="Detailed list of role-specific resources with access instructions",
-)
+    from crewai import Crew
+    from crewai.tasks.task_output import TaskOutput as CrewTaskOutput
 
-finalize_onboarding_task = Task(
-    description="""Using the collected and verified teacher information, send the final onboarding communications:
-    
-    1. Send a detailed welcome email containing:
-       - A warm welcome message
-       - Their assigned role and specific responsibilities
-       - Available resources with access instructions:
-         * Teacher's Dashboard
-         * Online Assessment Tool
-         * Grade-Specific Textbooks
-         * Digital Learning Resources
-         * Grade Book
-         * Classroom Supplies
-         * Professional Development Workshops
-       - Management structure:
-         * Direct supervisor: Mrs. Jane Smith (Head of Mathematics Department)
-         * Department admin: Mr. Mark Johnson
-         * Team meetings: Every Monday at 3:00 PM
-         * Mentoring program details (if senior teacher)
-       - Important dates:
-         * First day orientation: Monday, February 24, 2025, 9:00 AM
-         * Department meeting: Tuesday, February 25, 2025, 2:00 PM
-         * IT system training: Wednesday, February 26, 2025, 10:00 AM
-         * Documentation deadline: Friday, February 28, 2025
-       
-       The email must end with this exact signature format:
-
-       Best regards,
-
-       Boluwatife Lambe
-       Principal
-       Glorylink Schools
-       Email: boluwatifelambe@gmail.com
-       Tel: +2348083647531
-    
-    2. Send a WhatsApp message with the following format:
-       "🎉 Congratulations [Teacher Name]! Your onboarding to Glorylink Schools is complete. We've sent a detailed welcome package to your email ([Email Address]). Please check it for important information about your role and next steps. We're excited to have you join our team! 🌟"
-    
-    3. Send a Slack announcement to the school channel that:
-       - Introduces the new teacher to the school community
-       - Highlights their background and expertise
-       - Creates excitement about their addition to the team
-       - Uses appropriate Slack formatting and emojis
-       - Encourages a warm welcome from colleagues
-    
-    For all communications:
-    1. Use the teacher's information from the gather_info_task output
-    2. Use the send_emails tool for email (pass a JSON with 'email' and 'email_body')
-    3. Use the send_whatsapp_message tool for WhatsApp (pass a JSON with 'phone_number' and 'message_body')
-    4. Use the send_slack_message tool for Slack (pass a JSON with 'message_body')
-    
-    Ensure ALL placeholder text is replaced with actual information from the previous tasks.""",
-    context=[gather_info_task, assign_role_task, provide_resources_task],
-    agent=finalization_agent,
-    expected_output="Confirmation of completed onboarding with detailed welcome email, WhatsApp message, and Slack announcement sent"
-)
+    agents = create_agents(mode)
+    tasks = create_tasks(agents, mode)
+
+    outputs = {name: (raw, None) for name, raw in (completed or {}).items()}
+    if record is not None:
+        outputs["gather_info"] = (record.to_context(), record)
+
+    # Leading tasks that already have an output are answered from it instead
+    # of the LLM; a task missing its output means every later one runs again
+    while tasks and tasks[0].name in outputs:
+        task = tasks.pop(0)
+        raw, pydantic = outputs[task.name]
+        task.output = CrewTaskOutput(description=task.description, raw=raw, pydantic=pydantic, agent=task.agent.role)
 
-def create_onboarding_crew():
     return Crew(
-        agents=[recruitment_agent, role_assignment_agent, resources_agent, finalization_agent],
-        tasks=[gather_info_task, assign_role_task, provide_resources_task, finalize_onboarding_task],
-        verbose=True
+        agents=[agent for agent in agents.values() if any(task.agent is agent for task in tasks)],
+        tasks=tasks,
+        verbose=AGENT_VERBOSE
+    )
+
+def pipeline_version(mode):
+    """
+    Version the checkpoints of a pipeline mode are stored under.
+
+    Combines PIPELINE_VERSION, the mode, a fingerprint of the prompts and the
+    org configuration version, so outputs produced with different prompts or
+    roles are never resumed.
+    """
+    prompts = (
+        ROLE_ASSIGNMENT_BACKSTORY, FINALIZATION_BACKSTORY, FAST_FINALIZATION_BACKSTORY, GATHER_INFO_DESCRIPTION,
+        ASSIGN_ROLE_DESCRIPTION, PROVIDE_RESOURCES_DESCRIPTION, FINALIZE_ONBOARDING_DESCRIPTION,
+        FAST_FINALIZE_ONBOARDING_DESCRIPTION, GATHER_INFO_EXPECTED_OUTPUT, ASSIGN_ROLE_EXPECTED_OUTPUT,
+        PROVIDE_RESOURCES_EXPECTED_OUTPUT, FINALIZE_ONBOARDING_EXPECTED_OUTPUT,
+        # The model each agent starts on
+        *(f"{agent}={LLM_TIER_MODELS[agent_tier(agent)]}" for agent in sorted(AGENT_TIERS)),
     )
+    fingerprint = hashlib.sha256("\0".join(prompts).encode("utf-8")).hexdigest()[:12]
+    return f"{PIPELINE_VERSION}:{mode}:{fingerprint}:{current_org().version}"
 
-def onboard_teachers(teachers_list):
+def cache_version():
+    """
+    Version LLM cache entries are stored under: PIPELINE_VERSION and the org
+    configuration version. The prompts and model are part of the key already.
+    """
+    return f"{PIPELINE_VERSION}:{current_org().version}"
+
+def checkpoint_callback(checkpoints, teacher, version, task, callback=None):
+    """
+    Task callback that calls ``callback`` and then saves the task's output.
+    """
+    def finished(output):
+        if callback is not None:
+            callback(output)
+        checkpoints.save(teacher, version, task, output.raw)
+    return finished
+
+def describe_teacher(teacher):
+    """
+    Describe a roster entry as text for the recruitment agent.
+    """
+    if isinstance(teacher, dict):
+        return ", ".join(f"{field.replace('_', ' ').title()}: {value}" for field, value in teacher.items())
+    return str(teacher)
+
+def extract_teacher_record(teacher):
+    """
+    Fall back to the recruitment agent for free-text or malformed records.
+
+    Args:
+        teacher (dict | str): The roster entry that failed intake parsing
+
+    Returns:
+        TeacherRecord: The validated record extracted by the agent
+    """
+    from crewai import Task, Crew
+
+    agents = create_agents("fast")
+    agent = agents["recruitment"]
+    task = Task(
+        description=GATHER_INFO_DESCRIPTION,
+        agent=agent,
+        expected_output=GATHER_INFO_EXPECTED_OUTPUT,
+        **output_contract(agents, "recruitment", TeacherRecord)
+    )
+    result = Crew(agents=[agent], tasks=[task], verbose=AGENT_VERBOSE).kickoff(
+        inputs={"teacher_info": describe_teacher(teacher)}
+    )
+    return parse_extracted(result.pydantic or result.raw)
+
+def teacher_name(teacher):
+    """
+    Name of a roster entry, used to key the results.
+    """
+    if isinstance(teacher, dict) and teacher.get('name'):
+        return teacher['name']
+    return describe_teacher(teacher)[:60]
+
+def assigned_role(record, outputs):
+    """
+    Role chosen by the role assignment agent, checked against the org configuration.
+
+    Args:
+        record (TeacherRecord): The parsed teacher record
+        outputs (dict): Task outputs keyed by task name: the validated model of
+        structured answers, raw text otherwise
+
+    Returns:
+        tuple: (role title, responsibilities). Falls back to the configured
+        role lookup when the agent's answer names no known role.
+    """
+    org = current_org()
+    assignment = outputs.get("assign_role")
+    if not isinstance(assignment, RoleAssignment):
+        # Resumed from a checkpoint, which stores the raw answer
+        assignment = load_output(RoleAssignment, assignment or "")
+    role = assignment.role if assignment is not None else None
+    if role not in org.teacher_roles:
+        role = org.role_index.lookup(record.subject, record.experience)
+    if role is None:
+        return "Teacher", []
+    return role, org.teacher_roles[role]["requirements"].get("responsibilities", [])
+
+def onboard_teacher(teacher, mode="full"):
+    """
+    Onboard a single teacher on its own crew.
+
+    Well-formed records are parsed without an LLM and skip gather_info_task;
+    free-text or malformed records are extracted by the recruitment agent.
+    Records that can never match a role are rejected before any LLM call. In
+    "fast" mode the role, resources and management structure are resolved in
+    Python as well, leaving the finalization task as the only LLM call. Once
+    the finalization agent has written the welcome email, the email, WhatsApp
+    message and Slack announcement are sent concurrently.
+
+    Every completed task is checkpointed, so when a run fails, the next one
+    for the same teacher resumes at the first task that did not complete.
+    Checkpoints are cleared once the teacher is onboarded or rejected.
+
+    The hire is claimed in the hire registry right after intake. A teacher
+    already onboarded or in progress under the same email address or phone
+    number is reported as a "duplicate" without any LLM or notification work.
+    The hire is only marked onboarded once every channel was sent or queued
+    in the outbox. If a channel fails, the teacher is reported as failed and
+    the claim is released, so a re-run sends the failed channels again.
+    Emails and introductions left for the batch's bulk mailer or Slack digest
+    are listed in "deferred" and settled by finish_deferred().
+
+    Args:
+        teacher (dict | str): Teacher information, see onboard_teachers()
+        mode (str): Pipeline mode, one of PIPELINE_MODES
+
+    Returns:
+        dict: Result with "status", the teacher's "hire_id" and "name", and
+        either "result" or "error", plus the teacher's per-stage "metrics" when
+        instrumentation is enabled. A successful result has the status of each
+        channel in "messages"; a duplicate names the hire it repeats in
+        "duplicate_of". "correlation_id" identifies the attempt in the logs
+        and, when instrumentation is enabled, is the trace ID of its spans.
+    """
+    name = teacher_name(teacher)
+    key = hire_id(teacher)
+    current_teacher.set(key)
+    current_teacher_name.set(name)
+    llm_priority.set(next_priority())
+    recorder = Recorder(name) if METRICS_ENABLED else None
+    current_recorder.set(recorder)
+    correlation_id.set(recorder.trace_id if recorder is not None else secrets.token_hex(16))
+    version = pipeline_version(mode)
+    checkpoints = get_client("checkpoints", CheckpointStore) if CHECKPOINTS_ENABLED else None
+    registry = get_client("hire_registry", HireRegistry) if HIRE_REGISTRY_ENABLED else None
+    claimed = False
+
+    try:
+        completed = checkpoints.load(key, version) if checkpoints is not None else {}
+        try:
+            with span("intake"):
+                record = parse_teacher(teacher)
+        except MalformedRecordError as e:
+            if "intake.extraction" in completed:
+                record = parse_extracted(json.loads(completed.pop("intake.extraction")))
+            else:
+                logger.info("Extracting details for %s with the recruitment agent: %s", name, e)
+                with span("intake.extraction"):
+                    record = extract_teacher_record(teacher)
+                if checkpoints is not None:
+                    checkpoints.save(key, version, "intake.extraction", record.model_dump_json())
+        name = record.name
+        current_teacher_name.set(name)
+
+        if registry is not None:
+            existing = registry.claim(key, record)
+            if existing is not None:
+                raise DuplicateHireError(existing)
+            claimed = True
+
+        inputs = {"teacher_info": record.to_prompt()}
+        role_context = None
+        if mode == "fast":
+            with span("role_context"):
+                org = current_org()
+                role_context = build_role_context(record, org)
+                inputs["role_context"] = render_role_context(role_context, org)
+
+        outputs = dict(completed)
+        final_task = PIPELINE_TASKS[mode][-1]
+        if final_task in completed:
+            # Finished earlier, but the run stopped before it could be recorded
+            result = completed[final_task]
+        else:
+            if completed:
+                logger.info("Resuming %s after: %s", name,
+                            ", ".join(t for t in PIPELINE_TASKS[mode] if t in completed))
+            crew = create_onboarding_crew(mode, record, completed)
+            stages = [task.name for task in crew.tasks]
+            callbacks = recorder.start_stages(stages) if recorder is not None else [None] * len(stages)
+            for task, callback in zip(crew.tasks, callbacks):
+                if checkpoints is not None:
+                    callback = checkpoint_callback(checkpoints, key, version, task.name, callback)
+                task.callback = callback
+            result = crew.kickoff(inputs=inputs)
+            outputs.update((output.name, output.pydantic or output.raw) for output in result.tasks_output)
+
+        # Channels sent by an earlier attempt; only the others are sent again
+        messages = json.loads(completed["messages"]) if "messages" in completed else {}
+        missing = [channel for channel in SENDERS if channel not in messages]
+        if missing:
+            if role_context is not None:
+                role, responsibilities = role_context["role"], role_context["responsibilities"]
+            else:
+                role, responsibilities = assigned_role(record, outputs)
+            payloads = build_payloads(record, outputs[final_task], role, responsibilities)
+            messages.update(get_dispatcher().dispatch({channel: payloads[channel] for channel in missing}))
+        failed = failed_channels(messages)
+        deferred = deferred_channels()
+        if checkpoints is not None:
+            delivered = {channel: message for channel, message in messages.items()
+                         if channel not in failed and channel not in deferred}
+            checkpoints.save(key, version, "messages", json.dumps(delivered))
+        if failed:
+            raise NotificationError(messages, failed)
+        if deferred:
+            # Completed by finish_deferred() once the batch's mailer and digest report back
+            logger.info("Onboarded %s; %s delivery pending until the end of the batch", name, ", ".join(deferred))
+        else:
+            if checkpoints is not None:
+                checkpoints.clear(key)
+            if registry is not None:
+                registry.complete(key)
+            logger.info("Successfully onboarded: %s", name)
+        outcome = {
+            "status": "success",
+            "result": result,
+            "messages": messages
+        }
+        if deferred:
+            outcome["deferred"] = deferred
+        if role_context is not None:
+            outcome["role"] = role_context["role"]
+    except DuplicateHireError as e:
+        logger.info("Skipped duplicate %s: %s", name, e)
+        outcome = {
+            "status": "duplicate",
+            "error": str(e),
+            "duplicate_of": e.existing["hire_id"]
+        }
+    except NotificationError as e:
+        # The claim is released and the delivered channels are checkpointed,
+        # so a re-run sends only the failed ones
+        if claimed:
+            registry.release(key)
+        logger.error("Failed to notify %s: %s", name, e)
+        outcome = {
+            "status": "failed",
+            "error": str(e),
+            "messages": e.messages
+        }
+    except (RejectedRecordError, NoSuitableRoleError) as e:
+        if checkpoints is not None:
+            checkpoints.clear(key)
+        if claimed:
+            registry.release(key)
+        logger.info("Rejected %s: %s", name, e)
+        outcome = {
+            "status": "rejected",
+            "error": str(e)
+        }
+    except Exception as e:
+        if claimed:
+            registry.release(key)
+        logger.error("Failed to onboard %s: %s", name, e)
+        outcome = {
+            "status": "failed",
+            "error": str(e)
+        }
+
+    outcome["hire_id"] = key
+    outcome["name"] = name
+    outcome["correlation_id"] = correlation_id.get()
+    if recorder is not None:
+        recorder.finish(outcome.get("error"))
+        outcome["metrics"] = recorder.summary()
+        export_jsonl(recorder)
+        export_otel(recorder)
+    return outcome
+
+def finish_deferred(deliveries, mode):
+    """
+    Complete the hires whose email or Slack introduction waited for the end
+    of the batch, once the bulk mailer and digest report their delivery.
+
+    A hire with a delivery that did not go out is released in the registry
+    instead, and the channels that did go out are added to its checkpoint,
+    so a re-run sends only what is missing.
+
+    Args:
+        deliveries (dict): {channel: delivery report} of each hire ID, as
+        returned by BulkMailer.flush() and SlackDigest.flush()
+        mode (str): Pipeline mode the batch ran in
+    """
+    checkpoints = get_client("checkpoints", CheckpointStore) if CHECKPOINTS_ENABLED else None
+    registry = get_client("hire_registry", HireRegistry) if HIRE_REGISTRY_ENABLED else None
+    version = pipeline_version(mode)
+    for key, channels in deliveries.items():
+        failed = [channel for channel, delivery in channels.items() if delivery["status"] != "sent"]
+        if not failed:
+            if checkpoints is not None:
+                checkpoints.clear(key)
+            if registry is not None:
+                registry.complete(key)
+            continue
+        logger.error("Failed to deliver %s for %s; a re-run will retry", ", ".join(failed), key)
+        if checkpoints is not None:
+            messages = json.loads(checkpoints.load(key, version).get("messages", "{}"))
+            messages.update((channel, "✅ Delivered at the end of the batch")
+                            for channel in channels if channel not in failed)
+            checkpoints.save(key, version, "messages", json.dumps(messages))
+        if registry is not None:
+            registry.release(key)
+
+def watch_org_config():
+    """
+    Reload ORG_CONFIG_PATH in the background while batches run, so org
+    changes apply to the next teachers without a restart.
+    """
+    if ORG_CONFIG_PATH and ORG_CONFIG_RELOAD_INTERVAL > 0:
+        get_client("org_config_watcher", lambda: OrgConfigWatcher(ORG_CONFIG_PATH).start())
+
+def dry_run(teachers_list):
+    """
+    Validate a roster without calling the LLM or sending anything.
+
+    Every entry goes through the same intake parsing and role lookup as
+    onboard_teacher(), so the report shows who would be onboarded, who would
+    be rejected and who needs the recruitment agent to extract their details.
+
+    Args:
+        teachers_list (list): Roster entries, see onboard_teachers()
+
+    Returns:
+        dict: Result for each roster entry keyed by hire_id(), with the "name",
+        "status" ("ready", "needs_extraction", "rejected" or "duplicate") and
+        either the "role" or the "error". An entry repeating an earlier one is
+        kept under its hire ID with a "#<n>" suffix and names the hire it
+        repeats in "duplicate_of", so every row of the roster is reported.
+    """
+    registry = get_client("hire_registry", HireRegistry) if HIRE_REGISTRY_ENABLED else None
+    org = current_org()
+    results, repeats = {}, {}
+    for teacher in teachers_list:
+        key = hire_id(teacher)
+        result = {"name": teacher_name(teacher)}
+        if key in results:
+            # Same hire ID as an earlier entry: onboard_teachers() would skip it
+            repeats[key] = repeats.get(key, 0) + 1
+            result.update(status="duplicate", error="Repeated roster entry", duplicate_of=key)
+            results[f"{key}#{repeats[key]}"] = result
+            continue
+        try:
+            record = parse_teacher(teacher)
+            existing = registry.find(record) if registry is not None else None
+            if existing is not None:
+                result.update(status="duplicate", error=str(DuplicateHireError(existing)),
+                              duplicate_of=existing["hire_id"])
+            else:
+                result.update(status="ready", role=build_role_context(record, org)["role"])
+        except MalformedRecordError as e:
+            result.update(status="needs_extraction", error=str(e))
+        except (RejectedRecordError, NoSuitableRoleError) as e:
+            result.update(status="rejected", error=str(e))
+        results[key] = result
+    return results
+
+def onboard_teachers(teachers_list, max_concurrency=DEFAULT_MAX_CONCURRENCY, mode=PIPELINE_MODE,
+                     bulk_email=BULK_EMAIL, slack_digest=SLACK_DIGEST):
     """
     Onboard multiple teachers simultaneously.
     
+    Each teacher runs on an isolated crew, with at most ``max_concurrency``
+    onboardings in flight at once.
+
     Args:
         teachers_list (list): List of dictionaries containing teacher information.
         Each dictionary should have the format:
@@ -461,83 +703,302 @@ def onboard_teachers(teachers_list):
             "email": "teacher@email.com",
             "phone_number": "+1234567890"
         }
+        Free-text descriptions of a teacher are accepted too and are extracted
+        by the recruitment agent.
+        max_concurrency (int): Maximum number of onboardings running at once
+        mode (str): Pipeline mode, one of PIPELINE_MODES
+        bulk_email (bool): Queue welcome emails and deliver them together over
+        a few authenticated SMTP sessions once the batch has finished. Ignored
+        when OUTBOX_ENABLED is set, since the outbox then delivers every channel.
+        slack_digest (bool): Post one Slack digest for the whole batch once it
+        has finished, with each teacher's introduction as a reply in its
+        thread. Also ignored when OUTBOX_ENABLED is set.
     
     Returns:
-        dict: Dictionary with results for each teacher
+        BatchResults: Dictionary with results for each teacher, keyed by hire_id()
+        so two teachers with the same name cannot overwrite each other. Each
+        result has the teacher's "name", the per-teacher "wall_time" and, in
+        bulk mode, the "email_delivery" status.
+        In digest mode, "slack_delivery" holds the status of the introduction.
+        With the outbox enabled, "notifications" holds each channel's delivery
+        status at the time the batch finished.
+        Batch throughput, and aggregated metrics when instrumentation is
+        enabled, are available on ``.stats``, where "duplicates" counts the
+        teachers skipped because they were already onboarded or repeated an
+        earlier roster entry.
     """
-    results = {}
-    onboarding_crew = create_onboarding_crew()
-    
+    # Entries repeating an earlier one in the same roster share its hire ID and are skipped
+    teachers, seen, repeats = [], set(), 0
     for teacher in teachers_list:
-        try:
-            # Format teacher info as required by the crew
-            teacher_info = {
-                "teacher_info": f"Name: {teacher['name']}, "
-                               f"Subject: {teacher['subject']}, "
-                               f"Experience: {teacher['experience']}, "
-                               f"Email: {teacher['email']}, "
-                               f"Phone Number: {teacher['phone_number']}"
-            }
-            
-            # Run onboarding process for this teacher
-            result = onboarding_crew.kickoff(inputs=teacher_info)
-            results[teacher['name']] = {
-                "status": "success",
-                "result": result
-            }
-            print(f"\nSuccessfully onboarded: {teacher['name']}")
-            
-        except Exception as e:
-            results[teacher['name']] = {
-                "status": "failed",
-                "error": str(e)
-            }
-            print(f"\nFailed to onboard {teacher['name']}: {str(e)}")
-    
+        key = hire_id(teacher)
+        if key in seen:
+            logger.info("Skipped repeated roster entry for %s", teacher_name(teacher))
+            repeats += 1
+            continue
+        seen.add(key)
+        teachers.append(teacher)
+
+    watch_org_config()
+    get_dispatcher().reserve(max_concurrency)
+    mailer = get_mail_sender().create_bulk_mailer() if bulk_email else None
+    digest = get_slack_sender().create_digest() if slack_digest else None
+    token = active_mailer.set(mailer)
+    digest_token = active_digest.set(digest)
+    try:
+        results = run_batch(
+            teachers,
+            partial(onboard_teacher, mode=mode),
+            key=hire_id,
+            max_concurrency=max_concurrency
+        )
+    finally:
+        active_digest.reset(digest_token)
+        active_mailer.reset(token)
+
+    results.stats["total"] += repeats
+    results.stats["duplicates"] += repeats
+
+    deliveries = {}
+    if mailer is not None:
+        for key, delivery in mailer.flush().items():
+            deliveries.setdefault(key, {})["email"] = delivery
+            if results.get(key) is not None:
+                results[key]["email_delivery"] = delivery
+
+    if digest is not None:
+        for key, delivery in digest.flush().items():
+            deliveries.setdefault(key, {})["slack"] = delivery
+            if results.get(key) is not None:
+                results[key]["slack_delivery"] = delivery
+    finish_deferred(deliveries, mode)
+
+    if METRICS_ENABLED:
+        results.stats["metrics"] = aggregate(
+            result["metrics"] for result in results.values() if result is not None and "metrics" in result
+        )
+        if METRICS_PROMETHEUS_PATH:
+            with open(METRICS_PROMETHEUS_PATH, "w", encoding="utf-8") as f:
+                f.write(render_prometheus(results.stats["metrics"], results.stats))
+
+    if OUTBOX_ENABLED:
+        outbox = get_outbox_worker().outbox
+        for key, result in results.items():
+            if result is not None:
+                result["notifications"] = outbox.status(key)
     return results
 
+def onboard_roster(roster, results_path, max_concurrency=DEFAULT_MAX_CONCURRENCY, mode=PIPELINE_MODE,
+                   bulk_email=BULK_EMAIL, slack_digest=SLACK_DIGEST, resume=True, mailer=None, digest=None):
+    """
+    Onboard a roster of any size, writing each teacher's result as it finishes.
+
+    Teachers are pulled from the roster as onboarding slots free up and every
+    result is appended to ``results_path`` as one JSON line, so memory stays
+    flat and a crash loses only the teachers that were in flight. Running
+    again with ``resume`` skips every teacher already recorded as onboarded
+    or rejected; failed teachers are retried.
+
+    Args:
+        roster (str | iterable): Path of a CSV, JSONL or JSON roster (see
+        streaming.read_roster), or an iterable of teachers
+        results_path (str): JSON Lines file receiving the onboard_teacher()
+        result of each teacher, keyed by its "hire_id"
+        max_concurrency (int): Maximum number of onboardings running at once
+        mode (str): Pipeline mode, one of PIPELINE_MODES
+        bulk_email (bool): Deliver welcome emails in bulk at the end; the
+        delivery status of each teacher is then appended as an extra
+        {"hire_id", "email_delivery"} record
+        slack_digest (bool): Post one Slack digest with threaded introductions
+        at the end; each introduction's status is appended as an extra
+        {"hire_id", "slack_delivery"} record
+        resume (bool): Skip teachers a previous run completed. When False the
+        results file is started over.
+        mailer (BulkMailer): Collects the emails instead of the bulk mailer
+        ``bulk_email`` creates, e.g. a sharding.DeliverySpool
+        digest (SlackDigest): Collects the introductions instead of the digest
+        ``slack_digest`` creates
+
+    Returns:
+        dict: Batch statistics, as in onboard_teachers().stats, plus the number
+        of teachers "skipped" because they were already completed
+    """
+    if isinstance(roster, str):
+        roster = read_roster(roster)
+    done = completed_keys(results_path) if resume else set()
+    skipped = 0
+
+    def pending():
+        nonlocal skipped
+        for teacher in roster:
+            if hire_id(teacher) in done:
+                skipped += 1
+                continue
+            yield teacher
+
+    watch_org_config()
+    get_dispatcher().reserve(max_concurrency)
+    stats = RunningStats()
+    metrics = None
+    if mailer is None and bulk_email:
+        mailer = get_mail_sender().create_bulk_mailer()
+    if digest is None and slack_digest:
+        digest = get_slack_sender().create_digest()
+    token = active_mailer.set(mailer)
+    digest_token = active_digest.set(digest)
+    started = time.perf_counter()
+    with JsonlSink(results_path, append=resume) as sink:
+        try:
+            for teacher, result in iter_batch(pending(), partial(onboard_teacher, mode=mode), max_concurrency):
+                if OUTBOX_ENABLED:
+                    result["notifications"] = get_outbox_worker().outbox.status(result["hire_id"])
+                sink.write(result)
+                stats.add(result)
+                if "metrics" in result:
+                    metrics = aggregate([metrics, result["metrics"]] if metrics else [result["metrics"]])
+        finally:
+            active_digest.reset(digest_token)
+            active_mailer.reset(token)
+
+        deliveries = {}
+        if mailer is not None:
+            for key, delivery in mailer.flush().items():
+                deliveries.setdefault(key, {})["email"] = delivery
+                sink.write({"hire_id": key, "email_delivery": delivery})
+
+        if digest is not None:
+            for key, delivery in digest.flush().items():
+                deliveries.setdefault(key, {})["slack"] = delivery
+                sink.write({"hire_id": key, "slack_delivery": delivery})
+        finish_deferred(deliveries, mode)
+
+    summary = stats.summary(time.perf_counter() - started, max_concurrency)
+    summary["skipped"] = skipped
+    if metrics is not None:
+        summary["metrics"] = metrics
+        if METRICS_PROMETHEUS_PATH:
+            with open(METRICS_PROMETHEUS_PATH, "w", encoding="utf-8") as f:
+                f.write(render_prometheus(metrics, summary))
+    return summary
+
+# Example roster used when no --roster file is given
+EXAMPLE_TEACHERS = [
+    # {
+    #     "name": "Lambe Boluwatife",
+    #     "subject": "Software Engineer",
+    #     "experience": "5 years",
+    #     "email": "danibholie@gmail.com",
+    #     "phone_number": "+2348083647531"
+    # },
+    # {
+    #     "name": " Sowunmi Mayowa",
+    #     "subject": "Software Engineer Developer",
+    #     "experience": "10 years",
+    #     "email": "msowunmi@ovabor.xyz",
+    #     "phone_number": "+2348128908139"
+    # },
+    # {
+    #     "name": "Mr. Alex",
+    #     "subject": "Software Engineer",
+    #     "experience": "7 years",
+    #     "email": "alex@ovabor.com",
+    #     "phone_number": "+2347088846554"
+    # },
+    {
+        "name": "Adedeji Adeleke",
+        "subject": "Art",
+        "experience": "7 years",
+        "email": "adedejiadeleke@ovabor.com",
+        "phone_number": "+2347088846554"
+    }
+]
+
+def parse_args(argv=None):
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Onboard newly appointed teachers")
+    parser.add_argument("--roster", help="CSV, JSONL or JSON roster file (defaults to the example roster)")
+    parser.add_argument("--results", help="stream results to this JSONL file as teachers finish")
+    parser.add_argument("--no-resume", action="store_true",
+                        help="with --results, start over instead of skipping teachers already completed")
+    parser.add_argument("--mode", choices=PIPELINE_MODES, default=PIPELINE_MODE)
+    parser.add_argument("--concurrency", type=int, default=DEFAULT_MAX_CONCURRENCY)
+    parser.add_argument("--dry-run", action="store_true",
+                        help="validate the roster and report each teacher's role without calling the LLM")
+    return parser.parse_args(argv)
+
 # Example usage with multiple teachers
 if __name__ == "__main__":
-    teachers_to_onboard = [
-        # {
-        #     "name": "Lambe Boluwatife",
-        #     "subject": "Software Engineer",
-        #     "experience": "5 years",
-        #     "email": "danibholie@gmail.com",
-        #     "phone_number": "+2348083647531"
-        # },
-        # {
-        #     "name": " Sowunmi Mayowa",
-        #     "subject": "Software Engineer Developer",
-        #     "experience": "10 years",
-        #     "email": "msowunmi@ovabor.xyz",
-        #     "phone_number": "+2348128908139"
-        # },
-        # {
-        #     "name": "Mr. Alex",
-        #     "subject": "Software Engineer",
-        #     "experience": "7 years",
-        #     "email": "alex@ovabor.com",
-        #     "phone_number": "+2347088846554"
-        # },
-        {
-            "name": "Adedeji Adeleke",
-            "subject": "Art",
-            "experience": "7 years",
-            "email": "adedejiadeleke@ovabor.com",
-            "phone_number": "+2347088846554"
-        }
-    ]
-    
+    args = parse_args()
+    setup_logging()
+    teachers_to_onboard = read_roster(args.roster) if args.roster else EXAMPLE_TEACHERS
+
+    if args.dry_run:
+        started = time.perf_counter()
+        checked = dry_run(teachers_to_onboard)
+        print("\nDry Run Summary:")
+        print("=" * 50)
+        for result in checked.values():
+            name = result["name"]
+            if result["status"] == "ready":
+                print(f"{name}: ✅ Ready ({result['role']})")
+            elif result["status"] == "rejected":
+                print(f"{name}: ⛔ Rejected\n  Error: {result['error']}")
+            elif result["status"] == "duplicate":
+                print(f"{name}: ⏭️ Duplicate\n  {result['error']}")
+            else:
+                print(f"{name}: 🔎 Needs extraction\n  Reason: {result['error']}")
+        print("=" * 50)
+        ready = sum(1 for result in checked.values() if result["status"] == "ready")
+        duplicates = sum(1 for result in checked.values() if result["status"] == "duplicate")
+        print(f"{ready}/{len(checked)} ready ({duplicates} duplicates) in {time.perf_counter() - started:.3f}s")
+        sys.exit(0)
+
+    if args.results:
+        print(f"Streaming onboarding results to {args.results}...")
+        stats = onboard_roster(teachers_to_onboard, args.results, max_concurrency=args.concurrency,
+                               mode=args.mode, resume=not args.no_resume)
+        if OUTBOX_ENABLED:
+            print("Waiting for queued notifications to be delivered...")
+            if not get_outbox_worker().drain(timeout=OUTBOX_DRAIN_TIMEOUT):
+                print("Some notifications are still pending; they will be retried on the next run.")
+        close_clients()
+        print(f"Onboarded {stats['succeeded']}/{stats['total']} ({stats['rejected']} rejected, "
+              f"{stats['duplicates']} duplicates, {stats['skipped']} already completed) in {stats['wall_time']:.2f}s "
+              f"({stats['throughput_per_minute']} per minute, max {stats['max_concurrency']} in flight)")
+        sys.exit(0)
+
     print("Starting onboarding process for multiple teachers...")
-    results = onboard_teachers(teachers_to_onboard)
+    results = onboard_teachers(teachers_to_onboard, max_concurrency=args.concurrency, mode=args.mode)
+    if OUTBOX_ENABLED:
+        print("Waiting for queued notifications to be delivered...")
+        if not get_outbox_worker().drain(timeout=OUTBOX_DRAIN_TIMEOUT):
+            print("Some notifications are still pending; they will be retried on the next run.")
+    close_clients()
     
     # Print summary
     print("\nOnboarding Summary:")
     print("=" * 50)
-    for teacher_name, result in results.items():
-        status = "✅ Success" if result["status"] == "success" else "❌ Failed"
-        print(f"{teacher_name}: {status}")
-        if result["status"] == "failed":
+    for result in results.values():
+        status = {"success": "✅ Success", "rejected": "⛔ Rejected",
+                  "duplicate": "⏭️ Duplicate"}.get(result["status"], "❌ Failed")
+        print(f"{result['name']}: {status}")
+        if result["status"] != "success":
             print(f"  Error: {result['error']}")
+        print(f"  Time: {result['wall_time']:.2f}s")
     print("=" * 50)
+    stats = results.stats
+    if "metrics" in stats:
+        metrics = stats["metrics"]
+        print(f"LLM usage: {metrics['llm_calls']} calls, {metrics['prompt_tokens']} prompt + "
+              f"{metrics['completion_tokens']} completion tokens (~${metrics['cost']:.4f})")
+    cache = None
+    if llms:
+        from llm_cache import get_llm_cache
+        cache = get_llm_cache()
+    if cache is not None:
+        cache_stats = cache.stats()
+        print(f"LLM cache: {cache_stats['hits']} hits, {cache_stats['misses']} misses "
+              f"({cache_stats['entries']} entries)")
+    print(f"Onboarded {stats['succeeded']}/{stats['total']} ({stats['rejected']} rejected, "
+          f"{stats['duplicates']} duplicates) in {stats['wall_time']:.2f}s "
+          f"({stats['throughput_per_minute']} per minute, max {stats['max_concurrency']} in flight)")
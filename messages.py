@@ -0,0 +1,85 @@
+from string import Template
+
+# Message templates, compiled once at import. Placeholders are filled from the
+# parsed teacher record and the assigned role, see message_fields()
+WHATSAPP_TEMPLATE = Template(
+    "🎉 Congratulations ${name}! Your onboarding to Glorylink Schools is complete. We've sent a detailed "
+    "welcome package to your email (${email}). Please check it for important information about your role "
+    "as ${role} and next steps. We're excited to have you join our team! 🌟"
+)
+
+SLACK_TEMPLATE = Template(
+    "🎉 *Please welcome ${name} to Glorylink Schools!*\n\n"
+    "${name} joins us as our new *${role}*, bringing ${experience} years of ${subject} experience.\n"
+    "${responsibilities}"
+    "📧 ${email}\n\n"
+    "Please say hello and help make them feel at home! 👋"
+)
+
+SLACK_DIGEST_TEMPLATE = Template(
+    "🎉 *${count} new ${teachers} joined Glorylink Schools!*\n\n"
+    "${names}\n\n"
+    "Introductions are in the thread 🧵 Please give everyone a warm welcome! 👋"
+)
+
+_SLACK_ESCAPES = str.maketrans({"&": "&amp;", "<": "&lt;", ">": "&gt;"})
+
+
+def _slack_escape(value):
+    """
+    Escape the characters Slack reads as markup in user-supplied text.
+    """
+    return str(value).translate(_SLACK_ESCAPES)
+
+
+def message_fields(record, role, responsibilities=()):
+    """
+    Placeholder values shared by the message templates.
+
+    Args:
+        record (TeacherRecord): The parsed teacher record
+        role (str): The assigned role title
+        responsibilities (list): The role's responsibilities, if known
+
+    Returns:
+        dict: Values for WHATSAPP_TEMPLATE and SLACK_TEMPLATE
+    """
+    return {
+        "name": record.name,
+        "email": record.email,
+        "subject": record.subject,
+        "experience": f"{record.experience:g}",
+        "role": role,
+        "responsibilities": responsibilities,
+    }
+
+
+def render_whatsapp(fields):
+    """
+    WhatsApp message congratulating the teacher.
+    """
+    return WHATSAPP_TEMPLATE.substitute(fields)
+
+
+def render_slack(fields):
+    """
+    Slack announcement introducing the teacher to the school's channel.
+    """
+    escaped = {key: _slack_escape(value) for key, value in fields.items() if key != "responsibilities"}
+    responsibilities = fields.get("responsibilities") or ()
+    escaped["responsibilities"] = (
+        "They will be responsible for:\n" + "".join(f"• {_slack_escape(item)}\n" for item in responsibilities)
+        if responsibilities else ""
+    )
+    return SLACK_TEMPLATE.substitute(escaped)
+
+
+def render_slack_digest(names):
+    """
+    Slack post announcing a whole batch; the introductions are threaded under it.
+    """
+    return SLACK_DIGEST_TEMPLATE.substitute(
+        count=len(names),
+        teachers="teacher has" if len(names) == 1 else "teachers have",
+        names="\n".join(f"• {_slack_escape(name)}" for name in names),
+    )
@@ -0,0 +1,116 @@
+import logging
+import os
+
+from instrumentation import span
+from llm_scheduler import LLM_RPM, LLM_TPM
+
+logger = logging.getLogger(__name__)
+
+# Model tiers, cheapest first. LLM_TIERING=0 puts every agent on the top tier
+LLM_TIERING = os.getenv("LLM_TIERING", "1") == "1"
+LLM_TIERS = ("small", "large")
+LLM_TIER_MODELS = {
+    "small": os.getenv("LLM_SMALL_MODEL", "gpt-4o-mini"),
+    "large": os.getenv("LLM_LARGE_MODEL", "gpt-4"),
+}
+# Account limits of each tier's model (usage tier 1 by default), see llm_scheduler.LLMScheduler
+LLM_TIER_LIMITS = {
+    "small": (float(os.getenv("LLM_SMALL_RPM", "500")), float(os.getenv("LLM_SMALL_TPM", "200000"))),
+    "large": (LLM_RPM, LLM_TPM),
+}
+
+# Retries of a rejected answer on the top tier, with the reason it was rejected
+LLM_REPAIR_RETRIES = int(os.getenv("LLM_REPAIR_RETRIES", "1"))
+
+# Tier each agent starts on: extraction and classification are cheap, writing the email is not
+AGENT_TIERS = {
+    "recruitment": "small",
+    "role_assignment": "small",
+    "resources": "small",
+    "finalization": "large",
+}
+
+
+def _parse_agent_tiers(value):
+    tiers = dict(AGENT_TIERS)
+    for pair in filter(None, (item.strip() for item in value.split(","))):
+        agent, _, tier = pair.partition("=")
+        if tier.strip() not in LLM_TIERS:
+            raise ValueError(f"Unknown LLM tier '{tier.strip()}' in LLM_AGENT_TIERS, expected one of {LLM_TIERS}")
+        tiers[agent.strip()] = tier.strip()
+    return tiers
+
+
+# e.g. LLM_AGENT_TIERS="resources=large,finalization=small"
+AGENT_TIERS = _parse_agent_tiers(os.getenv("LLM_AGENT_TIERS", ""))
+
+
+def agent_tier(agent):
+    """
+    Tier an agent starts on, by its key in create_agents().
+    """
+    if not LLM_TIERING:
+        return LLM_TIERS[-1]
+    return AGENT_TIERS.get(agent, LLM_TIERS[-1])
+
+
+def next_tier(tier):
+    """
+    The tier above ``tier``, or None at the top.
+    """
+    index = LLM_TIERS.index(tier) + 1
+    return LLM_TIERS[index] if index < len(LLM_TIERS) else None
+
+
+def retry_budget(tier):
+    """
+    Most retries escalating() asks for on a task starting on ``tier``: one
+    per tier above it, then LLM_REPAIR_RETRIES on the top tier.
+    """
+    return len(LLM_TIERS) - 1 - LLM_TIERS.index(tier) + LLM_REPAIR_RETRIES
+
+
+def escalating(guardrail, agent, tier, get_llm):
+    """
+    Wrap a validating task guardrail so a failed answer is retried one tier up.
+
+    When ``guardrail`` rejects the answer of an agent below the top tier, the
+    agent is moved to the next tier's LLM and the rejection is returned, so
+    CrewAI retries the task on the stronger model with the reason. On the top
+    tier the answer is repaired in place up to LLM_REPAIR_RETRIES times; an
+    answer still rejected after that is passed on unchanged, as it would be
+    without validation. Set the task's guardrail_max_retries to
+    retry_budget(tier).
+
+    Args:
+        guardrail (callable): Returns (True, output) or (False, error), e.g.
+        task_output.check_output()
+        agent (Agent): The agent answering the task
+        tier (str): The tier the agent starts on
+        get_llm (callable): Returns the LLM of a tier
+
+    Returns:
+        callable: The task guardrail
+    """
+    state = {"tier": tier, "repairs": 0}
+
+    def check(output):
+        valid, result = guardrail(output)
+        if valid:
+            return True, result
+        higher = next_tier(state["tier"])
+        if higher is not None:
+            logger.info("Retrying %s on the %s model: %s", agent.role, LLM_TIER_MODELS[higher], result)
+            with span("escalation", detached=True, agent=agent.role, to=LLM_TIER_MODELS[higher]):
+                agent.llm = get_llm(higher)
+            state["tier"] = higher
+            return False, result
+        if state["repairs"] < LLM_REPAIR_RETRIES:
+            logger.info("Asking %s to repair its answer: %s", agent.role, result)
+            with span("repair", detached=True, agent=agent.role):
+                state["repairs"] += 1
+            return False, result
+        logger.warning("Passing on the invalid answer of %s: %s", agent.role, result)
+        return True, output
+
+    return check
@@ -0,0 +1,234 @@
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from contextvars import copy_context
+
+from batch import current_teacher, current_teacher_name, DEFAULT_MAX_CONCURRENCY
+from clients import get_client
+from instrumentation import span
+from mailer import active_mailer
+from messages import message_fields, render_whatsapp, render_slack
+from outbox import OUTBOX_ENABLED
+from senders import get_mail_sender, get_whatsapp_sender, get_slack_sender, get_outbox_worker
+from slack_digest import active_digest
+
+WELCOME_EMAIL_SUBJECT = "Welcome to Glorylink Schools - Your Onboarding Information"
+
+# Threads sending notifications, shared by every onboarding in the process. Unset,
+# the pool holds a thread per channel of each onboarding in flight and grows with
+# the batches' max_concurrency; a positive value fixes its size
+NOTIFICATION_WORKERS = int(os.getenv("NOTIFICATION_WORKERS", "0"))
+
+
+def queue_notification(channel, payload):
+    """
+    Record a notification in the outbox for background delivery.
+
+    Returns:
+        str: Status message
+    """
+    teacher = current_teacher.get()
+    if get_outbox_worker().outbox.enqueue(teacher, channel, payload):
+        return f"📬 {channel.title()} notification for {teacher} queued for delivery"
+    return f"✅ {channel.title()} notification for {teacher} was already recorded; it will not be sent again"
+
+
+def send_email(email, email_body, subject=WELCOME_EMAIL_SUBJECT):
+    """
+    Send, queue in the outbox, or hand to the batch's bulk mailer, an email to a teacher.
+
+    Returns:
+        str: Status message
+    """
+    if OUTBOX_ENABLED:
+        return queue_notification("email", {
+            "email": email,
+            "subject": subject,
+            "email_body": email_body
+        })
+
+    # In bulk mode the email is queued and delivered when the batch ends
+    mailer = active_mailer.get()
+    if mailer is not None:
+        return mailer.enqueue(current_teacher.get(), email, subject, email_body)
+
+    return get_mail_sender().send_email(recipient=email, subject=subject, body=email_body)
+
+
+def send_whatsapp(phone_number, message_body):
+    """
+    Send, or queue in the outbox, a WhatsApp message to a teacher.
+
+    Returns:
+        str: Status message
+    """
+    if OUTBOX_ENABLED:
+        return queue_notification("whatsapp", {
+            "phone_number": phone_number,
+            "message_body": message_body
+        })
+    return get_whatsapp_sender().send_message(phone_number=phone_number, message_body=message_body)
+
+
+def send_slack(message_body):
+    """
+    Post, queue in the outbox, or add to the batch's digest, an announcement
+    to the school's Slack channel.
+
+    Returns:
+        str: Status message
+    """
+    if OUTBOX_ENABLED:
+        return queue_notification("slack", {"message_body": message_body})
+
+    # In digest mode the introduction is threaded under one post when the batch ends
+    digest = active_digest.get()
+    if digest is not None:
+        return digest.add(current_teacher.get(), current_teacher_name.get(), message_body)
+    return get_slack_sender().send_message(message_body)
+
+
+# Sender of each channel, called with the channel's payload as keyword arguments
+SENDERS = {
+    "email": send_email,
+    "whatsapp": send_whatsapp,
+    "slack": send_slack,
+}
+
+
+class NotificationError(Exception):
+    """
+    Raised when a teacher's notifications could not all be sent or queued.
+
+    Args:
+        messages (dict): Status message of each channel, see NotificationDispatcher.dispatch()
+        channels (list): The channels that failed
+    """
+
+    def __init__(self, messages, channels):
+        super().__init__(f"Notifications not sent: {', '.join(channels)}")
+        self.messages = messages
+        self.channels = channels
+
+
+def failed_channels(messages):
+    """
+    Channels whose status message reports a failure.
+    """
+    return [channel for channel, message in messages.items() if str(message).startswith("❌")]
+
+
+def deferred_channels():
+    """
+    Channels only held in memory until the batch's bulk mailer or Slack
+    digest is flushed. Outbox entries are durable and count as sent.
+    """
+    if OUTBOX_ENABLED:
+        return []
+    return [channel for channel, pending in (("email", active_mailer.get()), ("slack", active_digest.get()))
+            if pending is not None]
+
+
+def build_payloads(record, email_body, role, responsibilities=()):
+    """
+    Everything the three channels send for one teacher, built up front.
+
+    Args:
+        record (TeacherRecord): The parsed teacher record
+        email_body (str): The welcome email written by the finalization agent
+        role (str): The assigned role title
+        responsibilities (list): The role's responsibilities
+
+    Returns:
+        dict: Keyword arguments of each channel's sender, keyed by channel
+    """
+    fields = message_fields(record, role, responsibilities)
+    return {
+        "email": {"email": record.email, "email_body": email_body},
+        "whatsapp": {"phone_number": record.phone_number, "message_body": render_whatsapp(fields)},
+        "slack": {"message_body": render_slack(fields)},
+    }
+
+
+def _send(channel, payload):
+    # Detached, since the channels' spans run side by side
+    with span(f"tool.{channel}", detached=True):
+        try:
+            return SENDERS[channel](**payload)
+        except Exception as e:
+            return f"❌ Error sending {channel} notification: {str(e)}"
+
+
+class NotificationDispatcher:
+    """
+    Sends the notifications of a teacher on all channels at once.
+
+    Each channel waits on a remote API, so sending them concurrently makes a
+    teacher's notification time that of the slowest channel instead of the
+    sum of all three. Batches call reserve() with their max_concurrency so
+    the pool has a thread for every channel of every onboarding in flight.
+
+    Args:
+        workers (int): Threads shared by every dispatch; 0 sizes the pool
+        for DEFAULT_MAX_CONCURRENCY onboardings and lets reserve() grow it
+    """
+
+    def __init__(self, workers=NOTIFICATION_WORKERS):
+        self.fixed = workers > 0
+        self.workers = workers if self.fixed else len(SENDERS) * DEFAULT_MAX_CONCURRENCY
+        self._executor = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="notify")
+        self._lock = threading.Lock()
+
+    def reserve(self, max_concurrency):
+        """
+        Make room for ``max_concurrency`` onboardings notifying at once.
+
+        A pool smaller than that is replaced by a larger one; dispatches
+        already submitted finish on the old pool. A pool sized by
+        NOTIFICATION_WORKERS is left as it is.
+
+        Args:
+            max_concurrency (int): Onboardings the batch runs at once
+        """
+        workers = len(SENDERS) * max(1, max_concurrency)
+        with self._lock:
+            if self.fixed or workers <= self.workers:
+                return
+            previous = self._executor
+            self._executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="notify")
+            self.workers = workers
+        previous.shutdown(wait=False)
+
+    def dispatch(self, payloads):
+        """
+        Send every payload and wait for all of them.
+
+        Senders run in a copy of the caller's context, so they see the
+        teacher, bulk mailer and metrics recorder of the onboarding.
+
+        Args:
+            payloads (dict): Sender keyword arguments keyed by channel, see build_payloads()
+
+        Returns:
+            dict: Status message of each channel. A channel that fails does
+            not stop the others.
+        """
+        with span("notify"):
+            with self._lock:
+                futures = {
+                    channel: self._executor.submit(copy_context().run, _send, channel, payload)
+                    for channel, payload in payloads.items()
+                }
+            return {channel: future.result() for channel, future in futures.items()}
+
+    def close(self):
+        with self._lock:
+            executor = self._executor
+        executor.shutdown(wait=True)
+
+
+def get_dispatcher():
+    """
+    Shared NotificationDispatcher, created on first use.
+    """
+    return get_client("notification_dispatcher", NotificationDispatcher)
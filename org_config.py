@@ -0,0 +1,375 @@
+import hashlib
+import json
+import logging
+import os
+import sys
+import threading
+from bisect import bisect_right
+
+logger = logging.getLogger(__name__)
+
+# Seconds between checks of the org configuration file for changes
+ORG_CONFIG_RELOAD_INTERVAL = float(os.getenv("ORG_CONFIG_RELOAD_INTERVAL", "5"))
+
+# Placeholder spliced out of the pre-rendered role blocks, see OrgConfig.render_role_context
+_JUSTIFICATION = "\0justification\0"
+
+
+class OrgConfigError(ValueError):
+    """Raised when an org configuration file cannot be read or is invalid."""
+
+
+def _subject_key(subject):
+    return " ".join(subject.lower().split())
+
+class RoleIndex:
+    """
+    The role rules of TEACHER_ROLES compiled for fast lookups.
+
+    Subjects and their aliases are mapped to the canonical subject with one
+    dictionary lookup, and each subject keeps its roles sorted by minimum
+    experience, so resolving a role is a binary search over that subject's
+    experience bands.
+
+    Args:
+        roles (dict): Role definitions in the TEACHER_ROLES format
+        aliases (dict): Alternative spellings mapped to subjects used in ``roles``
+
+    Raises:
+        ValueError: If an alias points to an unknown subject, or two roles of the
+        same subject have the same minimum experience
+    """
+
+    def __init__(self, roles, aliases=None):
+        self.subjects = {}
+        bands = {}
+        for role, definition in roles.items():
+            requirements = definition["requirements"]
+            for subject in requirements["subject"]:
+                self.subjects[_subject_key(subject)] = subject
+                bands.setdefault(subject, []).append((requirements["min_experience"], role))
+
+        for alias, subject in (aliases or {}).items():
+            if subject not in bands:
+                raise ValueError(f"Alias '{alias}' refers to unknown subject '{subject}'")
+            self.subjects.setdefault(_subject_key(alias), subject)
+
+        self.thresholds = {}
+        self.roles = {}
+        for subject, entries in bands.items():
+            entries.sort(key=lambda entry: entry[0])
+            for (years, role), (next_years, next_role) in zip(entries, entries[1:]):
+                if years == next_years:
+                    raise ValueError(f"Roles '{role}' and '{next_role}' both require {years} years of {subject}")
+            self.thresholds[subject] = [years for years, _ in entries]
+            self.roles[subject] = [role for _, role in entries]
+
+    def normalize_subject(self, subject):
+        """
+        Canonical name of a subject or one of its aliases, or None.
+        """
+        return self.subjects.get(_subject_key(subject))
+
+    def lookup(self, subject, experience):
+        """
+        The most senior role of the subject whose minimum experience is met.
+
+        Returns:
+            str: Role title, or None when no role matches
+        """
+        canonical = self.subjects.get(_subject_key(subject))
+        if canonical is None:
+            return None
+        index = bisect_right(self.thresholds[canonical], experience) - 1
+        return self.roles[canonical][index] if index >= 0 else None
+
+
+def _intern(value, pool):
+    """
+    Replace equal sub-objects of ``value`` by a single shared instance.
+    """
+    if isinstance(value, str):
+        return sys.intern(value)
+    if isinstance(value, dict):
+        value = {sys.intern(k): _intern(v, pool) for k, v in value.items()}
+    elif isinstance(value, list):
+        value = [_intern(v, pool) for v in value]
+    else:
+        return value
+    return pool.setdefault(json.dumps(value, sort_keys=True), value)
+
+
+def _validate(teacher_roles, role_resources, management_structure, subject_aliases):
+    errors = []
+    if not isinstance(teacher_roles, dict) or not teacher_roles:
+        return ["teacher_roles must define at least one role"]
+
+    for role, definition in teacher_roles.items():
+        requirements = definition.get("requirements") if isinstance(definition, dict) else None
+        if not isinstance(requirements, dict):
+            errors.append(f"{role}: missing requirements")
+            continue
+        subjects = requirements.get("subject")
+        if not isinstance(subjects, list) or not subjects or not all(isinstance(s, str) for s in subjects):
+            errors.append(f"{role}: requirements.subject must be a non-empty list of subjects")
+        years = requirements.get("min_experience")
+        if isinstance(years, bool) or not isinstance(years, (int, float)) or years < 0:
+            errors.append(f"{role}: requirements.min_experience must be a number of years >= 0")
+        if not isinstance(requirements.get("responsibilities", []), list):
+            errors.append(f"{role}: requirements.responsibilities must be a list")
+
+    for name, value in (("role_resources", role_resources), ("management_structure", management_structure)):
+        if not isinstance(value, dict):
+            return errors + [f"{name} must map role titles to their entries"]
+
+    for role, resources in role_resources.items():
+        if role not in teacher_roles:
+            errors.append(f"role_resources: unknown role '{role}'")
+        elif not isinstance(resources, list) or not all(
+                isinstance(group, dict) and isinstance(group.get("type"), str) and isinstance(group.get("items"), list)
+                for group in resources):
+            errors.append(f"{role}: resources must be a list of {{type, items}} groups")
+
+    for role, management in management_structure.items():
+        if role not in teacher_roles:
+            errors.append(f"management_structure: unknown role '{role}'")
+        elif not isinstance(management, dict):
+            errors.append(f"{role}: management must be a mapping")
+
+    if not isinstance(subject_aliases, dict) or not all(
+            isinstance(k, str) and isinstance(v, str) for k, v in subject_aliases.items()):
+        errors.append("subject_aliases must map alternative spellings to subjects")
+    return errors
+
+
+class OrgConfig:
+    """
+    Immutable snapshot of the org configuration.
+
+    Equal sub-objects, such as the school details or a department admin shared
+    by several roles, are stored once. The role index and each role's context
+    block for the finalization prompt are computed when the snapshot is built,
+    so lookups during onboarding do no work beyond a dictionary access. Treat
+    every value as read-only: a snapshot is shared by all threads.
+
+    Args:
+        teacher_roles (dict): Roles and their requirements, see config.TEACHER_ROLES
+        role_resources (dict): Resources per role
+        management_structure (dict): Management details per role. A role without
+        a "school" entry gets ``school_info``.
+        school_info (dict): School details
+        subject_aliases (dict): Alternative spellings of subjects
+        source (str): Where the configuration was loaded from
+
+    Raises:
+        OrgConfigError: If the configuration is invalid
+    """
+
+    def __init__(self, teacher_roles, role_resources=None, management_structure=None, school_info=None,
+                 subject_aliases=None, source="config.py"):
+        role_resources = role_resources or {}
+        management_structure = management_structure or {}
+        subject_aliases = subject_aliases or {}
+        errors = _validate(teacher_roles, role_resources, management_structure, subject_aliases)
+        if not errors:
+            try:
+                self.role_index = RoleIndex(teacher_roles, subject_aliases)
+            except ValueError as e:
+                errors.append(str(e))
+        if errors:
+            raise OrgConfigError(f"Invalid org configuration in {source}:\n  - " + "\n  - ".join(errors))
+
+        pool = {}
+        self.source = source
+        self.school_info = _intern(school_info or {}, pool)
+        self.teacher_roles = _intern(teacher_roles, pool)
+        self.role_resources = _intern(role_resources, pool)
+        self.management_structure = _intern({
+            role: {"school": school_info, **management} if school_info and "school" not in management else management
+            for role, management in management_structure.items()
+        }, pool)
+        self.subject_aliases = _intern(subject_aliases, pool)
+        self.version = hashlib.sha256(json.dumps(
+            [self.teacher_roles, self.role_resources, self.management_structure, self.subject_aliases],
+            sort_keys=True
+        ).encode("utf-8")).hexdigest()[:12]
+
+        # Pre-rendered context block of each role, split around the
+        # teacher-specific justification
+        self._blocks = {}
+        for role, definition in self.teacher_roles.items():
+            block = json.dumps(self.role_context(role, _JUSTIFICATION), indent=2, ensure_ascii=False)
+            self._blocks[role] = tuple(block.split(json.dumps(_JUSTIFICATION, ensure_ascii=False), 1))
+
+    def role_context(self, role, justification):
+        """
+        Role title, justification, responsibilities, resources and management structure.
+        """
+        return {
+            "role": role,
+            "justification": justification,
+            "responsibilities": self.teacher_roles[role]["requirements"].get("responsibilities", []),
+            "resources": self.role_resources.get(role, []),
+            "management": self.management_structure.get(role, {}),
+        }
+
+    def render_role_context(self, role, justification):
+        """
+        The role context as indented JSON, from the block rendered at load time.
+        """
+        prefix, suffix = self._blocks[role]
+        return prefix + json.dumps(justification, ensure_ascii=False) + suffix
+
+    def to_dict(self):
+        return {
+            "school_info": self.school_info,
+            "teacher_roles": self.teacher_roles,
+            "role_resources": self.role_resources,
+            "management_structure": {
+                role: {k: v for k, v in management.items() if not (k == "school" and v is self.school_info)}
+                for role, management in self.management_structure.items()
+            },
+            "subject_aliases": self.subject_aliases,
+        }
+
+
+def load_org_config(path):
+    """
+    Load and validate an org configuration file.
+
+    ``.yaml``/``.yml`` files need PyYAML; anything else is read as JSON. The
+    file has the keys teacher_roles, role_resources, management_structure,
+    school_info and subject_aliases, in the format of the literals in config.py.
+
+    Returns:
+        OrgConfig: The new snapshot
+
+    Raises:
+        OrgConfigError: If the file cannot be read or is invalid
+    """
+    try:
+        with open(path, encoding="utf-8") as f:
+            if path.lower().endswith((".yaml", ".yml")):
+                try:
+                    import yaml
+                except ImportError as e:
+                    raise OrgConfigError("PyYAML is required for YAML org configuration files") from e
+                data = yaml.safe_load(f)
+            else:
+                data = json.load(f)
+    except OrgConfigError:
+        raise
+    except Exception as e:
+        raise OrgConfigError(f"Cannot read org configuration {path}: {str(e)}") from e
+
+    if not isinstance(data, dict):
+        raise OrgConfigError(f"Org configuration {path} must be a mapping")
+    return OrgConfig(
+        data.get("teacher_roles"),
+        data.get("role_resources"),
+        data.get("management_structure"),
+        data.get("school_info"),
+        data.get("subject_aliases"),
+        source=path
+    )
+
+
+_current = None
+
+def current_org():
+    """
+    The org configuration snapshot in effect.
+
+    Callers that make several lookups for one teacher should fetch the snapshot
+    once, so a reload in between cannot mix two configurations.
+    """
+    return _current
+
+def set_org_config(config):
+    """
+    Swap in a new snapshot. Readers see either the old or the new one, never a mix.
+    """
+    global _current
+    _current = config
+
+
+class OrgConfigWatcher:
+    """
+    Background thread reloading the org configuration file when it changes.
+
+    A changed file is loaded and validated in full before it replaces the
+    current snapshot; an invalid file is reported and the previous snapshot
+    stays in effect.
+
+    Args:
+        path (str): Org configuration file
+        interval (float): Seconds between checks of the file's modification time
+    """
+
+    def __init__(self, path, interval=ORG_CONFIG_RELOAD_INTERVAL):
+        self.path = path
+        self.interval = interval
+        self.reloads = 0
+        self._signature = self._stat()
+        self._stop = threading.Event()
+        self._thread = None
+
+    def _stat(self):
+        try:
+            stat = os.stat(self.path)
+        except OSError:
+            return None
+        return stat.st_mtime_ns, stat.st_size
+
+    def check(self):
+        """
+        Reload the file if it changed since the last check.
+
+        Returns:
+            bool: True if a new snapshot was swapped in
+        """
+        signature = self._stat()
+        if signature is None or signature == self._signature:
+            return False
+        self._signature = signature
+        try:
+            config = load_org_config(self.path)
+        except OrgConfigError as e:
+            logger.error("Keeping the current org configuration: %s", e)
+            return False
+        set_org_config(config)
+        self.reloads += 1
+        logger.info("Reloaded org configuration from %s (version %s)", self.path, config.version)
+        return True
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            self.check()
+
+    def start(self):
+        if self._thread is None or not self._thread.is_alive():
+            self._stop.clear()
+            self._thread = threading.Thread(target=self._run, name="org-config-watcher", daemon=True)
+            self._thread.start()
+        return self
+
+    def close(self):
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+
+
+if __name__ == "__main__":
+    # Write the configuration in effect to a file, as a starting point
+    import config
+
+    if len(sys.argv) != 2:
+        sys.exit("Usage: python org_config.py <output.json|output.yaml>")
+    data = config.current_org().to_dict()
+    with open(sys.argv[1], "w", encoding="utf-8") as f:
+        if sys.argv[1].lower().endswith((".yaml", ".yml")):
+            import yaml
+            yaml.safe_dump(data, f, sort_keys=False, allow_unicode=True)
+        else:
+            json.dump(data, f, indent=2, ensure_ascii=False)
+    print(f"Wrote the org configuration to {sys.argv[1]}")
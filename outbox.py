@@ -0,0 +1,258 @@
+import json
+import os
+import sqlite3
+import threading
+import time
+
+# Outbox settings
+OUTBOX_ENABLED = os.getenv("OUTBOX_ENABLED", "0") == "1"
+OUTBOX_PATH = os.getenv("OUTBOX_PATH", os.path.join(".cache", "outbox.sqlite3"))
+OUTBOX_MAX_ATTEMPTS = int(os.getenv("OUTBOX_MAX_ATTEMPTS", "6"))
+OUTBOX_BASE_DELAY = float(os.getenv("OUTBOX_BASE_DELAY", "2"))
+OUTBOX_MAX_DELAY = float(os.getenv("OUTBOX_MAX_DELAY", "300"))
+OUTBOX_POLL_INTERVAL = float(os.getenv("OUTBOX_POLL_INTERVAL", "0.5"))
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS outbox (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    idempotency_key TEXT NOT NULL UNIQUE,
+    teacher TEXT NOT NULL,
+    channel TEXT NOT NULL,
+    payload TEXT NOT NULL,
+    status TEXT NOT NULL DEFAULT 'pending',
+    attempts INTEGER NOT NULL DEFAULT 0,
+    next_attempt_at REAL NOT NULL,
+    last_error TEXT,
+    result TEXT,
+    created_at REAL NOT NULL,
+    sent_at REAL
+);
+CREATE INDEX IF NOT EXISTS outbox_due ON outbox (status, next_attempt_at);
+"""
+
+
+class DeliveryError(Exception):
+    """Raised by a channel handler when a notification could not be delivered."""
+
+
+class Outbox:
+    """
+    Durable, SQLite-backed record of every notification to deliver.
+
+    Each notification is stored once per teacher and channel. Re-running a
+    batch finds the existing row and never queues, or sends, it again.
+
+    Statuses:
+        pending: waiting for its next attempt
+        sending: claimed by a worker; if the process dies here the row stays
+            "sending" and is never retried automatically, because the message
+            may already have gone out
+        sent: delivered
+        dead: gave up after ``max_attempts``
+
+    Args:
+        path (str): SQLite database file
+        max_attempts (int): Attempts before a notification is marked dead
+        base_delay (float): Delay before the first retry, doubled on each attempt
+        max_delay (float): Upper bound for the retry delay
+    """
+
+    def __init__(self, path=OUTBOX_PATH, max_attempts=OUTBOX_MAX_ATTEMPTS, base_delay=OUTBOX_BASE_DELAY,
+                 max_delay=OUTBOX_MAX_DELAY):
+        self.path = path
+        self.max_attempts = max_attempts
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.executescript(_SCHEMA)
+
+    @staticmethod
+    def idempotency_key(teacher, channel):
+        return f"{teacher}:{channel}"
+
+    def enqueue(self, teacher, channel, payload):
+        """
+        Record a notification for delivery, unless it was recorded before.
+
+        Args:
+            teacher (str): Stable key of the teacher
+            channel (str): "email", "whatsapp" or "slack"
+            payload (dict): Arguments for the channel's sender
+
+        Returns:
+            bool: True if the notification was new, False if it already existed
+        """
+        now = time.time()
+        with self._lock:
+            cursor = self._conn.execute(
+                "INSERT OR IGNORE INTO outbox (idempotency_key, teacher, channel, payload, next_attempt_at, created_at) "
+                "VALUES (?, ?, ?, ?, ?, ?)",
+                (self.idempotency_key(teacher, channel), teacher, channel, json.dumps(payload), now, now)
+            )
+            self._conn.commit()
+            return cursor.rowcount == 1
+
+    def claim_due(self, limit=10):
+        """
+        Claim notifications whose next attempt is due.
+
+        Returns:
+            list: Claimed rows as dicts with id, teacher, channel, payload and attempts
+        """
+        now = time.time()
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT id, teacher, channel, payload, attempts FROM outbox "
+                "WHERE status = 'pending' AND next_attempt_at <= ? ORDER BY next_attempt_at LIMIT ?",
+                (now, limit)
+            ).fetchall()
+
+            claimed = []
+            for row_id, teacher, channel, payload, attempts in rows:
+                cursor = self._conn.execute(
+                    "UPDATE outbox SET status = 'sending' WHERE id = ? AND status = 'pending'", (row_id,)
+                )
+                if cursor.rowcount == 1:
+                    claimed.append({
+                        "id": row_id,
+                        "teacher": teacher,
+                        "channel": channel,
+                        "payload": json.loads(payload),
+                        "attempts": attempts,
+                    })
+            self._conn.commit()
+            return claimed
+
+    def mark_sent(self, row_id, result):
+        with self._lock:
+            self._conn.execute(
+                "UPDATE outbox SET status = 'sent', attempts = attempts + 1, result = ?, sent_at = ? WHERE id = ?",
+                (result, time.time(), row_id)
+            )
+            self._conn.commit()
+
+    def mark_failed(self, row_id, attempts, error):
+        """
+        Record a failed attempt and schedule the next one with exponential backoff.
+        """
+        attempts += 1
+        delay = min(self.base_delay * 2 ** (attempts - 1), self.max_delay)
+        status = "dead" if attempts >= self.max_attempts else "pending"
+        with self._lock:
+            self._conn.execute(
+                "UPDATE outbox SET status = ?, attempts = ?, last_error = ?, next_attempt_at = ? WHERE id = ?",
+                (status, attempts, error, time.time() + delay, row_id)
+            )
+            self._conn.commit()
+
+    def pending_count(self):
+        """
+        Number of notifications still waiting for delivery.
+        """
+        with self._lock:
+            (count,) = self._conn.execute("SELECT COUNT(*) FROM outbox WHERE status = 'pending'").fetchone()
+            return count
+
+    def status(self, teacher):
+        """
+        Delivery status of each channel for a teacher.
+
+        Returns:
+            dict: Channel to {"status", "attempts", "error"}
+        """
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT channel, status, attempts, last_error FROM outbox WHERE teacher = ?", (teacher,)
+            ).fetchall()
+        return {
+            channel: {"status": status, "attempts": attempts, "error": error}
+            for channel, status, attempts, error in rows
+        }
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+
+class OutboxWorker:
+    """
+    Background thread delivering outbox notifications.
+
+    Args:
+        outbox (Outbox): The outbox to drain
+        handlers (dict): Channel name to a callable taking the payload. A handler
+        signals failure by raising.
+        poll_interval (float): Seconds to sleep when nothing is due
+    """
+
+    def __init__(self, outbox, handlers, poll_interval=OUTBOX_POLL_INTERVAL):
+        self.outbox = outbox
+        self.handlers = handlers
+        self.poll_interval = poll_interval
+        self._stop = threading.Event()
+        self._busy = threading.Event()
+        self._thread = None
+
+    def run_once(self):
+        """
+        Attempt every notification that is currently due.
+
+        Returns:
+            int: Number of notifications attempted
+        """
+        self._busy.set()
+        try:
+            claimed = self.outbox.claim_due()
+            for row in claimed:
+                try:
+                    handler = self.handlers[row["channel"]]
+                    result = handler(row["payload"])
+                    self.outbox.mark_sent(row["id"], str(result))
+                except Exception as e:
+                    self.outbox.mark_failed(row["id"], row["attempts"], str(e))
+            return len(claimed)
+        finally:
+            self._busy.clear()
+
+    def _run(self):
+        while not self._stop.is_set():
+            if not self.run_once():
+                self._stop.wait(self.poll_interval)
+
+    def start(self):
+        if self._thread is None or not self._thread.is_alive():
+            self._stop.clear()
+            self._thread = threading.Thread(target=self._run, name="outbox-worker", daemon=True)
+            self._thread.start()
+        return self
+
+    def stop(self):
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+
+    def drain(self, timeout=None):
+        """
+        Wait until nothing is pending, or ``timeout`` seconds have passed.
+
+        Notifications waiting on a backoff delay count as pending.
+
+        Returns:
+            bool: True if the outbox is empty
+        """
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while self._busy.is_set() or self.outbox.pending_count():
+            if deadline is not None and time.monotonic() >= deadline:
+                return False
+            time.sleep(self.poll_interval)
+        return True
+
+    def close(self):
+        self.stop()
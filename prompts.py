@@ -0,0 +1,107 @@
+from task_output import RoleAssignment, RoleResources, TeacherRecord
+
+# Shared fragments, each defined once and reused by the templates below
+
+SIGNATURE = """Best regards,
+
+Boluwatife Lambe
+Principal
+Glorylink Schools
+Email: boluwatifelambe@gmail.com
+Tel: +2348083647531"""
+
+IMPORTANT_DATES = (
+    ("First day orientation", "Monday, February 24, 2025, 9:00 AM"),
+    ("Department meeting", "Tuesday, February 25, 2025, 2:00 PM"),
+    ("IT system training", "Wednesday, February 26, 2025, 10:00 AM"),
+    ("Documentation deadline", "Friday, February 28, 2025"),
+)
+
+
+def json_shape(model):
+    """
+    One-line sketch of the JSON object a model expects, for expected outputs.
+    """
+    fields = []
+    for name, field in model.model_fields.items():
+        annotation = field.annotation
+        if annotation is str:
+            kind = "string"
+        elif annotation in (int, float):
+            kind = "number"
+        elif getattr(annotation, "__origin__", None) is list:
+            item = annotation.__args__[0]
+            kind = f"[{json_shape(item)}]" if hasattr(item, "model_fields") else "[string]"
+        else:
+            kind = "object"
+        fields.append(f'"{name}": {kind}')
+    return "{" + ", ".join(fields) + "}"
+
+
+def _bullets(lines, indent="    "):
+    return "\n".join(f"{indent}- {line}" for line in lines)
+
+
+_DATES = _bullets((f"{label}: {when}" for label, when in IMPORTANT_DATES), indent="      ")
+
+# The WhatsApp message and Slack announcement are rendered from templates
+# (see messages.py), so the email is the only free-form text the agent writes.
+# The agent answers with the email; all three channels are then sent at once
+_COMMUNICATIONS = f"""The email has a warm welcome, the assigned role and responsibilities, resources with access
+    instructions, the management structure (supervisor, department admin, team meetings,
+    mentoring if any) and these important dates:
+{_DATES}
+    End the email with exactly this signature:
+
+{SIGNATURE}
+
+    Replace every placeholder with the teacher's actual details. Answer with the email body only:
+    it is sent for you, together with the WhatsApp message and Slack announcement."""
+
+# Agent prompts
+ROLE_ASSIGNMENT_BACKSTORY = """You are a role assignment agent. You match teacher qualifications against the
+    predefined role requirements using get_suitable_role() and get_management_info(), and you
+    make sure the role and management details you pass on are accurate and complete."""
+
+FINALIZATION_BACKSTORY = """You are a finalization agent that confirms all onboarding steps are properly completed and documented.
+    You ensure a smooth transition for new teachers with a professional, welcoming email
+    that contain everything they need to start successfully."""
+
+# Task prompts. Earlier task outputs reach later tasks as compact JSON context.
+GATHER_INFO_DESCRIPTION = """Collect and verify teacher details: {teacher_info}.
+    Extract the full name, subject, years of experience, email and phone number."""
+
+GATHER_INFO_EXPECTED_OUTPUT = f"One line of JSON: {json_shape(TeacherRecord)}"
+
+ASSIGN_ROLE_DESCRIPTION = """Determine the teacher's role from the verified teacher details in the context.
+    Use get_suitable_role(subject, experience) for the role and get_management_info(role) for the
+    management structure: direct supervisor (name, role, email, office, office hours), department
+    admin (name, email, office, phone), team meetings and any role-specific details such as
+    mentoring. Use actual data from the management structure for every field."""
+
+ASSIGN_ROLE_EXPECTED_OUTPUT = f"One line of JSON, no prose: {json_shape(RoleAssignment)}"
+
+PROVIDE_RESOURCES_DESCRIPTION = """List the resources for the assigned role in the context, using
+    get_role_resources(role), with access or usage instructions in the items."""
+
+PROVIDE_RESOURCES_EXPECTED_OUTPUT = f"One line of JSON, no prose: {json_shape(RoleResources)}"
+
+FINALIZE_ONBOARDING_DESCRIPTION = f"""Write the welcome email using the teacher details, role
+    assignment and resources in the context (JSON).
+
+    {_COMMUNICATIONS}"""
+
+FINALIZE_ONBOARDING_EXPECTED_OUTPUT = "The plain-text body of the welcome email, ready to send"
+
+# Fast pipeline prompts: role, resources and management are computed in Python
+# (see fast_path.py) and passed in as {role_context}
+FAST_FINALIZATION_BACKSTORY = """You are a finalization agent that confirms all onboarding steps are properly completed and documented.
+    You write new teachers a professional, welcoming email built from the role assignment,
+    resources and management structure you are given. You never invent supervisor, admin or
+    meeting details: you use exactly the data provided."""
+
+FAST_FINALIZE_ONBOARDING_DESCRIPTION = f"""Write the welcome email using the teacher details in the
+    context and this role context (JSON, from the school's role configuration):
+    {{role_context}}
+
+    {_COMMUNICATIONS}"""
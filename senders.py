@@ -0,0 +1,260 @@
+import logging
+import os
+from functools import partial
+
+from clients import get_client, SharedSMTPConnection
+from mailer import BulkMailer, RateLimiter
+from outbox import Outbox, OutboxWorker, DeliveryError
+from slack_digest import SlackDigest, SLACK_RATE, SLACK_MAX_RETRIES
+
+CHANNELS = ("email", "whatsapp", "slack")
+
+logger = logging.getLogger(__name__)
+
+class MailSenderTool:
+    def __init__(self):
+        # Get email credentials from environment variables
+        email_user = os.getenv("EMAIL_USER")
+        email_password = os.getenv("EMAIL_PASSWORD")
+        
+        if not email_user or not email_password:
+            raise ValueError("Email credentials not found in environment variables")
+            
+        self.smtp_settings = {
+            "host": os.getenv("SMTP_HOST", "smtp.gmail.com"),
+            "port": int(os.getenv("SMTP_PORT", "587")),
+            "tls": os.getenv("SMTP_TLS", "1") == "1",
+            "user": email_user,
+            "password": email_password,
+        }
+        self.mail_from = ("Boluwatife Lambe", email_user)
+        self.smtp = get_client("smtp", lambda: SharedSMTPConnection(**self.smtp_settings))
+
+    def send_email(self, recipient, subject, body):
+        import emails
+
+        message = emails.Message(
+            subject=subject,
+            text=body,
+            mail_from=self.mail_from,
+        )
+        
+        response = self.smtp.send(message, to=recipient)
+        
+        if response is None:
+            return f"❌ Failed to send email to {recipient}: no response from the SMTP server"
+        if response.status_code == 250:
+            return f"✅ Email sent to {recipient}"
+        else:
+            return f"❌ Failed to send email. Status: {response.status_code}"
+
+    def create_bulk_mailer(self, **options):
+        """
+        Create a BulkMailer that delivers with this sender's credentials.
+
+        Args:
+            **options: BulkMailer settings such as connections, rate or run_cap
+        """
+        return BulkMailer(self.smtp_settings, self.mail_from, **options)
+
+class WhatsappMessageSenderTool:
+    def __init__(self):
+        # Get whatsapp credentials from environment variables
+        self.account_sid = os.getenv("TWILIO_ACCOUNT_SID")
+        self.auth_token = os.getenv("TWILIO_AUTH_TOKEN")
+        self.whatsapp_from = os.getenv("WHATSAPP_FROM_NUMBER")
+
+        if not all([self.account_sid, self.auth_token, self.whatsapp_from]):
+            missing = []
+            if not self.account_sid: missing.append("TWILIO_ACCOUNT_SID")
+            if not self.auth_token: missing.append("TWILIO_AUTH_TOKEN")
+            if not self.whatsapp_from: missing.append("WHATSAPP_FROM_NUMBER")
+            raise ValueError(f"Missing required WhatsApp configuration in environment variables: {', '.join(missing)}")
+
+        try:
+            from twilio.rest import Client
+            from twilio.http.http_client import TwilioHttpClient
+
+            # One pooled HTTP session for every WhatsApp message in the process
+            self.client = get_client(
+                "twilio",
+                lambda: Client(self.account_sid, self.auth_token, http_client=TwilioHttpClient(pool_connections=True))
+            )
+            # Only the first characters of the SID, for security
+            logger.debug("WhatsApp sender ready: account %s..., from %s. Trial accounts only reach recipients "
+                         "who joined the sandbox with 'join <your-sandbox-keyword>'",
+                         self.account_sid[:10], self.whatsapp_from)
+        except Exception as e:
+            logger.error("Failed to initialize Twilio client: %s", e)
+            raise
+
+    def send_message(self, phone_number: str, message_body: str) -> str:
+        """Send a WhatsApp message to the specified phone number.
+        
+        Args:
+            phone_number (str): The recipient's phone number in international format (e.g., +2348012345678)
+            message_body (str): The message to send
+        
+        Returns:
+            str: Status message indicating whether the message was sent successfully
+        """
+        try:
+            from_whatsapp = f"whatsapp:{self.whatsapp_from}"
+            to_whatsapp = f"whatsapp:{phone_number}"
+
+            message = self.client.messages.create(
+                from_=from_whatsapp,
+                body=message_body,
+                to=to_whatsapp
+            )
+            logger.debug("WhatsApp message sent to %s (%d characters), SID %s", phone_number, len(message_body),
+                         message.sid)
+            return f"✅ WhatsApp message sent to {phone_number}"
+        except Exception as e:
+            logger.warning("Error sending WhatsApp message to %s: %s", phone_number, e)
+            return f"❌ Error sending WhatsApp message: {str(e)}"
+
+class SlackMessageSenderTool:
+    def __init__(self, rate=SLACK_RATE, max_retries=SLACK_MAX_RETRIES):
+        # Get Slack credentials from environment variables
+        self.slack_token = os.getenv("SLACK_BOT_TOKEN")
+        self.channel_id = os.getenv("SLACK_CHANNEL_ID")
+        
+        if not self.slack_token or not self.channel_id:
+            missing = []
+            if not self.slack_token: missing.append("SLACK_BOT_TOKEN")
+            if not self.channel_id: missing.append("SLACK_CHANNEL_ID")
+            raise ValueError(f"Missing required Slack configuration in environment variables: {', '.join(missing)}")
+
+        # Every post to the channel shares one pace, across threads
+        self.limiter = RateLimiter(rate)
+        self.max_retries = max_retries
+        
+        try:
+            from slack_sdk import WebClient
+
+            self.client = get_client(
+                "slack",
+                lambda: WebClient(token=self.slack_token, base_url=os.getenv("SLACK_API_URL", WebClient.BASE_URL))
+            )
+            logger.debug("Slack sender ready for channel %s", self.channel_id)
+        except Exception as e:
+            logger.error("Failed to initialize Slack client: %s", e)
+            raise
+
+    def post(self, text, thread_ts=None):
+        """
+        Post to the school's channel, or to a thread of it.
+
+        Posts are spaced to the channel's rate limit. One rejected with HTTP
+        429 is retried after the Retry-After Slack sent with it, and every
+        other post from this sender waits that long too.
+
+        Args:
+            text (str): The formatted message
+            thread_ts (str): Timestamp of the message to reply to, if any
+
+        Returns:
+            dict: "ok", and the posted message's "ts" or the "error"
+        """
+        from slack_sdk.errors import SlackApiError
+
+        for attempt in range(self.max_retries + 1):
+            self.limiter.wait()
+            try:
+                response = self.client.chat_postMessage(
+                    channel=self.channel_id,
+                    text=text,
+                    thread_ts=thread_ts,
+                    unfurl_links=False
+                )
+                return {"ok": True, "ts": response["ts"]}
+            except SlackApiError as e:
+                if e.response.status_code != 429 or attempt == self.max_retries:
+                    return {"ok": False, "error": e.response.get("error") or str(e)}
+                headers = {name.lower(): value for name, value in e.response.headers.items()}
+                delay = float(headers.get("retry-after", 1))
+                logger.warning("Slack rate limit reached, retrying in %gs", delay)
+                self.limiter.hold(delay)
+            except Exception as e:
+                return {"ok": False, "error": str(e)}
+
+    def send_message(self, message: str) -> str:
+        """
+        Send a message to the school's Slack channel.
+        
+        Args:
+            message (str): The formatted message to send
+        
+        Returns:
+            str: Status message indicating whether the message was sent successfully
+        """
+        response = self.post(message)
+        if response["ok"]:
+            return "✅ Successfully sent Slack welcome message"
+        return f"❌ Failed to send Slack message: {response['error']}"
+
+    def create_digest(self):
+        """
+        Create a SlackDigest that posts through this sender.
+        """
+        return SlackDigest(self)
+
+
+def get_mail_sender():
+    """
+    Shared MailSenderTool, created on first use.
+    """
+    return get_client("mail_sender", MailSenderTool)
+
+def get_whatsapp_sender():
+    """
+    Shared WhatsappMessageSenderTool, created on first use.
+    """
+    return get_client("whatsapp_sender", WhatsappMessageSenderTool)
+
+def get_slack_sender():
+    """
+    Shared SlackMessageSenderTool, created on first use.
+    """
+    return get_client("slack_sender", SlackMessageSenderTool)
+
+def send_notification(channel, payload):
+    """
+    Deliver one notification payload over its channel.
+
+    Args:
+        channel (str): One of CHANNELS
+        payload (dict): "email", "subject" and "email_body" for email;
+        "phone_number" and "message_body" for WhatsApp; "message_body" for Slack
+
+    Returns:
+        str: The sender's status message
+
+    Raises:
+        DeliveryError: If the channel reported a failure
+    """
+    if channel == "email":
+        result = get_mail_sender().send_email(payload["email"], payload["subject"], payload["email_body"])
+    elif channel == "whatsapp":
+        result = get_whatsapp_sender().send_message(payload["phone_number"], payload["message_body"])
+    elif channel == "slack":
+        result = get_slack_sender().send_message(payload["message_body"])
+    else:
+        raise DeliveryError(f"Unknown notification channel '{channel}'")
+
+    if result.startswith("❌"):
+        raise DeliveryError(result)
+    return result
+
+def get_outbox_worker():
+    """
+    Shared, running OutboxWorker delivering through send_notification().
+    """
+    return get_client(
+        "outbox_worker",
+        lambda: OutboxWorker(
+            get_client("outbox", Outbox),
+            {channel: partial(send_notification, channel) for channel in CHANNELS}
+        ).start()
+    )
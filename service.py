@@ -0,0 +1,501 @@
+import json
+import logging
+import os
+import re
+import sqlite3
+import threading
+import time
+import uuid
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlparse, parse_qs
+
+from batch import iter_batch, DEFAULT_MAX_CONCURRENCY
+from clients import get_client, close_clients
+from hire_registry import HireRegistry, hire_id, HIRE_REGISTRY_ENABLED
+from instrumentation import aggregate, render_prometheus
+from logs import setup_logging
+from model_tiers import LLM_TIERS, AGENT_TIERS, agent_tier
+from outbox import OUTBOX_ENABLED
+
+logger = logging.getLogger(__name__)
+
+# Service settings
+SERVICE_HOST = os.getenv("ONBOARDING_SERVICE_HOST", "127.0.0.1")
+SERVICE_PORT = int(os.getenv("ONBOARDING_SERVICE_PORT", "8080"))
+SERVICE_WORKERS = int(os.getenv("ONBOARDING_SERVICE_WORKERS", str(DEFAULT_MAX_CONCURRENCY)))
+# Identifies this service's hire registry claims across restarts
+SERVICE_ID = os.getenv("ONBOARDING_SERVICE_ID", "onboarding-service")
+JOB_QUEUE_PATH = os.getenv("JOB_QUEUE_PATH", os.path.join(".cache", "jobs.sqlite3"))
+JOB_POLL_INTERVAL = float(os.getenv("JOB_POLL_INTERVAL", "1"))  # seconds between checks of an idle queue
+MAX_REQUEST_BYTES = int(os.getenv("ONBOARDING_SERVICE_MAX_REQUEST_BYTES", str(1024 * 1024)))
+
+# Statuses of a job that has not finished yet
+ACTIVE_STATUSES = ("queued", "running")
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS jobs (
+    id TEXT PRIMARY KEY,
+    hire_id TEXT NOT NULL,
+    teacher TEXT NOT NULL,
+    mode TEXT NOT NULL,
+    status TEXT NOT NULL DEFAULT 'queued',
+    result TEXT,
+    submitted_at REAL NOT NULL,
+    started_at REAL,
+    finished_at REAL
+);
+CREATE INDEX IF NOT EXISTS jobs_queued ON jobs (status, submitted_at);
+CREATE INDEX IF NOT EXISTS jobs_hire_id ON jobs (hire_id, status);
+"""
+
+_COLUMNS = ("id", "hire_id", "teacher", "mode", "status", "result", "submitted_at", "started_at", "finished_at")
+
+
+def _job(row):
+    job = dict(zip(_COLUMNS, row))
+    job["teacher"] = json.loads(job["teacher"])
+    if job["result"] is not None:
+        job["result"] = json.loads(job["result"])
+    return job
+
+
+class JobQueue:
+    """
+    Durable, SQLite-backed queue of onboarding jobs.
+
+    A job holds one teacher. It is "queued" until a worker claims it, then
+    "running", then takes the status of its onboard_teacher() result
+    ("success", "rejected", "duplicate" or "failed"). Jobs survive a restart:
+    recover() puts the ones that were running back in the queue.
+
+    Args:
+        path (str): SQLite database file
+    """
+
+    def __init__(self, path=JOB_QUEUE_PATH):
+        self.path = path
+
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.executescript(_SCHEMA)
+
+    def submit(self, teacher, mode):
+        """
+        Queue a teacher for onboarding, unless the same hire is already queued or running.
+
+        Args:
+            teacher (dict | str): Roster entry, see main.onboard_teachers()
+            mode (str): Pipeline mode, one of main.PIPELINE_MODES
+
+        Returns:
+            tuple: (job, created) where ``job`` is the new job, or the active
+            job of the same hire when ``created`` is False
+        """
+        key = hire_id(teacher)
+        with self._lock, self._conn:
+            row = self._conn.execute(
+                f"SELECT {', '.join(_COLUMNS)} FROM jobs WHERE hire_id = ? AND status IN ('queued', 'running') "
+                "LIMIT 1", (key,)
+            ).fetchone()
+            if row is not None:
+                return _job(row), False
+            job = {"id": uuid.uuid4().hex, "hire_id": key, "teacher": teacher, "mode": mode, "status": "queued",
+                   "result": None, "submitted_at": time.time(), "started_at": None, "finished_at": None}
+            self._conn.execute(
+                "INSERT INTO jobs (id, hire_id, teacher, mode, submitted_at) VALUES (?, ?, ?, ?, ?)",
+                (job["id"], key, json.dumps(teacher), mode, job["submitted_at"])
+            )
+        return job, True
+
+    def claim(self):
+        """
+        Claim the oldest queued job.
+
+        Returns:
+            dict: The job, now "running", or None when the queue is empty
+        """
+        with self._lock, self._conn:
+            row = self._conn.execute(
+                f"SELECT {', '.join(_COLUMNS)} FROM jobs WHERE status = 'queued' ORDER BY submitted_at LIMIT 1"
+            ).fetchone()
+            if row is None:
+                return None
+            job = _job(row)
+            job["status"], job["started_at"] = "running", time.time()
+            self._conn.execute(
+                "UPDATE jobs SET status = 'running', started_at = ? WHERE id = ?", (job["started_at"], job["id"])
+            )
+        return job
+
+    def finish(self, job_id, result):
+        """
+        Record a job's onboard_teacher() result; its status becomes the job's.
+        """
+        with self._lock, self._conn:
+            self._conn.execute(
+                "UPDATE jobs SET status = ?, result = ?, finished_at = ? WHERE id = ?",
+                (result["status"], json.dumps(result, ensure_ascii=False, default=str), time.time(), job_id)
+            )
+
+    def recover(self):
+        """
+        Queue again the jobs a previous process left running.
+
+        Returns:
+            list: Hire IDs of the requeued jobs
+        """
+        with self._lock, self._conn:
+            hires = [key for (key,) in self._conn.execute("SELECT hire_id FROM jobs WHERE status = 'running'")]
+            self._conn.execute("UPDATE jobs SET status = 'queued', started_at = NULL WHERE status = 'running'")
+        return hires
+
+    def get(self, job_id):
+        with self._lock:
+            row = self._conn.execute(f"SELECT {', '.join(_COLUMNS)} FROM jobs WHERE id = ?", (job_id,)).fetchone()
+        return _job(row) if row else None
+
+    def list(self, status=None, limit=100):
+        """
+        Most recently submitted jobs, optionally only those with ``status``.
+        """
+        query = f"SELECT {', '.join(_COLUMNS)} FROM jobs"
+        params = ()
+        if status:
+            query, params = query + " WHERE status = ?", (status,)
+        with self._lock:
+            rows = self._conn.execute(query + " ORDER BY submitted_at DESC LIMIT ?", params + (limit,)).fetchall()
+        return [_job(row) for row in rows]
+
+    def counts(self):
+        """
+        Number of jobs in each status.
+        """
+        with self._lock:
+            return dict(self._conn.execute("SELECT status, COUNT(*) FROM jobs GROUP BY status").fetchall())
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+
+class OnboardingService:
+    """
+    Long-running onboarding worker pool fed from a JobQueue.
+
+    The process stays up between batches, so the LLM client, rate-limit
+    scheduler, caches, SMTP connection and HTTP sessions shared through
+    get_client() stay warm: only the first job pays for imports and
+    connection setup. Jobs are onboarded with ``workers`` in flight at once,
+    on the same worker pool as onboard_teachers() (see batch.iter_batch).
+
+    Args:
+        queue (JobQueue): Where jobs are submitted and their results kept
+        workers (int): Onboardings running at once
+        poll_interval (float): Seconds an idle worker waits before checking the queue again
+    """
+
+    def __init__(self, queue, workers=SERVICE_WORKERS, poll_interval=JOB_POLL_INTERVAL):
+        self.queue = queue
+        self.workers = max(1, workers)
+        self.poll_interval = poll_interval
+        self.started_at = None
+        self.metrics = None
+        self._metrics_lock = threading.Lock()
+        self._submitted = threading.Event()
+        self._stop = threading.Event()
+        self._thread = None
+
+    def warm_up(self):
+        """
+        Load crewai and create the shared LLMs and senders before the first job.
+        """
+        from main import get_llm, watch_org_config
+        from senders import get_mail_sender, get_whatsapp_sender, get_slack_sender
+        import crewai  # noqa: F401
+
+        watch_org_config()
+        for tier in {agent_tier(agent) for agent in AGENT_TIERS}:
+            get_llm(tier)
+        for get_sender in (get_mail_sender, get_whatsapp_sender, get_slack_sender):
+            get_sender()
+
+    def submit(self, teacher, mode):
+        """
+        Queue a teacher and wake an idle worker; see JobQueue.submit().
+        """
+        job, created = self.queue.submit(teacher, mode)
+        if created:
+            self._submitted.set()
+        return job, created
+
+    def _claimed_jobs(self):
+        # Blocks until a job is queued; iter_batch pulls the next job whenever a slot frees up
+        while not self._stop.is_set():
+            self._submitted.clear()
+            job = self.queue.claim()
+            if job is not None:
+                yield job
+            else:
+                self._submitted.wait(self.poll_interval)
+
+    def _process(self, job):
+        from main import onboard_teacher
+
+        started = time.perf_counter()
+        try:
+            result = onboard_teacher(job["teacher"], mode=job["mode"])
+        except Exception as e:
+            result = {
+                "status": "failed",
+                "error": str(e)
+            }
+        result["wall_time"] = round(time.perf_counter() - started, 3)
+        # Recorded here rather than when iter_batch yields it, which waits for the next job to arrive
+        self.queue.finish(job["id"], result)
+        if "metrics" in result:
+            with self._metrics_lock:
+                summaries = [result["metrics"]] if self.metrics is None else [self.metrics, result["metrics"]]
+                self.metrics = aggregate(summaries)
+        return result
+
+    def _run(self):
+        for _ in iter_batch(self._claimed_jobs(), self._process, max_concurrency=self.workers):
+            pass
+
+    def start(self):
+        """
+        Requeue the jobs of a previous process and start the workers.
+        """
+        from notifications import get_dispatcher
+
+        hires = self.queue.recover()
+        if hires and HIRE_REGISTRY_ENABLED:
+            registry = get_client("hire_registry", lambda: HireRegistry(owner=SERVICE_ID))
+            for key in hires:
+                registry.release(key)
+        if hires:
+            logger.info("Requeued %d interrupted onboarding job(s)", len(hires))
+
+        get_dispatcher().reserve(self.workers)
+        self._stop.clear()
+        self.started_at = time.time()
+        self._thread = threading.Thread(target=self._run, name="onboarding-service", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        """
+        Stop taking jobs and wait for the running ones to finish.
+        """
+        self._stop.set()
+        self._submitted.set()
+        if self._thread is not None:
+            self._thread.join()
+
+    def stats(self):
+        """
+        Queue depth, job outcomes, LLM usage and rate-limit state.
+        """
+        counts = self.queue.counts()
+        stats = {
+            "workers": self.workers,
+            "uptime": round(time.time() - self.started_at, 3) if self.started_at else 0.0,
+            "jobs": counts,
+            "queued": counts.get("queued", 0),
+            "running": counts.get("running", 0),
+            "succeeded": counts.get("success", 0),
+            "rejected": counts.get("rejected", 0),
+            "duplicates": counts.get("duplicate", 0),
+            "failed": counts.get("failed", 0),
+        }
+        with self._metrics_lock:
+            if self.metrics is not None:
+                stats["metrics"] = self.metrics
+        for tier in LLM_TIERS:
+            scheduler = get_client(f"llm_scheduler.{tier}", lambda: None)
+            if scheduler is not None:
+                stats.setdefault("llm_scheduler", {})[tier] = dict(scheduler.stats, scale=round(scheduler.scale, 3))
+        return stats
+
+    def close(self):
+        self.stop()
+
+
+def job_view(job):
+    """
+    A job as returned by the API, with its outbox delivery status when the outbox is enabled.
+    """
+    view = dict(job)
+    if OUTBOX_ENABLED and job["status"] not in ACTIVE_STATUSES:
+        from senders import get_outbox_worker
+        view["notifications"] = get_outbox_worker().outbox.status(job["hire_id"])
+    return view
+
+
+class _ServiceHandler(BaseHTTPRequestHandler):
+    """
+    JSON API of the onboarding service:
+
+        POST /jobs          {"teacher": {...}} or {"teachers": [...]}, optional "mode"
+        GET  /jobs          recent jobs; ?status= and ?limit= filter them
+        GET  /jobs/<id>     one job and, once finished, its result
+        GET  /stats         queue depth, outcomes and LLM usage as JSON
+        GET  /metrics       the same in the Prometheus text format
+        GET  /health        liveness
+    """
+
+    def log_message(self, format, *args):
+        pass
+
+    def _respond(self, status, payload, content_type="application/json"):
+        body = payload.encode() if isinstance(payload, str) else json.dumps(payload, default=str).encode()
+        self.send_response(status)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_GET(self):
+        service = self.server.service
+        url = urlparse(self.path)
+        query = parse_qs(url.query)
+
+        if url.path == "/health":
+            self._respond(200, {"status": "ok"})
+        elif url.path == "/stats":
+            self._respond(200, service.stats())
+        elif url.path == "/metrics":
+            stats = service.stats()
+            metrics = stats.get("metrics") or aggregate([])
+            lines = ["# HELP onboarding_jobs Jobs in the service queue by status.",
+                     "# TYPE onboarding_jobs gauge"]
+            lines += [f'onboarding_jobs{{status="{status}"}} {count}' for status, count in stats["jobs"].items()]
+            self._respond(200, render_prometheus(metrics, stats) + "\n".join(lines) + "\n",
+                          "text/plain; version=0.0.4")
+        elif url.path == "/jobs":
+            try:
+                limit = int(query.get("limit", ["100"])[0])
+            except ValueError:
+                self._respond(400, {"error": "limit must be an integer"})
+                return
+            jobs = service.queue.list(query.get("status", [None])[0], limit)
+            self._respond(200, {"jobs": [job_view(job) for job in jobs]})
+        elif re.fullmatch(r"/jobs/[0-9a-f]+", url.path):
+            job = service.queue.get(url.path.rsplit("/", 1)[1])
+            if job is None:
+                self._respond(404, {"error": "Job not found"})
+            else:
+                self._respond(200, job_view(job))
+        else:
+            self._respond(404, {"error": "Not found"})
+
+    def do_POST(self):
+        from main import PIPELINE_MODES, PIPELINE_MODE
+
+        service = self.server.service
+        if urlparse(self.path).path != "/jobs":
+            self._respond(404, {"error": "Not found"})
+            return
+
+        length = int(self.headers.get("Content-Length") or 0)
+        if length > MAX_REQUEST_BYTES:
+            self._respond(413, {"error": f"Request larger than {MAX_REQUEST_BYTES} bytes"})
+            return
+        try:
+            body = json.loads(self.rfile.read(length) or b"{}")
+        except ValueError:
+            self._respond(400, {"error": "Request body must be JSON"})
+            return
+
+        teachers = body.get("teachers") if isinstance(body, dict) else None
+        if teachers is None and isinstance(body, dict) and "teacher" in body:
+            teachers = [body["teacher"]]
+        if not isinstance(teachers, list) or not teachers:
+            self._respond(400, {"error": 'Expected {"teacher": {...}} or {"teachers": [...]}'})
+            return
+        if not all(isinstance(teacher, (dict, str)) for teacher in teachers):
+            self._respond(400, {"error": "Each teacher must be an object or a free-text description"})
+            return
+        mode = body.get("mode") or PIPELINE_MODE
+        if mode not in PIPELINE_MODES:
+            self._respond(400, {"error": f"mode must be one of {', '.join(PIPELINE_MODES)}"})
+            return
+
+        jobs = []
+        for teacher in teachers:
+            job, created = service.submit(teacher, mode)
+            jobs.append({"id": job["id"], "hire_id": job["hire_id"], "status": job["status"], "created": created})
+        self._respond(202, {"jobs": jobs})
+
+
+class OnboardingHTTPServer(ThreadingHTTPServer):
+    """
+    Local HTTP API in front of an OnboardingService.
+    """
+    daemon_threads = True
+
+    def __init__(self, service, host=SERVICE_HOST, port=SERVICE_PORT):
+        super().__init__((host, port), _ServiceHandler)
+        self.service = service
+
+    @property
+    def url(self):
+        host, port = self.server_address[:2]
+        return f"http://{host}:{port}"
+
+
+def create_service(workers=SERVICE_WORKERS, queue_path=JOB_QUEUE_PATH):
+    """
+    Build the service with its job queue, and the hire registry it claims hires in.
+
+    Returns:
+        OnboardingService: The service, not yet started
+    """
+    if HIRE_REGISTRY_ENABLED:
+        get_client("hire_registry", lambda: HireRegistry(owner=SERVICE_ID))
+    return OnboardingService(JobQueue(queue_path), workers=workers)
+
+
+def parse_args(argv=None):
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Run the onboarding service")
+    parser.add_argument("--host", default=SERVICE_HOST)
+    parser.add_argument("--port", type=int, default=SERVICE_PORT)
+    parser.add_argument("--workers", type=int, default=SERVICE_WORKERS)
+    parser.add_argument("--queue", default=JOB_QUEUE_PATH, help="SQLite file holding the jobs")
+    parser.add_argument("--no-warm-up", action="store_true",
+                        help="create the LLM and channel clients on the first job instead of at startup")
+    return parser.parse_args(argv)
+
+
+if __name__ == "__main__":
+    from dotenv import load_dotenv
+
+    load_dotenv()
+    args = parse_args()
+    setup_logging()
+    service = create_service(args.workers, args.queue)
+    if not args.no_warm_up:
+        logger.info("Warming up the LLM and channel clients")
+        service.warm_up()
+    service.start()
+    server = OnboardingHTTPServer(service, args.host, args.port)
+    logger.info("Onboarding service listening on %s with %d workers", server.url, service.workers)
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        logger.info("Stopping: waiting for running onboardings to finish")
+    finally:
+        server.server_close()
+        service.stop()
+        if OUTBOX_ENABLED:
+            from main import OUTBOX_DRAIN_TIMEOUT
+            from senders import get_outbox_worker
+            get_outbox_worker().drain(timeout=OUTBOX_DRAIN_TIMEOUT)
+        close_clients()
@@ -0,0 +1,662 @@
+import json
+import logging
+import multiprocessing
+import os
+import socket
+import sqlite3
+import threading
+import time
+
+from batch import BatchResults, summarize, DEFAULT_MAX_CONCURRENCY
+from clients import get_client, close_clients
+from hire_registry import HireRegistry, hire_id, HIRE_REGISTRY_ENABLED
+from instrumentation import aggregate
+from logs import setup_logging
+from mailer import BULK_EMAIL
+from outbox import OUTBOX_ENABLED
+from slack_digest import SLACK_DIGEST
+from streaming import read_roster, read_jsonl_roster, completed_keys, JsonlSink
+
+logger = logging.getLogger(__name__)
+
+# Sharding settings
+SHARD_PROCESSES = int(os.getenv("SHARD_PROCESSES", str(os.cpu_count() or 1)))
+# Shards per process; more, smaller shards let fast workers take over the work of slow ones
+SHARDS_PER_PROCESS = int(os.getenv("SHARDS_PER_PROCESS", "4"))
+SHARD_LEASE_TTL = float(os.getenv("SHARD_LEASE_TTL", "120"))  # seconds before a silent worker's shard is taken over
+SHARD_MAX_ATTEMPTS = int(os.getenv("SHARD_MAX_ATTEMPTS", "3"))  # workers a shard may be handed to before it fails
+SHARD_POLL_INTERVAL = float(os.getenv("SHARD_POLL_INTERVAL", "1"))
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS shards (
+    shard INTEGER PRIMARY KEY,
+    teachers INTEGER NOT NULL,
+    status TEXT NOT NULL DEFAULT 'pending',
+    owner TEXT,
+    lease_until REAL NOT NULL DEFAULT 0,
+    attempts INTEGER NOT NULL DEFAULT 0,
+    stats TEXT,
+    updated_at REAL NOT NULL
+);
+"""
+
+
+def shard_of(key, shards):
+    """
+    Shard of a hire, from its hire_id(); the same hire always lands on the same shard.
+    """
+    return int(key.rsplit("-", 1)[-1], 16) % shards
+
+
+def roster_path(workdir, shard):
+    return os.path.join(workdir, f"shard-{shard:04d}.roster.jsonl")
+
+
+def results_path(workdir, shard):
+    return os.path.join(workdir, f"shard-{shard:04d}.results.jsonl")
+
+
+def spool_path(workdir, shard):
+    return os.path.join(workdir, f"shard-{shard:04d}.spool.jsonl")
+
+
+def _manifest_path(workdir):
+    return os.path.join(workdir, "manifest.json")
+
+
+def read_manifest(workdir):
+    """
+    Settings the work directory was partitioned with ("shards", "mode",
+    "bulk_email" and "slack_digest").
+    """
+    with open(_manifest_path(workdir), encoding="utf-8") as f:
+        return json.load(f)
+
+
+class ShardLeases:
+    """
+    Which worker owns each shard, kept in SQLite in the shared work directory.
+
+    A worker leases one shard at a time and renews the lease while it runs.
+    A shard whose lease runs out, because its worker died or lost its host,
+    goes back to the pool and is resumed by the next worker that asks, on
+    this host or another one sharing the directory. After ``max_attempts``
+    leases a shard is marked failed instead.
+
+    Statuses:
+        pending: waiting for a worker, or for its lease to run out
+        running: leased by ``owner`` until ``lease_until``
+        done: every teacher of the shard has a result
+        failed: handed out ``max_attempts`` times without finishing
+
+    Args:
+        path (str): SQLite database file, on a filesystem every worker can lock
+        ttl (float): Seconds a lease lasts without renewal
+        max_attempts (int): Leases of a shard before it is marked failed
+    """
+
+    def __init__(self, path, ttl=SHARD_LEASE_TTL, max_attempts=SHARD_MAX_ATTEMPTS):
+        self.path = path
+        self.ttl = ttl
+        self.max_attempts = max_attempts
+        self._lock = threading.Lock()
+        # Autocommit, so claims can take the write lock up front with BEGIN IMMEDIATE
+        self._conn = sqlite3.connect(path, timeout=30, isolation_level=None, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.executescript(_SCHEMA)
+
+    def create(self, counts):
+        """
+        Register the shards of a freshly partitioned roster.
+
+        Args:
+            counts (list): Number of teachers in each shard
+        """
+        now = time.time()
+        with self._lock:
+            self._conn.executemany(
+                "INSERT OR IGNORE INTO shards (shard, teachers, updated_at) VALUES (?, ?, ?)",
+                [(shard, count, now) for shard, count in enumerate(counts)]
+            )
+
+    def claim(self, owner):
+        """
+        Lease the first shard that is unowned or whose lease ran out.
+
+        Returns:
+            dict: The shard's "shard" and "attempts" (1 on its first lease),
+            or None when no shard is left to claim
+        """
+        now = time.time()
+        with self._lock:
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                # Shards whose worker went silent too often are given up on
+                self._conn.execute(
+                    "UPDATE shards SET status = 'failed', owner = NULL, updated_at = ? "
+                    "WHERE status IN ('pending', 'running') AND lease_until < ? AND attempts >= ?",
+                    (now, now, self.max_attempts)
+                )
+                row = self._conn.execute(
+                    "SELECT shard, attempts FROM shards WHERE status IN ('pending', 'running') AND lease_until < ? "
+                    "ORDER BY attempts, shard LIMIT 1", (now,)
+                ).fetchone()
+                if row is not None:
+                    self._conn.execute(
+                        "UPDATE shards SET status = 'running', owner = ?, lease_until = ?, attempts = attempts + 1, "
+                        "updated_at = ? WHERE shard = ?", (owner, now + self.ttl, now, row[0])
+                    )
+                self._conn.execute("COMMIT")
+            except BaseException:
+                self._conn.execute("ROLLBACK")
+                raise
+        return {"shard": row[0], "attempts": row[1] + 1} if row else None
+
+    def renew(self, shard, owner):
+        """
+        Extend a lease.
+
+        Returns:
+            bool: False when the lease has been taken over by another worker
+        """
+        with self._lock:
+            cursor = self._conn.execute(
+                "UPDATE shards SET lease_until = ?, updated_at = ? WHERE shard = ? AND owner = ? AND status = 'running'",
+                (time.time() + self.ttl, time.time(), shard, owner)
+            )
+        return cursor.rowcount == 1
+
+    def complete(self, shard, owner, stats):
+        """
+        Mark a shard done with the worker's onboard_roster() statistics.
+        """
+        with self._lock:
+            self._conn.execute(
+                "UPDATE shards SET status = 'done', lease_until = 0, stats = ?, updated_at = ? "
+                "WHERE shard = ? AND owner = ?", (json.dumps(stats), time.time(), shard, owner)
+            )
+
+    def release(self, shard, owner):
+        """
+        Hand a shard back right away, e.g. when its worker is stopping.
+        """
+        with self._lock:
+            self._conn.execute(
+                "UPDATE shards SET status = 'pending', owner = NULL, lease_until = 0, updated_at = ? "
+                "WHERE shard = ? AND owner = ? AND status = 'running'", (time.time(), shard, owner)
+            )
+
+    def expire(self, owner):
+        """
+        End the leases of a worker known to be dead, so its shards are taken over at once.
+        """
+        with self._lock:
+            self._conn.execute(
+                "UPDATE shards SET lease_until = 0, updated_at = ? WHERE owner = ? AND status = 'running'",
+                (time.time(), owner)
+            )
+
+    def progress(self):
+        """
+        Number of shards in each status, and whether one is free to claim.
+
+        Returns:
+            tuple: (counts by status, claimable)
+        """
+        with self._lock:
+            counts = dict(self._conn.execute("SELECT status, COUNT(*) FROM shards GROUP BY status").fetchall())
+            (claimable,) = self._conn.execute(
+                "SELECT COUNT(*) FROM shards WHERE status IN ('pending', 'running') AND lease_until < ?",
+                (time.time(),)
+            ).fetchone()
+        return counts, claimable > 0
+
+    def shards(self):
+        """
+        Every shard with its "status", "owner", "attempts" and worker "stats".
+        """
+        with self._lock:
+            rows = self._conn.execute("SELECT shard, teachers, status, owner, attempts, stats FROM shards "
+                                      "ORDER BY shard").fetchall()
+        return [
+            {"shard": shard, "teachers": teachers, "status": status, "owner": owner, "attempts": attempts,
+             "stats": json.loads(stats) if stats else None}
+            for shard, teachers, status, owner, attempts, stats in rows
+        ]
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+
+def partition_roster(roster, workdir, shards, mode, bulk_email=False, slack_digest=False):
+    """
+    Split a roster into per-shard JSONL files by hire_id() hash.
+
+    The roster is streamed, so only one entry is held in memory at a time.
+    A work directory is only partitioned once: calling this again, e.g. to
+    resume after a crash, keeps the existing shards.
+
+    Args:
+        roster (str | iterable): Roster file path (see streaming.read_roster) or teachers
+        workdir (str): Work directory shared by every worker
+        shards (int): Number of shards
+        mode (str): Pipeline mode the workers run
+        bulk_email (bool): Send the welcome emails as one bulk mailing at the end
+        slack_digest (bool): Post the Slack introductions as one digest at the end
+
+    Returns:
+        dict: The work directory's manifest
+    """
+    os.makedirs(workdir, exist_ok=True)
+    if os.path.exists(_manifest_path(workdir)):
+        return read_manifest(workdir)
+
+    if isinstance(roster, str):
+        roster = read_roster(roster)
+    counts = [0] * shards
+    files = [open(roster_path(workdir, shard), "w", encoding="utf-8") for shard in range(shards)]
+    try:
+        for teacher in roster:
+            shard = shard_of(hire_id(teacher), shards)
+            files[shard].write(json.dumps(teacher, ensure_ascii=False) + "\n")
+            counts[shard] += 1
+    finally:
+        for f in files:
+            f.close()
+
+    leases = ShardLeases(os.path.join(workdir, "shards.sqlite3"))
+    leases.create(counts)
+    leases.close()
+
+    manifest = {"shards": shards, "mode": mode, "teachers": sum(counts), "bulk_email": bulk_email,
+                "slack_digest": slack_digest}
+    # Written last: a work directory with a manifest is completely partitioned
+    with open(_manifest_path(workdir) + ".tmp", "w", encoding="utf-8") as f:
+        json.dump(manifest, f)
+    os.replace(_manifest_path(workdir) + ".tmp", _manifest_path(workdir))
+    return manifest
+
+
+def _records(path):
+    # Records of a results or spool file; a line cut short by a crash is skipped
+    if not os.path.exists(path):
+        return
+    with open(path, encoding="utf-8") as f:
+        for line in f:
+            try:
+                yield json.loads(line)
+            except json.JSONDecodeError:
+                continue
+
+
+class DeliverySpool:
+    """
+    Bulk mailer and Slack digest of a shard worker.
+
+    Emails and introductions are appended to the shard's spool file instead
+    of being sent, so that deliver_spools() can send those of every shard as
+    one bulk mailing and one digest once the workers are done.
+
+    Args:
+        path (str): The shard's spool file
+    """
+
+    def __init__(self, path):
+        self._sink = JsonlSink(path)
+
+    def enqueue(self, key, recipient, subject, body):
+        self._sink.write({"hire_id": key, "channel": "email", "recipient": recipient, "subject": subject,
+                          "body": body})
+        return f"📬 Email to {recipient} queued for delivery"
+
+    def add(self, key, name, message):
+        self._sink.write({"hire_id": key, "channel": "slack", "name": name, "message": message})
+        return "📬 Slack introduction queued for the batch digest"
+
+    def flush(self):
+        # Delivered by the coordinator; nothing has gone out yet
+        return {}
+
+    def close(self):
+        self._sink.close()
+
+
+def _registry_owner(workdir):
+    # Every worker of the directory claims hires under the same owner, so the
+    # claims of a dead worker can be released by the one taking over, and
+    # those of spooled hires by the coordinator
+    return "shards:" + os.path.abspath(workdir)
+
+
+def _scheduler_stats():
+    from main import llms
+
+    totals = {}
+    for scheduler in {id(llm.scheduler): llm.scheduler for llm in llms.values() if llm.scheduler}.values():
+        for key, value in scheduler.stats.items():
+            totals[key] = totals.get(key, 0) + value
+    return totals
+
+
+def _heartbeat(leases, shard, owner, stop):
+    while not stop.wait(leases.ttl / 3):
+        if not leases.renew(shard, owner):
+            logger.warning("Lost the lease on shard %d; another worker has taken it over", shard)
+            return
+
+
+def run_worker(workdir, max_concurrency=DEFAULT_MAX_CONCURRENCY, setup=None, processes=1):
+    """
+    Onboard shards of a work directory until none is left to claim.
+
+    This is the body of every worker process, local or on another host.
+    Each shard is onboarded with onboard_roster() into its own results file,
+    resuming where a previous worker of that shard stopped. Bulk emails and
+    Slack introductions are spooled for the coordinator, see DeliverySpool.
+
+    Args:
+        workdir (str): Work directory partitioned by partition_roster()
+        max_concurrency (int): Onboardings in flight in this process
+        setup (callable): Called once before any work, e.g. to configure the LLM
+        processes (int): Worker processes of the run on this host. Each gets
+        an equal share of the account's LLM rate limits; set LLM_PROCESSES
+        to the total when workers on other hosts share the account too.
+
+    Returns:
+        int: Number of shards this worker finished
+    """
+    import main
+    from main import onboard_roster
+
+    # A spawned process starts without the parent's logging configuration
+    setup_logging()
+    main.llm_processes = max(main.llm_processes, processes)
+    if setup is not None:
+        setup()
+    manifest = read_manifest(workdir)
+    owner = f"{socket.gethostname()}:{os.getpid()}"
+    leases = ShardLeases(os.path.join(workdir, "shards.sqlite3"))
+    registry = None
+    if HIRE_REGISTRY_ENABLED:
+        registry = get_client("hire_registry", lambda: HireRegistry(owner=_registry_owner(workdir)))
+
+    finished = 0
+    try:
+        while True:
+            lease = leases.claim(owner)
+            if lease is None:
+                break
+            shard = lease["shard"]
+            if lease["attempts"] > 1:
+                logger.info("Taking over shard %d (attempt %d)", shard, lease["attempts"])
+                if registry is not None:
+                    done = completed_keys(results_path(workdir, shard))
+                    for teacher in read_jsonl_roster(roster_path(workdir, shard)):
+                        if hire_id(teacher) not in done:
+                            registry.release(hire_id(teacher))
+
+            stop = threading.Event()
+            heartbeat = threading.Thread(target=_heartbeat, args=(leases, shard, owner, stop), daemon=True)
+            heartbeat.start()
+            spool = None
+            if manifest.get("bulk_email") or manifest.get("slack_digest"):
+                spool = DeliverySpool(spool_path(workdir, shard))
+            scheduled = _scheduler_stats()
+            try:
+                stats = onboard_roster(roster_path(workdir, shard), results_path(workdir, shard),
+                                       max_concurrency=max_concurrency, mode=manifest["mode"], bulk_email=False,
+                                       slack_digest=False, resume=True,
+                                       mailer=spool if manifest.get("bulk_email") else None,
+                                       digest=spool if manifest.get("slack_digest") else None)
+            except BaseException:
+                leases.release(shard, owner)
+                raise
+            finally:
+                stop.set()
+                heartbeat.join()
+                if spool is not None:
+                    spool.close()
+            stats.pop("metrics", None)
+            # This shard's share of the process's scheduler counters
+            stats["llm_scheduler"] = {key: value - scheduled.get(key, 0)
+                                      for key, value in _scheduler_stats().items()}
+            leases.complete(shard, owner, stats)
+            finished += 1
+    finally:
+        if OUTBOX_ENABLED:
+            from main import OUTBOX_DRAIN_TIMEOUT
+            from senders import get_outbox_worker
+            get_outbox_worker().drain(timeout=OUTBOX_DRAIN_TIMEOUT)
+        close_clients()
+        leases.close()
+    return finished
+
+
+def deliver_spools(workdir):
+    """
+    Send the emails and Slack introductions spooled by the workers, as one
+    bulk mailing and one digest for the whole run.
+
+    Each delivery status is appended to the hire's shard results file, and
+    the hires are completed or released as in onboard_teachers(). Spooled
+    messages that already have a delivery status are skipped, so calling
+    this again after a crash only sends the rest.
+
+    Returns:
+        dict: {channel: delivery report} of each hire ID
+    """
+    from main import finish_deferred
+    from senders import get_mail_sender, get_slack_sender
+
+    manifest = read_manifest(workdir)
+    pending, shard_of_hire = {}, {}
+    for shard in range(manifest["shards"]):
+        sent = set()
+        for record in _records(results_path(workdir, shard)):
+            sent.update((record["hire_id"], channel) for channel, field in
+                        (("email", "email_delivery"), ("slack", "slack_delivery")) if field in record)
+        for record in _records(spool_path(workdir, shard)):
+            if (record["hire_id"], record["channel"]) not in sent:
+                # A shard resumed after its worker died may have spooled a hire twice
+                pending[(record["hire_id"], record["channel"])] = record
+                shard_of_hire[record["hire_id"]] = shard
+    if not pending:
+        return {}
+
+    mailer = get_mail_sender().create_bulk_mailer()
+    digest = get_slack_sender().create_digest()
+    for (key, channel), record in pending.items():
+        if channel == "email":
+            mailer.enqueue(key, record["recipient"], record["subject"], record["body"])
+        else:
+            digest.add(key, record["name"], record["message"])
+
+    if HIRE_REGISTRY_ENABLED:
+        get_client("hire_registry", lambda: HireRegistry(owner=_registry_owner(workdir)))
+    deliveries, sinks = {}, {}
+    try:
+        for channel, field, report in (("email", "email_delivery", mailer.flush()),
+                                       ("slack", "slack_delivery", digest.flush())):
+            for key, delivery in report.items():
+                deliveries.setdefault(key, {})[channel] = delivery
+                shard = shard_of_hire[key]
+                if shard not in sinks:
+                    sinks[shard] = JsonlSink(results_path(workdir, shard))
+                sinks[shard].write({"hire_id": key, field: delivery})
+    finally:
+        for sink in sinks.values():
+            sink.close()
+    finish_deferred(deliveries, manifest["mode"])
+    return deliveries
+
+
+def merge_results(workdir):
+    """
+    Combine the per-shard results files of a work directory.
+
+    Each hire keeps its latest result; delivery records written after the
+    result (bulk email, Slack digest) are added to it.
+
+    Returns:
+        BatchResults: Results keyed by hire_id, shard by shard
+    """
+    results = BatchResults()
+    for shard in range(read_manifest(workdir)["shards"]):
+        for record in _records(results_path(workdir, shard)):
+            if "status" in record:
+                results[record["hire_id"]] = record
+            elif record.get("hire_id") in results:
+                results[record["hire_id"]].update(record)
+    return results
+
+
+def run_sharded(roster, workdir, processes=SHARD_PROCESSES, max_concurrency=DEFAULT_MAX_CONCURRENCY, mode=None,
+                shards=None, setup=None, bulk_email=BULK_EMAIL, slack_digest=SLACK_DIGEST):
+    """
+    Onboard a roster across several worker processes and merge their results.
+
+    The roster is partitioned by hire_id() hash into ``shards`` shards in
+    ``workdir``, and ``processes`` worker processes lease shards until all
+    are done, each running ``max_concurrency`` onboardings at once. Workers
+    started on other hosts with ``python sharding.py worker`` on the same
+    directory share the work. A worker that dies is replaced, and its shard
+    is resumed by another worker once its lease runs out. Running again on
+    the same directory resumes an interrupted run. The account's LLM rate
+    limits are split between the ``processes`` workers, and bulk emails and
+    Slack introductions are sent once, by this process, after the workers
+    are done (see deliver_spools()).
+
+    Args:
+        roster (str | iterable): Roster file path or teachers; ignored when
+        ``workdir`` is already partitioned
+        workdir (str): Work directory shared by every worker
+        processes (int): Local worker processes
+        max_concurrency (int): Onboardings in flight per process
+        mode (str): Pipeline mode, one of main.PIPELINE_MODES
+        shards (int): Number of shards; SHARDS_PER_PROCESS per process by default
+        setup (callable): Picklable callable each worker runs before its first shard
+        bulk_email (bool): Send the welcome emails as one bulk mailing; ignored
+        when ``workdir`` is already partitioned
+        slack_digest (bool): Post the Slack introductions as one digest; also
+        ignored when ``workdir`` is already partitioned
+
+    Returns:
+        BatchResults: Merged results keyed by hire_id. ``.stats`` has the
+        onboard_teachers() statistics plus "processes", "shards",
+        "failed_shards" and the workers' summed "llm_scheduler" counters.
+    """
+    from main import PIPELINE_MODE
+
+    processes = max(1, processes)
+    manifest = partition_roster(roster, workdir, shards or processes * SHARDS_PER_PROCESS, mode or PIPELINE_MODE,
+                                bulk_email, slack_digest)
+    leases = ShardLeases(os.path.join(workdir, "shards.sqlite3"))
+    context = multiprocessing.get_context("spawn")
+    workers = []
+    spawned = 0
+    # Bounds the replacements of workers that keep dying
+    max_spawns = processes + manifest["shards"] * SHARD_MAX_ATTEMPTS
+
+    started = time.perf_counter()
+    try:
+        while True:
+            for worker in [w for w in workers if not w.is_alive()]:
+                workers.remove(worker)
+                if worker.exitcode != 0:
+                    logger.warning("Worker %d exited with code %s; rebalancing its shard", worker.pid, worker.exitcode)
+                    leases.expire(f"{socket.gethostname()}:{worker.pid}")
+            counts, claimable = leases.progress()
+            if not counts.get("pending") and not counts.get("running"):
+                break
+            if not workers and spawned >= max_spawns:
+                logger.error("Too many workers died; stopping with unfinished shards")
+                break
+            # Keep the pool full while there is work a new worker could take
+            while claimable and len(workers) < processes and spawned < max_spawns:
+                worker = context.Process(target=run_worker, args=(workdir, max_concurrency, setup, processes),
+                                         name=f"onboarding-shard-worker-{spawned}")
+                worker.start()
+                workers.append(worker)
+                spawned += 1
+            time.sleep(SHARD_POLL_INTERVAL)
+    finally:
+        for worker in workers:
+            worker.join()
+    deliver_spools(workdir)
+    elapsed = time.perf_counter() - started
+
+    results = merge_results(workdir)
+    results.stats = summarize(results.values(), elapsed, processes * max_concurrency)
+    shard_info = leases.shards()
+    leases.close()
+    results.stats["processes"] = processes
+    results.stats["shards"] = len(shard_info)
+    results.stats["failed_shards"] = [info["shard"] for info in shard_info if info["status"] == "failed"]
+    scheduler_stats = {}
+    for info in shard_info:
+        for key, value in ((info["stats"] or {}).get("llm_scheduler") or {}).items():
+            scheduler_stats[key] = scheduler_stats.get(key, 0) + value
+    results.stats["llm_scheduler"] = scheduler_stats
+    metrics = [result["metrics"] for result in results.values() if "metrics" in result]
+    if metrics:
+        results.stats["metrics"] = aggregate(metrics)
+    return results
+
+
+def parse_args(argv=None):
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Onboard a roster across several processes or hosts")
+    parser.add_argument("command", choices=["run", "worker"],
+                        help="run: partition the roster, start local workers and merge the results; "
+                             "worker: only help with a run started elsewhere on the same work directory")
+    parser.add_argument("--workdir", required=True, help="work directory shared by every worker")
+    parser.add_argument("--roster", help="CSV, JSONL or JSON roster file (run only)")
+    parser.add_argument("--processes", type=int, default=SHARD_PROCESSES)
+    parser.add_argument("--concurrency", type=int, default=DEFAULT_MAX_CONCURRENCY,
+                        help="onboardings in flight per process")
+    parser.add_argument("--shards", type=int, help="number of shards (default: processes x SHARDS_PER_PROCESS)")
+    parser.add_argument("--mode", choices=["full", "fast"])
+    parser.add_argument("--results", help="also write the merged results to this JSONL file (run only)")
+    parser.add_argument("--bulk-email", action="store_true", default=BULK_EMAIL,
+                        help="send the welcome emails as one bulk mailing at the end (run only)")
+    parser.add_argument("--slack-digest", action="store_true", default=SLACK_DIGEST,
+                        help="post the Slack introductions as one digest at the end (run only)")
+    return parser.parse_args(argv)
+
+
+if __name__ == "__main__":
+    import sys
+    from dotenv import load_dotenv
+
+    load_dotenv()
+    args = parse_args()
+    setup_logging()
+
+    if args.command == "worker":
+        context = multiprocessing.get_context("spawn")
+        pool = [context.Process(target=run_worker, args=(args.workdir, args.concurrency, None, args.processes))
+                for _ in range(max(1, args.processes))]
+        for process in pool:
+            process.start()
+        for process in pool:
+            process.join()
+        sys.exit(0)
+
+    if args.roster is None and not os.path.exists(_manifest_path(args.workdir)):
+        sys.exit("--roster is required to start a new run")
+    results = run_sharded(args.roster, args.workdir, args.processes, args.concurrency, args.mode, args.shards,
+                          bulk_email=args.bulk_email, slack_digest=args.slack_digest)
+    if args.results:
+        with JsonlSink(args.results, append=False) as sink:
+            for result in results.values():
+                sink.write(result)
+
+    stats = results.stats
+    print(f"Onboarded {stats['succeeded']}/{stats['total']} ({stats['rejected']} rejected, "
+          f"{stats['duplicates']} duplicates, {stats['failed']} failed) in {stats['wall_time']:.2f}s "
+          f"({stats['throughput_per_minute']} per minute) on {stats['processes']} processes, "
+          f"{stats['shards']} shards")
+    if stats["failed_shards"]:
+        print(f"Shards given up after {SHARD_MAX_ATTEMPTS} attempts: {stats['failed_shards']}")
@@ -0,0 +1,75 @@
+import os
+import threading
+from contextvars import ContextVar
+
+# Slack settings
+SLACK_DIGEST = os.getenv("SLACK_DIGEST", "0") == "1"
+SLACK_RATE = float(os.getenv("SLACK_RATE", "1"))  # posts per second to the channel, Slack's per-channel limit
+SLACK_MAX_RETRIES = int(os.getenv("SLACK_MAX_RETRIES", "5"))  # retries of a post rejected with HTTP 429
+
+# The SlackDigest collecting introductions for the current onboard_teachers() run, if any
+active_digest = ContextVar("active_digest", default=None)
+
+
+class SlackDigest:
+    """
+    Collect the Slack introductions of a batch and post them as one thread.
+
+    flush() posts a single digest listing every new teacher, then each
+    teacher's introduction as a reply in the digest's thread, so a large
+    batch adds one message to the channel instead of one per teacher.
+    Posts go through the sender, which paces them and retries rate-limited
+    ones after Slack's Retry-After.
+
+    Args:
+        sender (SlackMessageSenderTool): Sender posting to the school's channel
+    """
+
+    def __init__(self, sender):
+        self.sender = sender
+        self._pending = []
+        self._lock = threading.Lock()
+
+    def add(self, key, name, message):
+        """
+        Queue a teacher's introduction for the next flush().
+
+        Args:
+            key (str): Identifies the introduction in the flush() report, e.g. the hire ID
+            name (str): The teacher's name, listed in the digest post
+            message (str): The introduction, in Slack formatting
+
+        Returns:
+            str: Status message
+        """
+        with self._lock:
+            self._pending.append((key, name or key, message))
+        return "📬 Slack introduction queued for the batch digest"
+
+    def flush(self):
+        """
+        Post the digest and thread every queued introduction under it.
+
+        Returns:
+            dict: Per-introduction status keyed by the ``key`` given to add(),
+            with "status" ("sent" or "failed"), the message "ts" and any "error"
+        """
+        from messages import render_slack_digest
+
+        with self._lock:
+            pending, self._pending = self._pending, []
+        if not pending:
+            return {}
+
+        parent = self.sender.post(render_slack_digest([name for _, name, _ in pending]))
+        if not parent["ok"]:
+            return {key: {"status": "failed", "error": f"Digest not posted: {parent['error']}"} for key, _, _ in pending}
+
+        report = {}
+        for key, _, message in pending:
+            reply = self.sender.post(message, thread_ts=parent["ts"])
+            if reply["ok"]:
+                report[key] = {"status": "sent", "ts": reply["ts"]}
+            else:
+                report[key] = {"status": "failed", "error": reply["error"]}
+        return report
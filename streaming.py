@@ -0,0 +1,155 @@
+import csv
+import json
+import os
+import threading
+
+# Statuses that count as done when resuming; failed teachers are retried
+COMPLETED_STATUSES = ("success", "rejected", "duplicate")
+
+
+def read_csv_roster(path):
+    """
+    Lazily read teachers from a CSV file with a header row.
+
+    Columns are the onboard_teachers() fields (name, subject, experience,
+    email, phone_number). Empty cells are left out, so intake reports them as
+    missing.
+
+    Yields:
+        dict: One teacher per row
+    """
+    with open(path, newline="", encoding="utf-8") as f:
+        for row in csv.DictReader(f):
+            teacher = {field.strip(): value.strip() for field, value in row.items()
+                       if field and value and value.strip()}
+            if teacher:
+                yield teacher
+
+
+def read_jsonl_roster(path):
+    """
+    Lazily read teachers from a JSON Lines file.
+
+    Each line holds a teacher dictionary, or a string with a free-text
+    description of the teacher. Blank lines are skipped.
+
+    Yields:
+        dict | str: One teacher per line
+    """
+    with open(path, encoding="utf-8") as f:
+        for number, line in enumerate(f, start=1):
+            line = line.strip()
+            if not line:
+                continue
+            try:
+                yield json.loads(line)
+            except json.JSONDecodeError as e:
+                raise ValueError(f"{path}:{number}: invalid JSON: {str(e)}") from e
+
+
+def read_roster(path):
+    """
+    Read a roster file, picking the reader from the file extension.
+
+    ``.csv`` and ``.jsonl``/``.ndjson`` files are streamed; a ``.json`` file
+    holds a list of teachers and is loaded whole.
+
+    Returns:
+        iterable: Teacher dictionaries or free-text descriptions
+    """
+    extension = os.path.splitext(path)[1].lower()
+    if extension == ".csv":
+        return read_csv_roster(path)
+    if extension in (".jsonl", ".ndjson"):
+        return read_jsonl_roster(path)
+    if extension == ".json":
+        with open(path, encoding="utf-8") as f:
+            return json.load(f)
+    raise ValueError(f"Unsupported roster format '{extension}', expected .csv, .jsonl or .json")
+
+
+def completed_keys(path):
+    """
+    Keys of the teachers a previous run already finished.
+
+    A teacher is finished once a result with a status in COMPLETED_STATUSES
+    was written for it, unless a bulk email or Slack digest delivery written
+    after it failed. A line cut short by a crash is ignored.
+
+    Args:
+        path (str): Results file written by JsonlSink
+
+    Returns:
+        set: Hire IDs to skip
+    """
+    done = set()
+    if not os.path.exists(path):
+        return done
+
+    with open(path, encoding="utf-8") as f:
+        for line in f:
+            try:
+                record = json.loads(line)
+            except json.JSONDecodeError:
+                continue
+            if record.get("status") in COMPLETED_STATUSES:
+                done.add(record["hire_id"])
+            elif record.get("status") is not None:
+                done.discard(record["hire_id"])
+            elif any(record.get(field, {}).get("status", "sent") != "sent"
+                     for field in ("email_delivery", "slack_delivery")):
+                # A bulk email or digest introduction written after the result did not go out
+                done.discard(record["hire_id"])
+    return done
+
+
+def _ends_with_newline(path):
+    with open(path, "rb") as f:
+        f.seek(-1, os.SEEK_END)
+        return f.read(1) == b"\n"
+
+
+class JsonlSink:
+    """
+    Append-only JSON Lines file receiving one record per finished teacher.
+
+    Every record is flushed as soon as it is written, so a crash loses at most
+    the teachers that were still in flight. Values that are not JSON, such as
+    crew outputs, are written as strings.
+
+    Args:
+        path (str): Results file
+        append (bool): Keep the records already in the file instead of starting over
+        fsync (bool): Also ask the OS to write each record to disk
+    """
+
+    def __init__(self, path, append=True, fsync=False):
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+        self.path = path
+        self.fsync = fsync
+        self._lock = threading.Lock()
+        self._file = open(path, "a" if append else "w", encoding="utf-8")
+        # Terminate a record cut short by a crash so the next one starts on its own line
+        if append and self._file.tell() and not _ends_with_newline(path):
+            self._file.write("\n")
+
+    def write(self, record):
+        line = json.dumps(record, ensure_ascii=False, default=str) + "\n"
+        with self._lock:
+            self._file.write(line)
+            self._file.flush()
+            if self.fsync:
+                os.fsync(self._file.fileno())
+
+    def close(self):
+        with self._lock:
+            self._file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
@@ -1,5 +1,241 @@
-from pydantic import BaseModel
+import json
+import os
+import re
 
-class TaskOutput(BaseModel):
+from pydantic import BaseModel, ValidationError, field_validator
+
+from config import normalize_subject
+
+# Country code used for local phone numbers such as 08083647531
+DEFAULT_PHONE_COUNTRY_CODE = os.getenv("DEFAULT_PHONE_COUNTRY_CODE", "234")
+
+# One amount of experience: a number or a range (the lower bound counts) and its unit
+_DURATION_PATTERN = re.compile(
+    r"(\d+(?:\.\d+)?)(?:\s*(?:-|–|to)\s*\d+(?:\.\d+)?)?\s*(years?|yrs?|y|months?|mos?|weeks?|wks?)?\b"
+)
+# Words allowed around the amounts, as in "2 years and 6 months of teaching experience"
+_DURATION_FILLER = re.compile(r"\b(?:and|of|teaching|experience)\b|[,+]")
+_YEARS_PER_UNIT = {"y": 1, "m": 12, "w": 52}
+_EMAIL_PATTERN = re.compile(r"^[^@\s]+@[^@\s]+\.[^@\s]+$")
+_E164_PATTERN = re.compile(r"^\+[1-9]\d{7,14}$")
+_PHONE_FORMATTING = re.compile(r"[\s\-().]")
+# Template placeholders such as [Teacher Name] or {role} left in an agent's text
+_PLACEHOLDER_PATTERN = re.compile(r"\[[A-Z][A-Za-z' ]{2,40}\]|\{\{?\s*[a-z_]+\s*\}?\}")
+
+
+def normalize_email(value):
+    """
+    Lower-cased, trimmed email address.
+
+    Raises:
+        ValueError: If it is not an email address
+    """
+    value = str(value).strip().lower()
+    if not _EMAIL_PATTERN.match(value):
+        raise ValueError(f"{value!r} is not a valid email address")
+    return value
+
+
+def parse_experience(value):
+    """
+    Years of experience from a number or a text such as "5 years",
+    "18 months", "3-5 yrs" or "2 years and 6 months".
+
+    A number without a unit is read as years. A range counts as its lower
+    bound.
+
+    Raises:
+        ValueError: If the text is anything else, e.g. "five years", so the
+        record goes to the recruitment agent instead of being misread
+    """
+    if isinstance(value, (int, float)) and not isinstance(value, bool):
+        return float(value)
+
+    text = str(value).strip().lower()
+    amounts = list(_DURATION_PATTERN.finditer(text))
+    leftover = _DURATION_FILLER.sub("", _DURATION_PATTERN.sub("", text))
+    if not amounts or leftover.strip() or (len(amounts) > 1 and not all(m.group(2) for m in amounts)):
+        raise ValueError(f"could not read years of experience from {value!r}")
+    return sum(float(m.group(1)) / _YEARS_PER_UNIT[(m.group(2) or "y")[0]] for m in amounts)
+
+
+def normalize_phone_number(value):
+    """
+    Phone number in E.164 format; local numbers get DEFAULT_PHONE_COUNTRY_CODE.
+
+    A number without "+", "00" or a trunk "0" is only accepted when it starts
+    with DEFAULT_PHONE_COUNTRY_CODE. Anything else, e.g. the US local number
+    5551234567, is rejected rather than guessed at: prefixing "+" would make
+    it a valid number in another country.
+
+    Raises:
+        ValueError: If it is not a valid international phone number, or has no
+        country code
+    """
+    number = _PHONE_FORMATTING.sub("", str(value))
+    if number.startswith("00"):
+        number = "+" + number[2:]
+    elif number.startswith("0"):
+        number = f"+{DEFAULT_PHONE_COUNTRY_CODE}{number[1:]}"
+    elif number.startswith(DEFAULT_PHONE_COUNTRY_CODE):
+        number = "+" + number
+    elif not number.startswith("+"):
+        raise ValueError(f"{value!r} has no country code; write it as +<country code><number>")
+    if not _E164_PATTERN.match(number):
+        raise ValueError(f"{value!r} is not a valid international phone number")
+    return number
+
+
+class TeacherRecord(BaseModel):
+    """
+    A validated teacher intake record.
+
+    Experience is stored in years, subjects are mapped to the names used in
+    TEACHER_ROLES and phone numbers are normalized to E.164.
+    """
     name: str
-    value: str
+    subject: str
+    experience: float
+    email: str
+    phone_number: str
+
+    @field_validator("name", "subject")
+    @classmethod
+    def _strip(cls, value):
+        value = " ".join(str(value).split())
+        if not value:
+            raise ValueError("must not be empty")
+        return value
+
+    @field_validator("subject")
+    @classmethod
+    def _normalize_subject(cls, value):
+        return normalize_subject(value) or value
+
+    @field_validator("experience", mode="before")
+    @classmethod
+    def _parse_experience(cls, value):
+        years = parse_experience(value)
+        if years < 0 or years > 70:
+            raise ValueError(f"{years:g} years of experience is out of range")
+        return years
+
+    @field_validator("email")
+    @classmethod
+    def _normalize_email(cls, value):
+        return normalize_email(value)
+
+    @field_validator("phone_number", mode="before")
+    @classmethod
+    def _normalize_phone_number(cls, value):
+        return normalize_phone_number(value)
+
+    def to_prompt(self):
+        """
+        Format the record the way the crew's ``teacher_info`` input expects.
+        """
+        return (f"Name: {self.name}, "
+                f"Subject: {self.subject}, "
+                f"Experience: {self.experience:g} years, "
+                f"Email: {self.email}, "
+                f"Phone Number: {self.phone_number}")
+
+    def to_context(self):
+        """
+        Compact JSON of the record, as passed to later tasks.
+        """
+        return self.model_dump_json()
+
+
+class RoleAssignment(BaseModel):
+    """
+    Output of the role assignment task.
+    """
+    role: str
+    justification: str
+    management: dict = {}
+
+
+class ResourceGroup(BaseModel):
+    type: str
+    items: list[str]
+
+
+class RoleResources(BaseModel):
+    """
+    Output of the resources task.
+    """
+    role: str
+    resources: list[ResourceGroup]
+
+
+def parse_json_answer(answer):
+    """
+    Read the JSON object in an agent's answer, ignoring code fences and any
+    text around it.
+
+    Returns:
+        dict: The parsed object, or None if the answer holds no JSON object
+    """
+    start, end = answer.find("{"), answer.rfind("}")
+    if start < 0 or end < start:
+        return None
+    try:
+        data = json.loads(answer[start:end + 1])
+    except json.JSONDecodeError:
+        return None
+    return data if isinstance(data, dict) else None
+
+
+def load_output(model, answer):
+    """
+    Validate the JSON object in an agent's answer against ``model``.
+
+    Returns:
+        BaseModel: The validated output, or None if the answer does not match
+    """
+    data = parse_json_answer(answer)
+    if data is None:
+        return None
+    try:
+        return model.model_validate(data)
+    except ValidationError:
+        return None
+
+
+def check_output(model):
+    """
+    Task guardrail rejecting answers that are not JSON matching ``model``.
+
+    A valid answer is validated once, here: the output carries the model
+    instance as ``pydantic`` and compact JSON of it as ``raw``. Later tasks
+    receive earlier outputs as context, so a one-line JSON object costs them
+    far fewer tokens than prose. Rejections carry the reason, which CrewAI
+    gives the agent when it retries the task.
+    """
+    def guardrail(output):
+        data = parse_json_answer(output.raw)
+        if data is None:
+            return False, f"Answer with a single JSON object matching {model.__name__}, and nothing else."
+        try:
+            output.pydantic = model.model_validate(data)
+        except ValidationError as error:
+            return False, f"The JSON does not match {model.__name__}: {error}"
+        output.raw = output.pydantic.model_dump_json()
+        return True, output
+    return guardrail
+
+
+def check_email_body(output):
+    """
+    Task guardrail rejecting an empty email body or one with placeholders left in it.
+    """
+    body = output.raw.strip()
+    if not body:
+        return False, "The answer is empty. Answer with the body of the welcome email."
+    placeholders = sorted(set(_PLACEHOLDER_PATTERN.findall(body)))
+    if placeholders:
+        return False, (f"The email still has placeholders: {', '.join(placeholders)}. "
+                       "Replace them with the teacher's actual details.")
+    output.raw = body
+    return True, output
@@ -0,0 +1,97 @@
+import json
+import os
+import sys
+
+import pytest
+
+# Offline settings; the modules read them when they are first imported
+os.environ.setdefault("OPENAI_API_KEY", "sk-test")
+os.environ["LLM_CACHE_ENABLED"] = "0"
+os.environ["OUTBOX_ENABLED"] = "0"
+os.environ["BULK_EMAIL"] = "0"
+os.environ["SLACK_DIGEST"] = "0"
+os.environ["ONBOARDING_METRICS"] = "0"
+os.environ.setdefault("CREWAI_DISABLE_TELEMETRY", "true")
+os.environ.setdefault("OTEL_SDK_DISABLED", "true")
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from langchain_core.language_models.chat_models import BaseChatModel  # noqa: E402
+from langchain_core.messages import AIMessage  # noqa: E402
+from langchain_core.outputs import ChatGeneration, ChatResult  # noqa: E402
+from pydantic import PrivateAttr  # noqa: E402
+
+# Answers of the structured tasks, by the name of the schema asked for
+STRUCTURED_ANSWERS = {
+    "RoleAssignment": {"role": "Senior Software Engineer", "justification": "6 years of software engineering"},
+    "RoleResources": {"role": "Senior Software Engineer", "resources": []},
+}
+
+
+class ScriptedChatModel(BaseChatModel):
+    """
+    Chat model answering the crew's tasks without an API: JSON in the schema
+    of the call's response_format, and a short welcome email otherwise.
+    """
+
+    model_name: str = "gpt-4"
+    _calls: int = PrivateAttr(default=0)
+
+    @property
+    def _llm_type(self):
+        return "scripted"
+
+    @property
+    def calls(self):
+        return self._calls
+
+    def _generate(self, messages, stop=None, run_manager=None, **kwargs):
+        self._calls += 1
+        response_format = kwargs.get("response_format")
+        if response_format is not None:
+            text = json.dumps(STRUCTURED_ANSWERS[response_format["json_schema"]["name"]])
+        else:
+            text = "Thought: I now know the final answer\nFinal Answer: Dear Ada,\n\nWelcome aboard!"
+        return ChatResult(generations=[ChatGeneration(message=AIMessage(content=text))])
+
+
+@pytest.fixture
+def scripted_llms(monkeypatch):
+    """
+    Point main's LLM of every model tier at a ScriptedChatModel.
+
+    Returns:
+        dict: The scripted model of each tier
+    """
+    import main
+    from llm import ChatModelLLM
+    from model_tiers import LLM_TIER_MODELS
+
+    scripted = {tier: ScriptedChatModel(model_name=model) for tier, model in LLM_TIER_MODELS.items()}
+    monkeypatch.setattr(main, "llms", {
+        tier: ChatModelLLM(model=model.model_name, chat_model=model) for tier, model in scripted.items()
+    })
+    return scripted
+
+
+@pytest.fixture
+def teacher():
+    return {
+        "name": "Ada Obi",
+        "subject": "Software Engineer",
+        "experience": "6 years",
+        "email": "Ada.Obi@Example.com",
+        "phone_number": "0803 123 4567",
+    }
+
+
+@pytest.fixture
+def clients():
+    """
+    An empty client registry, closed again after the test.
+    """
+    from clients import close_clients
+
+    close_clients()
+    yield
+    close_clients()
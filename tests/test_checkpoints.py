@@ -0,0 +1,97 @@
+import pytest
+
+from checkpoints import CheckpointStore
+from clients import get_client
+from hire_registry import HireRegistry, hire_id
+
+
+def test_checkpoints_are_kept_per_version(tmp_path):
+    store = CheckpointStore(str(tmp_path / "checkpoints.sqlite3"))
+    store.save("hire-1", "v1", "assign_role", '{"role": "Software Engineer"}')
+    store.save("hire-1", "v1", "provide_resources", "[]")
+
+    assert store.load("hire-1", "v1") == {"assign_role": '{"role": "Software Engineer"}', "provide_resources": "[]"}
+    assert store.load("hire-1", "v2") == {}
+
+    store.clear("hire-1")
+    assert store.load("hire-1", "v1") == {}
+
+
+class UnavailableChatModel:
+    """
+    Chat model whose API is down.
+    """
+
+    def invoke(self, messages, **kwargs):
+        raise RuntimeError("LLM unavailable")
+
+
+@pytest.fixture
+def pipeline(tmp_path, clients, scripted_llms, monkeypatch):
+    """
+    main with scripted LLMs, temporary stores and recording senders.
+    ``failing`` holds the channels that fail.
+    """
+    import main
+    import notifications
+
+    get_client("checkpoints", lambda: CheckpointStore(str(tmp_path / "checkpoints.sqlite3")))
+    get_client("hire_registry", lambda: HireRegistry(str(tmp_path / "hires.sqlite3")))
+
+    sent, failing = [], set()
+
+    def sender(channel):
+        def send(**payload):
+            if channel in failing:
+                return f"❌ {channel} API error"
+            sent.append(channel)
+            return f"✅ {channel} sent"
+        return send
+
+    for channel in list(notifications.SENDERS):
+        monkeypatch.setitem(notifications.SENDERS, channel, sender(channel))
+    return main, scripted_llms, sent, failing
+
+
+def test_failed_channel_is_resent_without_llm_calls(pipeline, teacher):
+    main, scripted, sent, failing = pipeline
+    failing.add("whatsapp")
+
+    first = main.onboard_teacher(teacher, mode="fast")
+    assert first["status"] == "failed"
+    assert sorted(sent) == ["email", "slack"]
+    calls = scripted["large"].calls
+
+    failing.clear()
+    sent.clear()
+    second = main.onboard_teacher(teacher, mode="fast")
+    assert second["status"] == "success"
+    assert sent == ["whatsapp"]
+    assert scripted["large"].calls == calls
+
+    assert main.onboard_teacher(teacher, mode="fast")["status"] == "duplicate"
+
+
+def test_run_resumes_after_the_last_completed_task(pipeline, teacher, monkeypatch):
+    main, scripted, sent, failing = pipeline
+    from llm import ChatModelLLM
+
+    working = main.llms["large"]
+    monkeypatch.setitem(main.llms, "large", ChatModelLLM(model=working.model, chat_model=UnavailableChatModel()))
+
+    first = main.onboard_teacher(teacher, mode="full")
+    assert first["status"] == "failed"
+    assert sent == []
+    # Role assignment and resources ran on the small model before the email failed
+    done = get_client("checkpoints", None).load(hire_id(teacher), main.pipeline_version("full"))
+    assert {"assign_role", "provide_resources"} <= set(done)
+    small_calls = scripted["small"].calls
+
+    monkeypatch.setitem(main.llms, "large", working)
+    second = main.onboard_teacher(teacher, mode="full")
+
+    assert second["status"] == "success"
+    assert scripted["small"].calls == small_calls
+    assert scripted["large"].calls == 1
+    assert sorted(sent) == ["email", "slack", "whatsapp"]
+    assert get_client("checkpoints", None).load(hire_id(teacher), main.pipeline_version("full")) == {}
@@ -0,0 +1,72 @@
+import pytest
+
+from hire_registry import HireRegistry, hire_id
+from task_output import TeacherRecord
+
+
+@pytest.fixture
+def path(tmp_path):
+    return str(tmp_path / "hires.sqlite3")
+
+
+def test_hire_id_ignores_formatting(teacher):
+    reformatted = dict(teacher, email=" ada.obi@example.com ", phone_number="+234 803 123 4567", name="Ada  Obi")
+
+    assert hire_id(teacher) == hire_id(reformatted)
+    assert hire_id(teacher) != hire_id(dict(teacher, email="someone.else@example.com"))
+
+
+def test_claim_refuses_a_hire_in_progress_elsewhere(path, teacher):
+    record = TeacherRecord(**teacher)
+    first, second = HireRegistry(path, owner="run-1"), HireRegistry(path, owner="run-2")
+
+    assert first.claim(hire_id(teacher), record) is None
+    existing = second.claim(hire_id(teacher), record)
+
+    assert existing["hire_id"] == hire_id(teacher)
+    assert existing["status"] == "in_progress"
+
+
+def test_completed_hire_is_a_duplicate_by_phone_number(path, teacher):
+    registry = HireRegistry(path, owner="run-1")
+    registry.claim(hire_id(teacher), TeacherRecord(**teacher))
+    registry.complete(hire_id(teacher))
+    # Same person under another email address
+    repeat = dict(teacher, email="ada@school.example.com")
+
+    existing = HireRegistry(path, owner="run-2").claim(hire_id(repeat), TeacherRecord(**repeat))
+
+    assert existing["hire_id"] == hire_id(teacher)
+    assert existing["status"] == "onboarded"
+
+
+def test_release_only_drops_the_owners_claim(path, teacher):
+    record = TeacherRecord(**teacher)
+    owner, other = HireRegistry(path, owner="run-1"), HireRegistry(path, owner="run-2")
+    owner.claim(hire_id(teacher), record)
+
+    other.release(hire_id(teacher))
+    assert other.find(record) is not None
+
+    owner.release(hire_id(teacher))
+    assert other.find(record) is None
+    assert other.claim(hire_id(teacher), record) is None
+
+
+def test_unfinished_claim_of_another_run_lapses(path, teacher):
+    record = TeacherRecord(**teacher)
+    HireRegistry(path, owner="crashed").claim(hire_id(teacher), record)
+
+    assert HireRegistry(path, claim_ttl=-1, owner="run-2").claim(hire_id(teacher), record) is None
+
+
+def test_dry_run_reports_each_repeated_entry(path, teacher, clients):
+    import main
+    from clients import get_client
+
+    get_client("hire_registry", lambda: HireRegistry(path))
+
+    checked = main.dry_run([teacher, dict(teacher)])
+
+    assert [result["status"] for result in checked.values()] == ["ready", "duplicate"]
+    assert checked[f"{hire_id(teacher)}#1"]["duplicate_of"] == hire_id(teacher)
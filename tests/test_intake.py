@@ -0,0 +1,60 @@
+import pytest
+
+from intake import parse_teacher, MalformedRecordError, RejectedRecordError
+from task_output import TeacherRecord, parse_experience, normalize_phone_number
+
+
+@pytest.mark.parametrize("value, years", [
+    (7, 7.0),
+    ("7 years", 7.0),
+    ("18 months", 1.5),
+    ("3-5 yrs", 3.0),
+    ("2 years and 6 months", 2.5),
+    ("26 weeks", 0.5),
+])
+def test_parse_experience_reads_units_and_ranges(value, years):
+    assert parse_experience(value) == years
+
+
+@pytest.mark.parametrize("value", ["five years", "about 5", "5 4", ""])
+def test_parse_experience_rejects_other_text(value):
+    with pytest.raises(ValueError):
+        parse_experience(value)
+
+
+@pytest.mark.parametrize("value, number", [
+    ("+234 803 123 4567", "+2348031234567"),
+    ("0803-123-4567", "+2348031234567"),
+    ("002348031234567", "+2348031234567"),
+    ("2348031234567", "+2348031234567"),
+])
+def test_normalize_phone_number(value, number):
+    assert normalize_phone_number(value) == number
+
+
+def test_normalize_phone_number_refuses_a_missing_country_code():
+    with pytest.raises(ValueError, match="no country code"):
+        normalize_phone_number("5551234567")
+
+
+def test_teacher_record_normalizes_fields(teacher):
+    record = TeacherRecord(**teacher)
+
+    assert record.subject == "Software Engineering"
+    assert record.experience == 6.0
+    assert record.email == "ada.obi@example.com"
+    assert record.phone_number == "+2348031234567"
+
+
+def test_parse_teacher_sends_unreadable_entries_to_extraction(teacher):
+    with pytest.raises(MalformedRecordError):
+        parse_teacher("Ada Obi, a software engineer with six years of experience")
+    with pytest.raises(MalformedRecordError, match="experience"):
+        parse_teacher(dict(teacher, experience="six years"))
+    with pytest.raises(MalformedRecordError, match="Missing fields: email"):
+        parse_teacher(dict(teacher, email=""))
+
+
+def test_parse_teacher_rejects_subjects_without_a_role(teacher):
+    with pytest.raises(RejectedRecordError):
+        parse_teacher(dict(teacher, subject="Art"))
@@ -0,0 +1,100 @@
+import threading
+import time
+from types import SimpleNamespace
+
+import pytest
+
+from llm_scheduler import LLMScheduler, retry_after
+
+
+class RateLimitError(Exception):
+    """
+    429 as the OpenAI client raises it, with the response's headers.
+    """
+
+    status_code = 429
+
+    def __init__(self, headers):
+        super().__init__("Rate limit reached")
+        self.response = SimpleNamespace(status_code=429, headers=headers)
+
+
+def refused(times, headers):
+    """
+    Endpoint refusing the first ``times`` calls with 429, then answering.
+    """
+    calls = []
+
+    def send():
+        calls.append(time.monotonic())
+        if len(calls) <= times:
+            raise RateLimitError(headers)
+        return "answer"
+
+    return send, calls
+
+
+@pytest.mark.parametrize("headers, expected", [
+    ({"retry-after-ms": "250"}, 0.25),
+    ({"Retry-After": "2"}, 2.0),
+    ({"retry-after": "soon"}, None),
+    ({}, None),
+])
+def test_retry_after_reads_the_headers(headers, expected):
+    assert retry_after(RateLimitError(headers)) == expected
+
+
+def test_call_waits_the_retry_after_of_a_429():
+    scheduler = LLMScheduler(rpm=0, tpm=0, backoff_base=10)
+    send, calls = refused(1, {"retry-after-ms": "300"})
+
+    assert scheduler.call(send, tokens=100) == "answer"
+
+    assert calls[1] - calls[0] >= 0.3
+    assert scheduler.stats["rate_limited"] == 1
+    assert scheduler.stats["retries"] == 1
+    # Below the rate it ran at, until successful calls win it back
+    assert scheduler.scale < 1.0
+
+
+def test_call_backs_off_exponentially_without_retry_after():
+    scheduler = LLMScheduler(rpm=0, tpm=0, backoff_base=0.1)
+    send, calls = refused(2, {})
+
+    assert scheduler.call(send, tokens=100) == "answer"
+
+    # Backoffs of 0.1 and 0.2 seconds, each jittered down to half at most
+    assert calls[1] - calls[0] >= 0.05
+    assert calls[2] - calls[1] >= 0.1
+
+
+def test_call_gives_up_once_retries_are_used_up():
+    scheduler = LLMScheduler(rpm=0, tpm=0, max_retries=1)
+    send, calls = refused(2, {"retry-after-ms": "1"})
+
+    with pytest.raises(RateLimitError):
+        scheduler.call(send, tokens=100)
+    assert len(calls) == 2
+
+
+def test_higher_priority_is_admitted_before_queued_calls():
+    scheduler = LLMScheduler(rpm=0, tpm=0)
+    scheduler.backoff(0.3)
+    admitted = []
+
+    def acquire(priority):
+        scheduler.acquire(100, priority=priority)
+        admitted.append(priority)
+
+    low = threading.Thread(target=acquire, args=(10,))
+    low.start()
+    while len(scheduler._waiting) < 1:
+        time.sleep(0.01)
+    high = threading.Thread(target=acquire, args=(1,))
+    high.start()
+    while len(scheduler._waiting) < 2:
+        time.sleep(0.01)
+    low.join()
+    high.join()
+
+    assert admitted == [1, 10]
@@ -0,0 +1,78 @@
+import threading
+
+import pytest
+
+from benchmark import LocalSMTPServer
+from mailer import BulkMailer
+
+
+@pytest.fixture
+def smtp():
+    server = LocalSMTPServer()
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    yield server
+    server.shutdown()
+    server.server_close()
+
+
+def make_mailer(smtp, **options):
+    settings = {"host": "127.0.0.1", "port": smtp.server_address[1], "tls": False,
+                "user": "school@example.com", "password": "secret"}
+    options = dict({"connections": 1, "rate": 0, "retry_delay": 0}, **options)
+    return BulkMailer(settings, ("School", "school@example.com"), **options)
+
+
+def send(mailer, *recipients):
+    for recipient in recipients:
+        mailer.enqueue(recipient, recipient, "Welcome", "Welcome aboard!")
+    return mailer.flush()
+
+
+def test_transient_rejection_is_retried(smtp):
+    smtp.script("ada@example.com", "451 Try again later", "451 Try again later")
+
+    report = send(make_mailer(smtp), "ada@example.com")
+
+    assert report["ada@example.com"]["status"] == "sent"
+    assert report["ada@example.com"]["attempts"] == 3
+    assert smtp.messages == 1
+
+
+def test_transient_rejection_fails_once_retries_are_used_up(smtp):
+    smtp.script("ada@example.com", *["451 Try again later"] * 3)
+
+    report = send(make_mailer(smtp, max_retries=2), "ada@example.com")
+
+    assert report["ada@example.com"]["status"] == "failed"
+    assert report["ada@example.com"]["code"] == 451
+
+
+def test_permanent_rejection_fails_only_that_message(smtp):
+    smtp.script("nobody@example.com", "550 No such user")
+
+    report = send(make_mailer(smtp), "nobody@example.com", "ada@example.com")
+
+    assert report["nobody@example.com"]["status"] == "failed"
+    assert report["nobody@example.com"]["code"] == 550
+    assert report["nobody@example.com"]["attempts"] == 1
+    assert report["ada@example.com"]["status"] == "sent"
+    assert smtp.messages == 1
+
+
+def test_messages_beyond_the_run_cap_are_deferred(smtp):
+    report = send(make_mailer(smtp, run_cap=2), "a@example.com", "b@example.com", "c@example.com")
+
+    assert [entry["status"] for entry in report.values()] == ["sent", "sent", "deferred"]
+    assert smtp.messages == 2
+
+
+def test_dropped_connection_is_reestablished(smtp):
+    smtp.script("b@example.com", "drop")
+
+    report = send(make_mailer(smtp), "a@example.com", "b@example.com", "c@example.com")
+
+    assert all(entry["status"] == "sent" for entry in report.values())
+    assert report["b@example.com"]["attempts"] == 2
+    assert smtp.messages == 3
+    # The first session, the one reopened for c and the retry round's
+    assert smtp.connections == 3
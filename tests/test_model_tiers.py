@@ -0,0 +1,74 @@
+from types import SimpleNamespace
+
+import model_tiers
+from model_tiers import LLM_TIERS, escalating, next_tier, retry_budget
+from task_output import RoleAssignment, check_output
+
+VALID = '{"role": "Software Engineer", "justification": "6 years"}'
+INVALID = "The teacher should be a Software Engineer."
+
+
+def _agent(tier):
+    return SimpleNamespace(role="Role Assignment Specialist", llm=f"llm:{tier}")
+
+
+def _answer(raw):
+    return SimpleNamespace(raw=raw, pydantic=None)
+
+
+def test_next_tier_and_retry_budget(monkeypatch):
+    monkeypatch.setattr(model_tiers, "LLM_REPAIR_RETRIES", 1)
+
+    assert next_tier("small") == "large"
+    assert next_tier("large") is None
+    assert retry_budget("small") == 2
+    assert retry_budget("large") == 1
+
+
+def test_valid_answer_stays_on_its_tier():
+    agent = _agent("small")
+    guardrail = escalating(check_output(RoleAssignment), agent, "small", lambda tier: f"llm:{tier}")
+
+    valid, result = guardrail(_answer(VALID))
+
+    assert valid
+    assert result.pydantic.role == "Software Engineer"
+    assert agent.llm == "llm:small"
+
+
+def test_rejected_answer_is_retried_one_tier_up():
+    agent = _agent("small")
+    guardrail = escalating(check_output(RoleAssignment), agent, "small", lambda tier: f"llm:{tier}")
+
+    valid, reason = guardrail(_answer(INVALID))
+
+    assert not valid
+    assert "single JSON object" in reason
+    assert agent.llm == "llm:large"
+
+
+def test_top_tier_repairs_then_passes_the_answer_on(monkeypatch):
+    monkeypatch.setattr(model_tiers, "LLM_REPAIR_RETRIES", 1)
+    agent = _agent("small")
+    guardrail = escalating(check_output(RoleAssignment), agent, "small", lambda tier: f"llm:{tier}")
+    answers = [_answer(INVALID) for _ in range(retry_budget("small") + 1)]
+
+    verdicts = [guardrail(answer)[0] for answer in answers]
+
+    # Escalation, one repair on the top tier, then the answer goes on unchanged
+    assert verdicts == [False, False, True]
+    assert agent.llm == f"llm:{LLM_TIERS[-1]}"
+    assert guardrail(_answer(VALID))[0]
+
+
+def test_repair_succeeds_on_the_top_tier(monkeypatch):
+    monkeypatch.setattr(model_tiers, "LLM_REPAIR_RETRIES", 1)
+    agent = _agent("large")
+    guardrail = escalating(check_output(RoleAssignment), agent, "large", lambda tier: f"llm:{tier}")
+
+    assert guardrail(_answer(INVALID))[0] is False
+    valid, result = guardrail(_answer(VALID))
+
+    assert valid
+    assert result.pydantic.justification == "6 years"
+    assert agent.llm == "llm:large"
@@ -0,0 +1,45 @@
+import threading
+
+import notifications
+from notifications import NotificationDispatcher
+
+
+def test_reserve_grows_the_pool_for_the_batch():
+    dispatcher = NotificationDispatcher(workers=0)
+    default = dispatcher.workers
+
+    dispatcher.reserve(1)
+    assert dispatcher.workers == default
+
+    dispatcher.reserve(20)
+    assert dispatcher.workers == 3 * 20
+    dispatcher.close()
+
+
+def test_notification_workers_fixes_the_pool_size():
+    dispatcher = NotificationDispatcher(workers=5)
+
+    dispatcher.reserve(20)
+
+    assert dispatcher.workers == 5
+    dispatcher.close()
+
+
+def test_dispatch_sends_every_channel_at_once(monkeypatch):
+    # Each sender waits for the other two, so they only finish when run together
+    barrier = threading.Barrier(3, timeout=5)
+
+    def sender(channel):
+        def send(**payload):
+            barrier.wait()
+            return f"✅ {channel} sent"
+        return send
+
+    monkeypatch.setattr(notifications, "SENDERS", {channel: sender(channel) for channel in ("email", "whatsapp", "slack")})
+    dispatcher = NotificationDispatcher(workers=0)
+    dispatcher.reserve(8)
+
+    messages = dispatcher.dispatch({"email": {}, "whatsapp": {}, "slack": {}})
+
+    assert messages == {"email": "✅ email sent", "whatsapp": "✅ whatsapp sent", "slack": "✅ slack sent"}
+    dispatcher.close()
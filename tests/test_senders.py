@@ -0,0 +1,35 @@
+from types import SimpleNamespace
+
+import pytest
+
+from clients import get_client
+from senders import MailSenderTool
+
+
+class RecordedSMTP:
+    """
+    Shared SMTP connection answering every send with ``response``.
+    """
+
+    def __init__(self, response):
+        self.response = response
+
+    def send(self, message, to):
+        return self.response
+
+
+@pytest.fixture
+def mail_env(monkeypatch, clients):
+    monkeypatch.setenv("EMAIL_USER", "school@example.com")
+    monkeypatch.setenv("EMAIL_PASSWORD", "secret")
+
+
+@pytest.mark.parametrize("response, status", [
+    (SimpleNamespace(status_code=250), "✅ Email sent to ada@example.com"),
+    (SimpleNamespace(status_code=554), "❌ Failed to send email. Status: 554"),
+    (None, "❌ Failed to send email to ada@example.com: no response from the SMTP server"),
+])
+def test_send_email_reports_the_servers_answer(mail_env, response, status):
+    get_client("smtp", lambda: RecordedSMTP(response))
+
+    assert MailSenderTool().send_email("ada@example.com", "Welcome", "Welcome aboard!") == status
@@ -0,0 +1,60 @@
+import threading
+import time
+
+import pytest
+
+from benchmark import FakeHTTPServer
+from senders import SlackMessageSenderTool
+
+# Posts closer together than this are refused with 429 and Retry-After
+SLACK_INTERVAL = 0.2
+
+
+@pytest.fixture
+def slack(monkeypatch, clients):
+    server = FakeHTTPServer(slack_interval=SLACK_INTERVAL)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    monkeypatch.setenv("SLACK_BOT_TOKEN", "xoxb-test")
+    monkeypatch.setenv("SLACK_CHANNEL_ID", "CTEST")
+    monkeypatch.setenv("SLACK_API_URL", f"{server.url}/api/")
+    yield server
+    server.shutdown()
+    server.server_close()
+
+
+def test_rate_limited_post_is_retried_after_retry_after(slack):
+    # No pacing of its own, so the second post runs into the channel's limit
+    sender = SlackMessageSenderTool(rate=0)
+
+    started = time.monotonic()
+    first, second = sender.post("first"), sender.post("second")
+
+    assert first["ok"] and second["ok"]
+    assert slack.rate_limited >= 1
+    assert time.monotonic() - started >= SLACK_INTERVAL * 0.9
+    assert [post["text"] for post in slack.slack_posts] == ["first", "second"]
+
+
+def test_rate_limited_post_fails_once_retries_are_used_up(slack):
+    sender = SlackMessageSenderTool(rate=0, max_retries=0)
+
+    sender.post("first")
+    response = sender.post("second")
+
+    assert response == {"ok": False, "error": "ratelimited"}
+
+
+def test_digest_threads_every_introduction_under_it(slack):
+    digest = SlackMessageSenderTool(rate=0).create_digest()
+    digest.add("ada", "Ada Obi", "Please welcome Ada")
+    digest.add("tunde", "Tunde Bello", "Please welcome Tunde")
+
+    report = digest.flush()
+
+    parent, *replies = slack.slack_posts
+    assert parent["thread_ts"] is None
+    assert "Ada Obi" in parent["text"] and "Tunde Bello" in parent["text"]
+    assert [reply["thread_ts"] for reply in replies] == [parent["ts"], parent["ts"]]
+    assert [reply["text"] for reply in replies] == ["Please welcome Ada", "Please welcome Tunde"]
+    assert {key: entry["status"] for key, entry in report.items()} == {"ada": "sent", "tunde": "sent"}
+    assert slack.rate_limited >= 2
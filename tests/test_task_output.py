@@ -0,0 +1,35 @@
+from types import SimpleNamespace
+
+import pytest
+
+from task_output import RoleAssignment, check_output, check_email_body
+
+
+def test_check_output_parses_the_answer_once():
+    output = SimpleNamespace(raw='Here it is:\n```json\n{"role": "Software Engineer", "justification": "6 years"}\n```',
+                             pydantic=None)
+
+    valid, result = check_output(RoleAssignment)(output)
+
+    assert valid
+    assert result.pydantic == RoleAssignment(role="Software Engineer", justification="6 years")
+    assert result.raw == result.pydantic.model_dump_json()
+
+
+@pytest.mark.parametrize("raw, reason", [
+    ("The teacher should be a Software Engineer.", "single JSON object"),
+    ('{"role": "Software Engineer"}', "does not match RoleAssignment"),
+])
+def test_check_output_rejects_with_the_reason(raw, reason):
+    valid, error = check_output(RoleAssignment)(SimpleNamespace(raw=raw, pydantic=None))
+
+    assert not valid
+    assert reason in error
+
+
+def test_check_email_body_rejects_placeholders():
+    valid, error = check_email_body(SimpleNamespace(raw="Dear [Teacher Name],\n\nWelcome aboard!"))
+
+    assert not valid
+    assert "[Teacher Name]" in error
+    assert check_email_body(SimpleNamespace(raw=" Dear Ada,\n\nWelcome aboard! "))[1].raw == "Dear Ada,\n\nWelcome aboard!"